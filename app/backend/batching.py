@@ -0,0 +1,162 @@
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one vectorized call.
+
+    Requests are queued; a background thread takes the first waiting request,
+    keeps collecting until `window_ms` has passed since that request arrived or
+    `max_batch_size` rows are queued, scores the batch with `predict_fn` and
+    resolves each caller's Future with its own result. If the batch call fails,
+    its rows are scored one at a time so only the rows that fail get the error.
+    """
+    def __init__(self, predict_fn, window_ms=2.0, max_batch_size=64, stats_window=10000):
+        self.predict_fn = predict_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+        # Tuning metrics
+        self.n_batches = 0
+        self.n_requests = 0
+        self.batch_size_counts = collections.Counter()
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self._recent_waits = collections.deque(maxlen=stats_window)
+
+    def start(self):
+        if self._thread is None:
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Scores everything queued so far, then stops the thread. Later submits
+        raise RuntimeError.
+        """
+        if self._thread is not None:
+            with self._lock:
+                self._stopped = True
+                self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, record: dict) -> Future:
+        """
+        Queues one input row. Returns a Future resolving to its predicted score.
+        """
+        future = Future()
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("MicroBatcher is stopped")
+            self._queue.put((record, future, time.perf_counter()))
+        return future
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = first[2] + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Shutdown requested: finish this batch, then let _run exit
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = self._collect(first)
+
+            started = time.perf_counter()
+            # Skip callers that gave up (e.g. a cancelled /predict); the rest
+            # can't be cancelled once running, so resolving them can't fail
+            live = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if live:
+                self._score(live)
+
+            self._record(len(batch), [started - enqueued for _, _, enqueued in batch])
+
+    def _score(self, batch):
+        try:
+            self._resolve(batch)
+        except Exception:
+            # One bad row shouldn't fail the rest: score each row on its own
+            for item in batch:
+                try:
+                    self._resolve([item])
+                except Exception as e:
+                    # Never let the thread die, or every later submit would hang
+                    print(f"Micro-batcher failed to resolve a request: {e!r}")
+
+    def _resolve(self, batch):
+        """
+        Scores a batch and resolves its Futures. A single row's error goes to its
+        Future; a failing batch of several rows raises so _run can split it.
+        """
+        try:
+            scores = [float(score) for score in self.predict_fn([record for record, _, _ in batch])]
+            if len(scores) != len(batch):
+                raise ValueError(f"predict_fn returned {len(scores)} scores for {len(batch)} rows")
+        except Exception as e:
+            if len(batch) > 1:
+                raise
+            batch[0][1].set_exception(e)
+            return
+        for (_, future, _), score in zip(batch, scores):
+            future.set_result(score)
+
+    def _record(self, batch_size, waits):
+        with self._lock:
+            self.n_batches += 1
+            self.n_requests += batch_size
+            self.batch_size_counts[batch_size] += 1
+            self.queue_wait_total += sum(waits)
+            self.queue_wait_max = max(self.queue_wait_max, max(waits))
+            self._recent_waits.extend(waits)
+
+    def stats(self) -> dict:
+        """
+        Batch-size distribution and queue-wait summary (seconds) for tuning the window.
+        """
+        with self._lock:
+            waits = sorted(self._recent_waits)
+            counts = dict(sorted(self.batch_size_counts.items()))
+            n_batches, n_requests = self.n_batches, self.n_requests
+            wait_total, wait_max = self.queue_wait_total, self.queue_wait_max
+
+        def percentile(p):
+            return waits[min(len(waits) - 1, int(p * len(waits)))] if waits else 0.0
+
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "batches": n_batches,
+            "requests": n_requests,
+            "mean_batch_size": n_requests / n_batches if n_batches else 0.0,
+            "batch_size_counts": counts,
+            "queue_wait": {
+                "mean": wait_total / n_requests if n_requests else 0.0,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": wait_max,
+            },
+        }
@@ -0,0 +1,91 @@
+import collections
+import threading
+import time
+
+class PredictionCache:
+    """
+    Bounded in-process LRU cache of predicted scores with a per-entry TTL.
+
+    Keys are canonical forms of a validated StudentProfile dict, so the same
+    profile always maps to the same entry regardless of field order. `clear()`
+    bumps a generation counter; a score computed under an older generation
+    (i.e. by a model that has since been replaced) is never stored.
+    """
+    def __init__(self, max_size=10000, ttl_seconds=300.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.clock = clock
+
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(profile: dict) -> tuple:
+        """
+        Canonical, hashable key for a validated profile: fields sorted by name.
+        """
+        return tuple(sorted(profile.items()))
+
+    def get(self, key):
+        """
+        Returns the cached score, or None on a miss or an expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            score, expires_at = entry
+            if self.clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def put(self, key, score, generation=None):
+        """
+        Stores a score. Pass the generation read before computing it so a result
+        from a model that was swapped out mid-request is dropped.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (score, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drops every entry, e.g. when a new model artifact is loaded.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -1,12 +1,30 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import ValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from .schemas import StudentProfile, PredictionResponse
+from .batching import MicroBatcher
+from .cache import PredictionCache
+from .metrics import MetricsMiddleware, MetricsRegistry
+from .reloader import ModelReloader
+from .streaming import UploadStreamingResponse, stream_scores
+from .whatif import MAX_GRID_POINTS, axis_values, expand_grid, marginal_curves
+from .schemas import (
+    StudentProfile, PredictionResponse,
+    BatchPredictionRequest, BatchPredictionResponse,
+    ExplanationResponse, BatchExplanationResponse,
+    WhatIfRequest, WhatIfResponse,
+)
+import asyncio
+import numpy as np
 import sys
 import os
+import time
 
 # Add root to path to find src
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from src.predict_pipeline import PredictPipeline
+from src.fast_inference import DERIVED_FEATURES
 
 app = FastAPI(title="Exam Score Prediction API", version="1.0")
 
@@ -19,413 +37,632 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global Pipeline
+# Prometheus metrics at /metrics; METRICS_ENABLED=0 turns collection off
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+metrics = MetricsRegistry()
+metrics.describe("http_requests_total", "counter", "HTTP requests by route, method and status code.")
+metrics.describe("http_request_duration_seconds", "histogram", "End-to-end HTTP request latency by route.")
+metrics.describe("predict_stage_seconds", "histogram",
+                 "Latency of each prediction stage (handler and PredictPipeline) by model version.")
+metrics.describe("predictions_total", "counter", "Rows scored, by endpoint and model version.")
+metrics.describe("prediction_errors_total", "counter", "Failed scoring calls, by endpoint and model version.")
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Global Pipeline. Swapped by the reloader; handlers read it once per use, so a
+# swap never blocks or breaks an in-flight request
 pipeline = None
+model_dir = os.environ.get("MODEL_DIR", "models")
+active_model_dir = model_dir
 
-@app.on_event("startup")
-def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Refactored memory management for optimized execution. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """ Scaled parameter mapping rules for strict bounds enforcement. """def load_model():
-    """ Added localized exception trapping strategy. """def load_model():
-    """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
-    """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
-    """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
-    """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
-    """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
-    """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
-    """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
-    """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
-    """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
-    """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
-    """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
-    """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
-    """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
-    """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
-    """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
-    """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
-    """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
-    """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
-    """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
-    """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
-    """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
-    """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
-    """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
-    """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
-    """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
-    """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
-    """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
-    """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
-    """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
-    """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
-    """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
-    """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
-    """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
-    """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
-    """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
+# Tree models are served from their memory-mapped best_model.trees export when
+# there is one, so all workers share a single copy; MODEL_MMAP=0 unpickles per worker
+MODEL_MMAP = os.environ.get("MODEL_MMAP", "1") != "0"
+
+# The registry's CURRENT pointer is polled this often (seconds); 0 disables hot reload
+MODEL_POLL_SECONDS = float(os.environ.get("MODEL_POLL_SECONDS", "5"))
+reloader = None
+
+# Opt-in micro-batching of concurrent /predict calls, e.g. PREDICT_BATCH_WINDOW_MS=2
+BATCH_WINDOW_MS = float(os.environ.get("PREDICT_BATCH_WINDOW_MS", "0"))
+BATCH_MAX_SIZE = int(os.environ.get("PREDICT_BATCH_MAX_SIZE", "64"))
+batcher = None
+
+# Repeated profiles (theme toggles, batch retries) are answered from memory.
+# PREDICTION_CACHE_SIZE=0 disables the cache.
+CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "10000"))
+CACHE_TTL_SECONDS = float(os.environ.get("PREDICTION_CACHE_TTL_SECONDS", "300"))
+prediction_cache = PredictionCache(CACHE_SIZE, CACHE_TTL_SECONDS) if CACHE_SIZE > 0 else None
+
+# Readiness, separate from liveness: flips to True once the model is loaded and the
+# warm-up predictions have run, so traffic isn't routed to a cold worker
+ready = False
+warmup_stats = {"seconds": None, "error": None}
+
+# A valid profile used only to exercise the prediction path at startup
+WARMUP_PROFILE = {
+    "age": 20, "gender": "female", "course": "b.tech", "study_hours": 4.0,
+    "class_attendance": 80.0, "internet_access": "yes", "sleep_hours": 7.0,
+    "sleep_quality": "good", "study_method": "self-study", "facility_rating": "high",
+    "exam_difficulty": "moderate",
+}
+
+# Feature importance served from memory; `stamp` is the (mtime, size) of the model
+# file it was built for, so a replaced best_model.pkl invalidates it
+feature_importance_cache = {"stamp": None, "etag": None, "data": []}
+
+def active_version():
+    if reloader is None or reloader.active is None:
+        return "none"
+    return reloader.active.version or "unversioned"
+
+def observe_stage(stage, seconds):
+    if METRICS_ENABLED:
+        metrics.observe("predict_stage_seconds", seconds, stage=stage, model_version=active_version())
+
+def count_predictions(endpoint, n_rows, failed=False):
+    if METRICS_ENABLED:
+        name = "prediction_errors_total" if failed else "predictions_total"
+        metrics.inc(name, n_rows, endpoint=endpoint, model_version=active_version())
+
+def make_stage_observer(version):
     """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
+    PredictPipeline.stage_observer feeding predict_stage_seconds, labelled with
+    the version the pipeline was loaded as. Histograms are looked up once per stage.
     """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
+    label = version or "unversioned"
+    histograms = {}
+
+    def observe(stage, seconds):
+        hist = histograms.get(stage)
+        if hist is None:
+            hist = histograms[stage] = metrics.histogram("predict_stage_seconds", stage=stage, model_version=label)
+        hist.observe(seconds)
+    return observe
+
+def load_pipeline(path):
     """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
+    Loads and warms a PredictPipeline; runs on the reloader thread for hot reloads.
     """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
+    new_pipeline = PredictPipeline(model_dir=path, mmap=MODEL_MMAP)
+    start = time.perf_counter()
+    warm_pipeline(new_pipeline)
+    new_pipeline.warmup_seconds = time.perf_counter() - start
+    return new_pipeline
+
+def install_model(model):
+    """
+    Makes a loaded model the serving one. The pipeline is swapped before the
+    cache is cleared, so no score from the old model is cached afterwards.
+    The pipeline was warmed by load_pipeline, so the worker is ready from here
+    on, including when the first model only arrives after startup.
+    """
+    global pipeline, active_model_dir, ready
+    if METRICS_ENABLED:
+        model.pipeline.stage_observer = make_stage_observer(model.version)
+    pipeline = model.pipeline
+    active_model_dir = model.path
+    if prediction_cache is not None:
+        prediction_cache.clear() # Scores from any previous model are stale
+
+    try:
+        refresh_feature_importance(force=True)
+    except Exception as e:
+        print(f"Failed to load feature importance: {e}")
+
+    if not ready:
+        warmup_stats.update(seconds=model.pipeline.warmup_seconds, error=None)
+        ready = True
+
+@app.on_event("startup")
+def load_model():
+    global model_dir, reloader
+    # Assuming running from root
+    if not os.path.exists(model_dir):
+        model_dir = os.path.join("..", "..", "models") # If running from app/backend (not likely with uvicorn root)
+
+    reloader = ModelReloader(model_dir, load_pipeline, install_model, poll_seconds=MODEL_POLL_SECONDS)
+    # Serve the registry's CURRENT version; without one, the flat artifacts in model_dir
+    if not reloader.check() and not reloader.load(None):
+        print("Failed to load model.")
+        # Dont crash, just fail requests later
+    else:
+        print("Model loaded successfully.")
+    reloader.start()
+
+@app.on_event("startup")
+def start_batcher():
+    global batcher
+    if BATCH_WINDOW_MS > 0:
+        # Look up the global at call time so it always scores with the current model
+        batcher = MicroBatcher(
+            lambda records: pipeline.predict_batch(records),
+            window_ms=BATCH_WINDOW_MS,
+            max_batch_size=BATCH_MAX_SIZE,
+        ).start()
+        print(f"Micro-batching enabled: window={BATCH_WINDOW_MS} ms, max batch={BATCH_MAX_SIZE}")
+
+def warm_pipeline(target):
     """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
+    Runs throwaway predictions through validation, single-row and batch scoring
+    so the first real request doesn't pay for cold code paths.
     """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
+    record = StudentProfile(**WARMUP_PROFILE).dict()
+    build_prediction(target.predict(record))
+    target.predict_batch([record] * 8)
+
+@app.on_event("startup")
+def warm_up():
     """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
+    Warms the serving pipeline (and the micro-batcher, if enabled), then marks
+    the worker ready. Registered last, so it runs after the other startup hooks.
     """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
+    global ready
+    if pipeline is None:
+        return
+
+    start = time.perf_counter()
+    try:
+        warm_pipeline(pipeline)
+        if batcher is not None:
+            batcher.submit(StudentProfile(**WARMUP_PROFILE).dict()).result()
+    except Exception as e:
+        warmup_stats["error"] = str(e)
+        ready = False
+        print(f"Warm-up failed: {e}")
+        return
+
+    warmup_stats["seconds"] = time.perf_counter() - start
+    ready = True
+    print(f"Warm-up finished in {warmup_stats['seconds'] * 1000:.1f} ms; ready for traffic.")
+
+@app.on_event("shutdown")
+def stop_batcher():
+    if batcher is not None:
+        batcher.stop()
+
+@app.on_event("shutdown")
+def stop_reloader():
+    if reloader is not None:
+        reloader.stop()
+
+def refresh_feature_importance(force=False):
     """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
+    Reloads the feature manifest if best_model.pkl changed on disk since it was
+    last read. A stat() per call keeps the common case cheap.
     """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
+    global feature_importance_cache
+    try:
+        st = os.stat(os.path.join(active_model_dir, "best_model.pkl"))
+        stamp = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+
+    if not force and stamp == feature_importance_cache["stamp"]:
+        return feature_importance_cache
+
+    from src.explainability import load_feature_manifest, top_feature_importance
+    manifest = load_feature_manifest(active_model_dir)
+    feature_importance_cache = {
+        "stamp": stamp,
+        "etag": f'"{manifest["model_sha256"][:32]}"' if manifest else None,
+        "data": top_feature_importance(manifest) if manifest else [],
+    }
+    return feature_importance_cache
+
+@app.get("/")
+def home():
+    return {"message": "Exam Score Prediction API is running. Use /predict to get scores."}
+
+@app.get("/ready")
+def readiness():
     """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
+    Readiness probe: 200 once warm-up has finished, 503 until then (or if the
+    model failed to load). Liveness stays on `/`.
     """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
+    if not ready:
+        return JSONResponse({"status": "starting", "error": warmup_stats["error"]}, status_code=503)
+    return {"status": "ready", "warmup_seconds": warmup_stats["seconds"]}
+
+def build_prediction(score: float) -> dict:
+    # Simple Logic for 'Pass Probability' (Mock logic since regression doesn't give prob implicitly without errors)
+    # E.g. if score > 40 is pass
+    pass_prob = min(1.0, max(0.0, (score - 20) / 80)) # Mock sigmoid-ish
+
+    return {
+        "exam_score": score,
+        "confidence_level": "High" if 0 <= score <= 100 else "Low (Outlier)",
+        "pass_probability": round(pass_prob, 2)
+    }
+
+def validate_rows(rows):
+    """
+    Validates each raw row against StudentProfile.
+    Returns (valid_indices, valid_records, errors_by_index).
+    """
+    valid_indices, valid_records, errors = [], [], {}
+    for i, row in enumerate(rows):
+        try:
+            valid_records.append(StudentProfile(**row).dict())
+            valid_indices.append(i)
+        except ValidationError as e:
+            errors[i] = [
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+                for err in e.errors()
+            ]
+    return valid_indices, valid_records, errors
+
+def score_records(records):
     """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
+    Scores validated records with one vectorized predict_batch call, answering
+    repeats from the prediction cache and scoring only the misses.
     """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
+    if prediction_cache is None:
+        return pipeline.predict_batch(records)
+
+    generation = prediction_cache.generation
+    keys = [prediction_cache.make_key(record) for record in records]
+    scores = [prediction_cache.get(key) for key in keys]
+    misses = [i for i, score in enumerate(scores) if score is None]
+    if misses:
+        fresh = pipeline.predict_batch([records[i] for i in misses])
+        for i, score in zip(misses, fresh):
+            scores[i] = float(score)
+            prediction_cache.put(keys[i], scores[i], generation)
+    return scores
+
+@app.post("/predict", response_model=PredictionResponse)
+async def predict_score(profile: StudentProfile, request: Request):
+    start = time.perf_counter()
+    # Routing, JSON parsing and Pydantic validation all happen before the handler runs
+    request_start = getattr(request.state, "request_start", None)
+    if request_start is not None:
+        observe_stage("parse_validate", start - request_start)
+
+    if not pipeline:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    try:
+        # Convert Pydantic model to dict
+        input_data = profile.dict()
+        now = time.perf_counter()
+        observe_stage("to_dict", now - start)
+        start = now
+
+        if prediction_cache is not None:
+            key = prediction_cache.make_key(input_data)
+            score = prediction_cache.get(key)
+            now = time.perf_counter()
+            observe_stage("cache_lookup", now - start)
+            start = now
+            if score is not None:
+                count_predictions("predict", 1)
+                return build_prediction(score)
+            generation = prediction_cache.generation
+        
+        # Predict: either coalesced with concurrent requests, or on the threadpool
+        if batcher is not None:
+            score = await asyncio.wrap_future(batcher.submit(input_data))
+        else:
+            score = await run_in_threadpool(pipeline.predict, input_data)
+        # Includes threadpool dispatch or batcher queueing, not just the model
+        observe_stage("predict_call", time.perf_counter() - start)
+
+        if prediction_cache is not None:
+            prediction_cache.put(key, score, generation)
+        
+        count_predictions("predict", 1)
+        return build_prediction(score)
+    except Exception as e:
+        count_predictions("predict", 1, failed=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+def batch_rows(request: BatchPredictionRequest):
     """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
+    Row-oriented view of a batch request given as either 'profiles' or 'columns'.
     """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
+    if (request.profiles is None) == (request.columns is None):
+        raise HTTPException(status_code=422, detail="Provide exactly one of 'profiles' or 'columns'")
+
+    if request.columns is not None:
+        lengths = {len(values) for values in request.columns.values()}
+        if len(lengths) > 1:
+            raise HTTPException(status_code=422, detail="All columns must have the same length")
+        n_rows = lengths.pop() if lengths else 0
+        return [
+            {name: values[i] for name, values in request.columns.items()}
+            for i in range(n_rows)
+        ]
+    return request.profiles
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+def predict_batch(request: BatchPredictionRequest):
+    if not pipeline:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    rows = batch_rows(request)
+    start = time.perf_counter()
+    valid_indices, valid_records, errors = validate_rows(rows)
+    observe_stage("batch_validate", time.perf_counter() - start)
+
+    try:
+        scores = score_records(valid_records)
+    except Exception as e:
+        count_predictions("predict_batch", len(valid_records), failed=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    count_predictions("predict_batch", len(valid_records))
+
+    results = [None] * len(rows)
+    for i, score in zip(valid_indices, scores):
+        results[i] = {"index": i, **build_prediction(float(score))}
+    for i, messages in errors.items():
+        results[i] = {"index": i, "errors": messages}
+
+    return {
+        "results": results,
+        "n_valid": len(valid_indices),
+        "n_invalid": len(errors),
+    }
+
+def explain_records(records):
+    """
+    Scores and explains validated records in one PredictPipeline.explain_batch
+    call. Returns (base_value, [(score, contributions)]) where contributions are
+    sorted by absolute size, largest first.
+    """
+    explanation = pipeline.explain_batch(records)
+    fields = explanation["fields"]
+    results = []
+    for record, score, row in zip(records, explanation["predictions"], explanation["contributions"]):
+        contributions = []
+        for field, contribution in zip(fields, row):
+            if field in DERIVED_FEATURES:
+                fn, sources = DERIVED_FEATURES[field]
+                value = round(float(fn(*(record[c] for c in sources))), 4)
+            else:
+                value = record.get(field)
+            contributions.append({"feature": field, "value": value, "contribution": round(float(contribution), 4)})
+        contributions.sort(key=lambda c: abs(c["contribution"]), reverse=True)
+        results.append((float(score), contributions))
+    return explanation["base_value"], results
+
+@app.post("/predict/explain", response_model=ExplanationResponse)
+def predict_explain(profile: StudentProfile):
     """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
+    Predicts one student's score together with each input field's additive
+    contribution to it, relative to `base_value`.
     """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
+    if not pipeline:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    try:
+        base_value, [(score, contributions)] = explain_records([profile.dict()])
+    except NotImplementedError as e:
+        # Model type without a per-prediction attribution
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        count_predictions("predict_explain", 1, failed=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    count_predictions("predict_explain", 1)
+
+    return {**build_prediction(score), "base_value": base_value, "contributions": contributions}
+
+@app.post("/predict/explain/batch", response_model=BatchExplanationResponse)
+def predict_explain_batch(request: BatchPredictionRequest):
     """
-    Iterates over the dataset to train the model, returning the final accuracy metrics.
-    """def load_model():
+    /predict/batch with per-row contributions; valid rows are explained in one pass.
     """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
+    if not pipeline:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    rows = batch_rows(request)
+    valid_indices, valid_records, errors = validate_rows(rows)
+
+    try:
+        base_value, explained = explain_records(valid_records)
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        count_predictions("predict_explain_batch", len(valid_records), failed=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    count_predictions("predict_explain_batch", len(valid_records))
+
+    results = [None] * len(rows)
+    for i, (score, contributions) in zip(valid_indices, explained):
+        results[i] = {"index": i, **build_prediction(score), "contributions": contributions}
+    for i, messages in errors.items():
+        results[i] = {"index": i, "errors": messages}
+
+    return {
+        "results": results,
+        "base_value": base_value,
+        "n_valid": len(valid_indices),
+        "n_invalid": len(errors),
+    }
+
+def validate_axis(base, axis):
     """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
+    Expands one what-if axis and checks every value against StudentProfile,
+    returning (field, coerced values). Raises HTTPException(422) on bad input.
     """
-    Processes numerical boundaries and converts categorical features into numerical vectors.
-    """def load_model():
+    field_info = StudentProfile.model_fields.get(axis.field)
+    if field_info is None:
+        raise HTTPException(status_code=422, detail=f"Unknown field '{axis.field}'")
+    try:
+        values = axis_values(axis.values, axis.start, axis.stop, axis.steps,
+                             integer=field_info.annotation is int)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"{axis.field}: {e}")
+
+    # One validation per grid value, not per grid point
+    checked = []
+    for value in values:
+        try:
+            checked.append(getattr(StudentProfile(**{**base, axis.field: value}), axis.field))
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=f"{axis.field}={value!r}: {e.errors()[0]['msg']}")
+    return axis.field, checked
+
+@app.post("/predict/whatif", response_model=WhatIfResponse)
+def predict_whatif(request: WhatIfRequest):
     """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
+    Sensitivity sweep: varies one or two fields of a base profile over a grid,
+    scores every grid point in one predict_batch call and returns the score
+    grid plus each field's marginal effect curve.
     """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
+    if not pipeline:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    base = request.profile.dict()
+    axes = [validate_axis(base, axis) for axis in request.vary]
+    if len(axes) == 2 and axes[0][0] == axes[1][0]:
+        raise HTTPException(status_code=422, detail="The two varied fields must differ")
+    shape = tuple(len(values) for _, values in axes)
+    if int(np.prod(shape)) > MAX_GRID_POINTS:
+        raise HTTPException(status_code=422, detail=f"Grid has more than {MAX_GRID_POINTS} points")
+
+    start = time.perf_counter()
+    columns = expand_grid(base, axes)
+    try:
+        scores = pipeline.predict_batch(columns)
+    except Exception as e:
+        count_predictions("predict_whatif", len(columns[axes[0][0]]), failed=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    observe_stage("whatif_predict", time.perf_counter() - start)
+    count_predictions("predict_whatif", len(scores))
+
+    grid = np.asarray(scores[:-1], dtype=float).reshape(shape)
+    return {
+        "base_score": float(scores[-1]),
+        "fields": [field for field, _ in axes],
+        "values": [values for _, values in axes],
+        "scores": grid.tolist(),
+        "marginal": marginal_curves(grid, axes),
+    }
+
+def score_stream_batch(parsed):
     """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
+    Scores one chunk of a streamed upload. `parsed` holds (line, row, parse_error)
+    triples; returns one output record per input row, keyed by the line it starts
+    on, with problems reported in 'error' instead of failing the job.
     """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
+    rows = [row for _, row, error in parsed if error is None]
+    valid_indices, valid_records, errors = validate_rows(rows)
+
+    batch_error = None
+    try:
+        scores = dict(zip(valid_indices, pipeline.predict_batch(valid_records)))
+        count_predictions("predict_stream", len(valid_records))
+    except Exception as e:
+        scores, batch_error = {}, str(e)
+        count_predictions("predict_stream", len(valid_records), failed=True)
+
+    results, j = [], 0
+    for line, row, error in parsed:
+        result = {
+            "row": line,
+            "student_id": row.get("student_id") if row else None,
+            "exam_score": None,
+            "pass_probability": None,
+            "error": error,
+        }
+        if error is None:
+            if j in errors:
+                result["error"] = "; ".join(errors[j])
+            elif j in scores:
+                prediction = build_prediction(float(scores[j]))
+                result["exam_score"] = prediction["exam_score"]
+                result["pass_probability"] = prediction["pass_probability"]
+            else:
+                result["error"] = batch_error
+            j += 1
+        results.append(result)
+    return results
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request, output: str = "csv", batch_size: int = 5000):
     """
-    Helper method to cleanse missing values and drop unneeded columns.
-    """def load_model():
+    Bulk scoring for CSV (default) or NDJSON uploads (Content-Type: application/x-ndjson).
+    The body is read in chunks and results are streamed back as CSV or NDJSON
+    (?output=ndjson) while the upload is still arriving.
     """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
+    if not pipeline:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if output not in ("csv", "ndjson"):
+        raise HTTPException(status_code=422, detail="output must be 'csv' or 'ndjson'")
+    if not 1 <= batch_size <= 50000:
+        raise HTTPException(status_code=422, detail="batch_size must be between 1 and 50000")
+
+    content_type = request.headers.get("content-type", "")
+    input_format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+
+    return UploadStreamingResponse(
+        stream_scores(request.stream(), score_stream_batch, input_format, output, batch_size),
+        media_type="application/x-ndjson" if output == "ndjson" else "text/csv",
+    )
+
+@app.get("/stats")
+def stats():
+    return {
+        "batching": batcher.stats() if batcher is not None else None,
+        "cache": prediction_cache.stats() if prediction_cache is not None else None,
+        "latency": metrics.quantiles("predict_stage_seconds") if METRICS_ENABLED else None,
+    }
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """
+    Prometheus text exposition of request, stage-latency and prediction metrics,
+    plus the serving model version and cache statistics sampled at scrape time.
+    """
+    extra = [
+        ("model_info", "gauge", "Serving model version (value is always 1).",
+         [({"model_version": active_version()}, 1)]),
+        ("model_ready", "gauge", "1 once the model is loaded and warmed up.", [({}, int(ready))]),
+    ]
+    if prediction_cache is not None:
+        cache_stats = prediction_cache.stats()
+        for field in ("hits", "misses", "evictions", "expirations", "invalidations"):
+            extra.append((f"prediction_cache_{field}_total", "counter", f"Prediction cache {field}.",
+                          [({}, cache_stats[field])]))
+        extra.append(("prediction_cache_size", "gauge", "Entries in the prediction cache.",
+                      [({}, cache_stats["size"])]))
+    return PlainTextResponse(metrics.render(extra), media_type="text/plain; version=0.0.4")
+
+@app.get("/model")
+def model_info():
     """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
+    The serving model version, when and how fast it loaded, and the previous
+    version held in memory for rollback.
     """
-    Initializes model parameters and defines hyperparameter tuning heuristics.
-    """def load_model():
-    global pipeline
-    try:
-        # Assuming running from root
-        model_dir = "models"
-        if not os.path.exists(model_dir):
-            model_dir = os.path.join("..", "..", "models") # If running from app/backend (not likely with uvicorn root)
-            
-        pipeline = PredictPipeline(model_dir=model_dir)
-        print("Model loaded successfully.")
-    except Exception as e:
-        print(f"Failed to load model: {e}")
-        # Dont crash, just fail requests later
-        
-@app.get("/")
-def home():
-    return {"message": "Exam Score Prediction API is running. Use /predict to get scores."}
+    if reloader is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    return reloader.status()
 
-@app.post("/predict", response_model=PredictionResponse)
-def predict_score(profile: StudentProfile):
-    if not pipeline:
+@app.post("/model/rollback")
+def rollback_model():
+    if reloader is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
-    
     try:
-        # Convert Pydantic model to dict
-        input_data = profile.dict()
-        
-        # Predict
-        score = pipeline.predict(input_data)
-        
-        # Simple Logic for 'Pass Probability' (Mock logic since regression doesn't give prob implicitly without errors)
-        # E.g. if score > 40 is pass
-        pass_prob = min(1.0, max(0.0, (score - 20) / 80)) # Mock sigmoid-ish
-        
-        return {
-            "exam_score": score, 
-            "confidence_level": "High" if 0 <= score <= 100 else "Low (Outlier)",
-            "pass_probability": round(pass_prob, 2)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        reloader.rollback()
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return reloader.status()
 
 @app.get("/feature_importance")
-def feature_importance():
+def feature_importance(request: Request):
     try:
-        from src.explainability import get_feature_importance
-        # Adjust paths based on where main.py is (app/backend) vs root
-        # We need to point to root models/data
-        data = get_feature_importance(model_dir="models", data_dir="data")
-        return data
+        cache = refresh_feature_importance()
     except Exception as e:
         print(f"Error fetching importance: {e}")
         return []
 
+    # Clients revalidate every time, but an unchanged model costs them only a 304
+    headers = {"Cache-Control": "no-cache"}
+    if cache["etag"]:
+        headers["ETag"] = cache["etag"]
+        if_none_match = request.headers.get("if-none-match", "")
+        if cache["etag"] in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+    return JSONResponse(cache["data"], headers=headers)
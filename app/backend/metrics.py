@@ -0,0 +1,168 @@
+import bisect
+import threading
+import time
+
+# Latency buckets (seconds) from 5 us to 10 s, dense enough for useful p50/p95/p99
+DEFAULT_BUCKETS = (
+    5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+    1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+class Histogram:
+    """
+    Cumulative-bucket latency histogram. Observing is a binary search and two
+    additions under a lock, cheap enough to leave on for every request.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1) # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """
+        Estimates the q-quantile by linear interpolation inside its bucket, the
+        same way Prometheus' histogram_quantile() does.
+        """
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if total == 0:
+            return 0.0
+        rank, seen = q * total, 0
+        for i, n in enumerate(counts):
+            if seen + n >= rank and n > 0:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+class MetricsRegistry:
+    """
+    Minimal in-process Prometheus registry: labelled counters and histograms,
+    rendered in the text exposition format by `render()`.
+    """
+    def __init__(self):
+        self._meta = {}
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, metric_type, help_text):
+        self._meta[name] = (metric_type, help_text)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def histogram(self, name, **labels):
+        """
+        Returns the histogram for this name and label set, creating it on first use.
+        Callers on a hot path can keep the result and call observe() on it directly.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        hist = self._histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(key, Histogram())
+        return hist
+
+    def observe(self, name, value, **labels):
+        self.histogram(name, **labels).observe(value)
+
+    def quantiles(self, name, qs=(0.5, 0.95, 0.99)):
+        """
+        {label string: {"p50": ..., "p95": ..., "p99": ..., "count": ...}} for one histogram family.
+        """
+        result = {}
+        for (hist_name, labels), hist in sorted(self._histograms.items()):
+            if hist_name != name:
+                continue
+            summary = {f"p{int(q * 100)}": hist.quantile(q) for q in qs}
+            summary["count"] = hist.count
+            result[",".join(f"{k}={v}" for k, v in labels)] = summary
+        return result
+
+    def render(self, extra=()):
+        """
+        Prometheus text format. `extra` is an iterable of (name, type, help, [(labels, value), ...])
+        for values sampled at scrape time, such as cache statistics.
+        """
+        families = {}
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = list(self._histograms.items())
+        for (name, labels), value in counters:
+            families.setdefault(name, []).append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), hist in histograms:
+            with hist._lock:
+                counts, total, count = list(hist.counts), hist.sum, hist.count
+            lines = families.setdefault(name, [])
+            cumulative = 0
+            for bound, n in zip(hist.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        out = []
+        for name in sorted(families):
+            metric_type, help_text = self._meta.get(name, ("untyped", ""))
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {metric_type}")
+            out.extend(families[name])
+        for name, metric_type, help_text, samples in extra:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {metric_type}")
+            out.extend(f"{name}{_format_labels(tuple(sorted(labels.items())))} {value}" for labels, value in samples)
+        return "\n".join(out) + "\n"
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests by route, method and status and timing
+    them end to end. The start time is left in scope["state"] so handlers can
+    measure how long routing, body parsing and validation took before they ran.
+    """
+    def __init__(self, app, registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        scope.setdefault("state", {})["request_start"] = start
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template, not raw path, to keep cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            self.registry.observe("http_request_duration_seconds", time.perf_counter() - start, path=path)
+            self.registry.inc("http_requests_total", method=scope["method"], path=path, status=str(status["code"]))
@@ -0,0 +1,179 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.registry import get_current, set_current, verify_version, version_dir
+
+class LoadedModel:
+    """
+    A pipeline held in memory together with where it came from. `version` is
+    None for unversioned artifacts loaded straight from the registry root.
+    """
+    def __init__(self, version, path, pipeline, load_seconds):
+        self.version = version
+        self.path = path
+        self.pipeline = pipeline
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+
+    def info(self):
+        return {
+            "version": self.version,
+            "path": self.path,
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+        }
+
+# A version that failed to load for a reason other than a checksum mismatch
+# (e.g. a memory error or a dependency problem) is retried after this many
+# seconds, doubling per failure up to the maximum
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 300.0
+
+class ModelReloader:
+    """
+    Hot-swaps the serving model when the registry's CURRENT pointer moves.
+
+    A background thread polls CURRENT every `poll_seconds`. A new version is
+    verified and loaded with `load_fn(path)` on that thread while requests keep
+    using the old pipeline; `install_fn(model)` then swaps it in, which for the
+    API is a single reference assignment. The model it replaced stays in memory
+    so `rollback()` is instant.
+
+    A version whose artifacts don't match its manifest is never retried, since
+    published versions don't change; any other load failure is retried with
+    exponential backoff.
+    """
+    def __init__(self, registry_dir, load_fn, install_fn, poll_seconds=5.0, clock=time.monotonic):
+        self.registry_dir = registry_dir
+        self.load_fn = load_fn
+        self.install_fn = install_fn
+        self.poll_seconds = poll_seconds
+        self.clock = clock
+
+        self.active = None
+        self.previous = None
+        self.last_error = None
+        self.n_reloads = 0
+        self.n_rollbacks = 0
+
+        # Versions not to load again: corrupt ones, and ones rolled back from
+        self._ignored = set()
+        # {version: (failed attempts, clock time of the next retry)}
+        self._retries = {}
+        # Serializes check/load/rollback; requests never take it
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None and self.poll_seconds > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="model-reloader", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Model reload check failed: {e}")
+
+    def check(self):
+        """
+        Loads the version CURRENT points at if it isn't already active.
+        Returns True if a new model was swapped in.
+        """
+        with self._lock:
+            version = get_current(self.registry_dir)
+            if version is None or version in self._ignored:
+                return False
+            if self.active is not None and version == self.active.version:
+                return False
+            if version in self._retries and self.clock() < self._retries[version][1]:
+                return False
+            return self.load(version)
+
+    def load(self, version=None):
+        """
+        Loads `version` (or the unversioned artifacts in the registry root when
+        None) and swaps it in. A failed load leaves the active model untouched.
+        """
+        path = self.registry_dir if version is None else version_dir(self.registry_dir, version)
+        start = time.perf_counter()
+        try:
+            if version is not None:
+                verify_version(self.registry_dir, version)
+        except ValueError as e:
+            # Missing or modified artifacts: retrying can't fix an immutable version
+            self._ignored.add(version)
+            self.last_error = f"{version}: {e}"
+            print(f"Not loading model version {version}: {e}")
+            return False
+        except Exception as e:
+            return self._retry_later(version, e)
+
+        try:
+            pipeline = self.load_fn(path)
+        except Exception as e:
+            return self._retry_later(version, e)
+        self._retries.pop(version, None)
+
+        model = LoadedModel(version, path, pipeline, time.perf_counter() - start)
+        with self._lock:
+            self.previous, self.active = self.active, model
+            self.install_fn(model)
+            self.n_reloads += 1
+        self.last_error = None
+        print(f"Serving model version {version} (loaded in {model.load_seconds:.2f}s)")
+        return True
+
+    def _retry_later(self, version, error):
+        attempts = self._retries.get(version, (0, None))[0] + 1
+        delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+        self._retries[version] = (attempts, self.clock() + delay)
+        self.last_error = f"{version}: {error}"
+        print(f"Failed to load model version {version} (attempt {attempts}, retrying in {delay:.0f}s): {error}")
+        return False
+
+    def rollback(self):
+        """
+        Swaps the previous in-memory model back in. CURRENT is moved back too, so
+        other workers follow and the poller doesn't redeploy the version just left.
+        Raises ValueError if there is no previous model.
+        """
+        with self._lock:
+            if self.previous is None:
+                raise ValueError("No previous model version in memory")
+            left = self.active
+            self.active, self.previous = self.previous, self.active
+            self.install_fn(self.active)
+            self.n_rollbacks += 1
+
+            if self.active.version is not None:
+                set_current(self.registry_dir, self.active.version)
+            elif left.version is not None:
+                self._ignored.add(left.version)
+        print(f"Rolled back from model version {left.version} to {self.active.version}")
+        return self.active
+
+    def status(self) -> dict:
+        return {
+            "active": self.active.info() if self.active is not None else None,
+            "previous": self.previous.info() if self.previous is not None else None,
+            "current_pointer": get_current(self.registry_dir),
+            "poll_seconds": self.poll_seconds,
+            "reloads": self.n_reloads,
+            "rollbacks": self.n_rollbacks,
+            "last_error": self.last_error,
+        }
@@ -1,20 +1,86 @@
 from pydantic import BaseModel, Field
-from typing import Literal
+from typing import Any, Dict, List, Literal, Optional
 
 class StudentProfile(BaseModel):
     age: int = Field(..., ge=10, le=100, description="Age of the student")
     gender: Literal['male', 'female', 'other']
-    course: Literal['diploma', 'undergraduate', 'postgraduate', 'phd', 'certificate', 'professional', 'vocational']
+    # Dashboard values plus the categories present in the training data
+    course: Literal['diploma', 'undergraduate', 'postgraduate', 'phd', 'certificate', 'professional', 'vocational',
+                    'b.com', 'b.sc', 'b.tech', 'ba', 'bba', 'bca']
     study_hours: float = Field(..., ge=0, le=24, description="Daily study hours")
     class_attendance: float = Field(..., ge=0, le=100, description="Attendance percentage")
     internet_access: Literal['yes', 'no']
     sleep_hours: float = Field(..., ge=0, le=24, description="Daily sleep hours")
     sleep_quality: Literal['poor', 'average', 'good']
-    study_method: Literal['coaching', 'self-study', 'group-study', 'online', 'tutoring']
-    facility_rating: Literal['low', 'moderate', 'high']
+    study_method: Literal['coaching', 'self-study', 'group-study', 'online', 'tutoring',
+                          'group study', 'mixed', 'online videos']
+    facility_rating: Literal['low', 'moderate', 'high', 'medium']
     exam_difficulty: Literal['hard', 'moderate', 'easy']
 
 class PredictionResponse(BaseModel):
     exam_score: float
     confidence_level: str = "High" # Placeholder for now, could be derived from probability if applicable
     pass_probability: float = 0.0 # Placeholder
+
+class BatchPredictionRequest(BaseModel):
+    # Either a list of StudentProfile-shaped dicts or a columnar mapping of field -> values.
+    # Rows are validated individually so one bad row doesn't reject the whole batch.
+    profiles: Optional[List[Dict[str, Any]]] = None
+    columns: Optional[Dict[str, List[Any]]] = None
+
+class BatchPredictionItem(BaseModel):
+    index: int
+    exam_score: Optional[float] = None
+    confidence_level: Optional[str] = None
+    pass_probability: Optional[float] = None
+    errors: Optional[List[str]] = None
+
+class BatchPredictionResponse(BaseModel):
+    results: List[BatchPredictionItem]
+    n_valid: int
+    n_invalid: int
+
+class FeatureContribution(BaseModel):
+    feature: str
+    value: Optional[Any] = None # Input value; computed for derived features like study_efficiency
+    contribution: float
+
+class ExplanationResponse(PredictionResponse):
+    # exam_score = base_value + sum of contributions (up to rounding)
+    base_value: float
+    contributions: List[FeatureContribution]
+
+class BatchExplanationItem(BatchPredictionItem):
+    contributions: Optional[List[FeatureContribution]] = None
+
+class BatchExplanationResponse(BaseModel):
+    results: List[BatchExplanationItem]
+    base_value: Optional[float] = None
+    n_valid: int
+    n_invalid: int
+
+class SweepAxis(BaseModel):
+    # Either explicit `values` (numbers or categories) or a numeric start/stop range
+    field: str
+    values: Optional[List[Any]] = Field(None, min_length=1)
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    steps: int = Field(20, ge=1, le=1000)
+
+class WhatIfRequest(BaseModel):
+    profile: StudentProfile
+    vary: List[SweepAxis] = Field(..., min_length=1, max_length=2)
+
+class MarginalCurve(BaseModel):
+    field: str
+    values: List[Any]
+    mean_score: List[float] # Averaged over the other varied field, if any
+    effect: Optional[List[float]] = None # d(score)/d(field) for numeric fields
+
+class WhatIfResponse(BaseModel):
+    base_score: float
+    fields: List[str]
+    values: List[List[Any]]
+    # scores[i] for one field, scores[i][j] for two (first field by row)
+    scores: List[Any]
+    marginal: List[MarginalCurve]
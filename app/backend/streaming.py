@@ -0,0 +1,176 @@
+import codecs
+import csv
+import io
+import json
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+OUTPUT_COLUMNS = ["row", "student_id", "exam_score", "pass_probability", "error"]
+
+# A CSV record whose quoted field is still open after this many characters is
+# reported as an error instead of buffering the rest of the upload
+MAX_RECORD_CHARS = 1 << 20
+
+class LineSplitter:
+    """
+    Incrementally decodes UTF-8 byte chunks and yields complete lines, holding at
+    most one partial line between chunks. Blank lines are kept so that callers
+    can count lines.
+    """
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+        self._first = True
+
+    def feed(self, chunk: bytes):
+        text = self._partial + self._decoder.decode(chunk)
+        if self._first and text:
+            text = text.lstrip("\ufeff") # Excel exports often start with a BOM
+            self._first = False
+        lines = text.split("\n")
+        self._partial = lines.pop()
+        return [line.rstrip("\r") for line in lines]
+
+    def close(self):
+        tail = (self._partial + self._decoder.decode(b"", final=True)).rstrip("\r")
+        self._partial = ""
+        return [tail] if tail else []
+
+class CSVRowParser:
+    """
+    Parses CSV lines into dicts; the first record is the header. A quoted field
+    may span lines. Returns (line, row_dict, error) triples, where `line` is the
+    1-based line of the upload the record starts on; blank lines are skipped
+    but counted.
+    """
+    def __init__(self):
+        self.header = None
+        self._line = 0
+        self._record, self._start, self._size, self._quotes = [], None, 0, 0
+
+    def _parse_record(self):
+        text = "\n".join(self._record)
+        self._record, self._size, self._quotes = [], 0, 0
+        return next(csv.reader([text]))
+
+    def parse(self, lines):
+        parsed = []
+        for line in lines:
+            self._line += 1
+            if not self._record:
+                if not line.strip():
+                    continue
+                self._start = self._line
+            self._record.append(line)
+            self._size += len(line)
+            self._quotes += line.count('"')
+            if self._quotes % 2: # Inside a quoted field that continues on the next line
+                if self._size > MAX_RECORD_CHARS:
+                    self._record, self._size, self._quotes = [], 0, 0
+                    parsed.append((self._start, None, "unterminated quoted field"))
+                continue
+
+            fields = self._parse_record()
+            if self.header is None:
+                self.header = [name.strip() for name in fields]
+            elif len(fields) != len(self.header):
+                parsed.append((self._start, None, f"expected {len(self.header)} fields, got {len(fields)}"))
+            else:
+                parsed.append((self._start, dict(zip(self.header, fields)), None))
+        return parsed
+
+    def close(self):
+        if not self._record:
+            return []
+        self._record, self._size, self._quotes = [], 0, 0
+        return [(self._start, None, "unterminated quoted field")]
+
+class NDJSONRowParser:
+    """
+    Parses one JSON object per line. Returns (line, row_dict, error) triples;
+    blank lines are skipped but counted.
+    """
+    def __init__(self):
+        self._line = 0
+
+    def parse(self, lines):
+        parsed = []
+        for line in lines:
+            self._line += 1
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                parsed.append((self._line, None, f"invalid JSON: {e.msg}"))
+                continue
+            if not isinstance(row, dict):
+                parsed.append((self._line, None, "each line must be a JSON object"))
+            else:
+                parsed.append((self._line, row, None))
+        return parsed
+
+    def close(self):
+        return []
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body generator is still reading the request body.
+
+    The stock response runs a disconnect listener that consumes (and discards)
+    incoming body messages under ASGI < 2.4, starving the generator. Here the
+    generator owns `receive`: a client disconnect surfaces as ClientDisconnect
+    from request.stream() instead.
+    """
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+def format_results(results, output_format, include_header=False):
+    """
+    Serializes result dicts (keys from OUTPUT_COLUMNS) as CSV or NDJSON text.
+    """
+    if output_format == "ndjson":
+        return "".join(json.dumps(r) + "\n" for r in results)
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=OUTPUT_COLUMNS, lineterminator="\n")
+    if include_header:
+        writer.writeheader()
+    writer.writerows(results)
+    return buffer.getvalue()
+
+async def stream_scores(byte_chunks, score_batch, input_format="csv", output_format="csv", batch_size=5000):
+    """
+    Consumes an async iterator of request-body bytes and yields scored output as
+    it goes. Parsed (line, row, error) triples are scored `batch_size` at a time
+    with `score_batch(parsed)`, which returns one result dict per row; memory is
+    bounded by one batch.
+    """
+    splitter = LineSplitter()
+    parser = NDJSONRowParser() if input_format == "ndjson" else CSVRowParser()
+    pending = []
+
+    if output_format == "csv":
+        yield format_results([], output_format, include_header=True)
+
+    async def flush():
+        nonlocal pending
+        batch, pending = pending, []
+        results = await run_in_threadpool(score_batch, batch)
+        return format_results(results, output_format)
+
+    async for chunk in byte_chunks:
+        pending.extend(parser.parse(splitter.feed(chunk)))
+        while len(pending) >= batch_size:
+            overflow = pending[batch_size:]
+            pending = pending[:batch_size]
+            yield await flush()
+            pending = overflow
+
+    pending.extend(parser.parse(splitter.close()))
+    pending.extend(parser.close())
+    if pending:
+        yield await flush()
@@ -0,0 +1,63 @@
+import numpy as np
+
+# Upper bound on grid points per what-if request (e.g. 100 x 100 = 10,000)
+MAX_GRID_POINTS = 250_000
+
+def axis_values(values=None, start=None, stop=None, steps=20, integer=False):
+    """
+    The grid along one axis: explicit `values` as given, otherwise `steps`
+    evenly spaced points from `start` to `stop` inclusive. Integer fields are
+    rounded and deduplicated, so a range over `age` never asks for age 20.5.
+    """
+    if values is not None:
+        return list(values)
+    if start is None or stop is None:
+        raise ValueError("Give either 'values' or both 'start' and 'stop'")
+    grid = np.linspace(start, stop, steps)
+    if integer:
+        return [int(v) for v in dict.fromkeys(np.round(grid).astype(int))]
+    return [round(float(v), 6) for v in grid]
+
+def expand_grid(base, axes):
+    """
+    Columnar input for every combination of the axis values, the first axis
+    varying slowest, with all other fields held at the base profile's value.
+    The base profile itself is appended as the last row, so the whole sweep
+    is a single predict_batch call.
+
+    Args:
+        base (dict): Validated base profile.
+        axes (list[tuple[str, list]]): (field, values) for one or two fields.
+    Returns:
+        dict: field -> array of length prod(len(values)) + 1, ready for predict_batch.
+    """
+    shape = [len(values) for _, values in axes]
+    n_points = int(np.prod(shape))
+    columns = {field: np.full(n_points + 1, value) for field, value in base.items()}
+    # Per-axis positions of every point, flattened in C order like the score matrix
+    index = np.indices(shape).reshape(len(shape), n_points)
+    for k, (field, values) in enumerate(axes):
+        columns[field] = np.append(np.asarray(values)[index[k]], base[field])
+    return columns
+
+def marginal_curves(scores, axes):
+    """
+    One curve per varied field: the score averaged over the other axis (or the
+    score itself for a single axis) and, for numeric fields, its slope, i.e.
+    the change in score per unit of the field by finite differences.
+    """
+    curves = []
+    for k, (field, values) in enumerate(axes):
+        other = tuple(i for i in range(scores.ndim) if i != k)
+        mean_score = scores.mean(axis=other) if other else scores
+        numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values)
+        effect = None
+        if numeric and len(values) > 1 and len(set(values)) == len(values):
+            effect = [round(float(v), 4) for v in np.gradient(mean_score, np.asarray(values, dtype=float))]
+        curves.append({
+            "field": field,
+            "values": list(values),
+            "mean_score": [round(float(v), 4) for v in mean_score],
+            "effect": effect,
+        })
+    return curves
@@ -0,0 +1,46 @@
+"""
+Batch vs. per-row scoring with PredictPipeline.
+
+Usage (from repo root):
+    python benchmarks/bench_batch_predict.py [--sizes 1 100 10000 100000] [--loop-cap 2000]
+
+The per-row loop is timed on at most --loop-cap rows and extrapolated linearly,
+since looping 100k single-row predictions takes minutes.
+"""
+import argparse
+import warnings
+
+from common import MODEL_DIR, format_seconds, sample_profiles, time_call
+
+from src.predict_pipeline import PredictPipeline
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10_000, 100_000])
+    parser.add_argument("--loop-cap", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    pipeline = PredictPipeline(model_dir=MODEL_DIR)
+
+    print(f"{'rows':>8} | {'loop':>12} | {'batch':>12} | {'speedup':>8}")
+    print("-" * 50)
+    for n_rows in args.sizes:
+        profiles = sample_profiles(n_rows)
+
+        loop_rows = profiles[:args.loop_cap]
+        loop = time_call(lambda: [pipeline.predict(p) for p in loop_rows], repeat=min(args.repeat, 3))
+        loop_total = loop["median"] * n_rows / len(loop_rows)
+
+        batch = time_call(lambda: pipeline.predict_batch(profiles), repeat=args.repeat)
+        batch_total = batch["median"]
+
+        extrapolated = "*" if len(loop_rows) < n_rows else " "
+        print(f"{n_rows:>8} | {format_seconds(loop_total):>11}{extrapolated} | "
+              f"{format_seconds(batch_total):>12} | {loop_total / batch_total:>7.1f}x")
+
+    print("\n* per-row loop extrapolated from --loop-cap rows")
+
+if __name__ == "__main__":
+    main()
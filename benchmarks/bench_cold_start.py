@@ -0,0 +1,88 @@
+"""
+Cold-start latency of the API: time from launching uvicorn to the first
+successful response of each kind.
+
+Usage (from repo root):
+    python benchmarks/bench_cold_start.py [--runs 5] [--port 8766]
+
+Each run starts a fresh server process and polls it every few milliseconds.
+Reported milestones, measured from process start:
+    live        GET /         returns 200 (process is serving)
+    ready       GET /ready    returns 200 (model loaded and warmed up)
+    prediction  POST /predict returns 200
+"""
+import argparse
+import http.client
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from common import ROOT, format_seconds
+
+PROFILE = {
+    "age": 21, "gender": "male", "course": "bca", "study_hours": 3.5,
+    "class_attendance": 75.0, "internet_access": "yes", "sleep_hours": 6.5,
+    "sleep_quality": "average", "study_method": "coaching", "facility_rating": "medium",
+    "exam_difficulty": "hard",
+}
+
+def request_status(port, method, path, body=None):
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        conn.request(method, path, body=body, headers=headers)
+        status = conn.getresponse().status
+        conn.close()
+        return status
+    except OSError:
+        return None
+
+def measure_once(port, timeout=120, poll_interval=0.005):
+    body = json.dumps(PROFILE)
+    checks = {
+        "live": ("GET", "/", None),
+        "ready": ("GET", "/ready", None),
+        "prediction": ("POST", "/predict", body),
+    }
+    reached = {}
+
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while len(reached) < len(checks):
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError(f"server did not reach {sorted(set(checks) - set(reached))}")
+            for name, (method, path, payload) in checks.items():
+                if name not in reached and request_status(port, method, path, payload) == 200:
+                    reached[name] = time.perf_counter() - start
+            time.sleep(poll_interval)
+    finally:
+        server.terminate()
+        server.wait()
+    return reached
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    results = []
+    for i in range(args.runs):
+        reached = measure_once(args.port)
+        results.append(reached)
+        print(f"run {i + 1}: " + ", ".join(f"{k} {format_seconds(v)}" for k, v in reached.items()))
+
+    print(f"\nMedian over {args.runs} runs (from process start):")
+    for name in ("live", "ready", "prediction"):
+        values = [r[name] for r in results]
+        print(f"  {name:<11} {format_seconds(statistics.median(values)):>10}   "
+              f"(min {format_seconds(min(values))}, max {format_seconds(max(values))})")
+
+if __name__ == "__main__":
+    main()
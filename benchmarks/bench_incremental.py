@@ -0,0 +1,79 @@
+"""
+Incremental model updates vs a full retrain as the history grows.
+
+Usage (from repo root):
+    python benchmarks/bench_incremental.py [--history-rows 16000 160000 1600000] [--new-rows 4000]
+
+For each history size, rows are resampled from the dataset into a history CSV
+and a "new term" CSV; 5% of the new rows get a course the model has never
+seen. A LinearRegression is fitted on the history's training split and
+published to a temporary registry. Then src/incremental.py updates it from
+the new term's rows only, and the report compares it with a full retrain
+(re-reading the history CSV and refitting preprocessing + LinearRegression on
+everything), all scored on the same held-out rows.
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import warnings
+
+import joblib
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from common import DATA_PATH, format_seconds
+
+from src.incremental import full_retrain, incremental_update
+from src.registry import publish_version
+
+def make_registry(work_dir, history):
+    history_train, _ = train_test_split(history, test_size=0.2, random_state=42)
+    preprocessor, model, _ = full_retrain(history_train)
+    source = os.path.join(work_dir, "source")
+    os.makedirs(source)
+    joblib.dump(preprocessor, os.path.join(source, "preprocessing_pipeline.pkl"))
+    joblib.dump(model, os.path.join(source, "best_model.pkl"))
+    registry = os.path.join(work_dir, "registry")
+    publish_version(registry, source)
+    return registry
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history-rows", type=int, nargs="+", default=[16_000, 160_000, 1_600_000])
+    parser.add_argument("--new-rows", type=int, default=4000)
+    parser.add_argument("--chunksize", type=int, default=1000)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    df = pd.read_csv(DATA_PATH)
+    print(f"{'history':>10} | {'new':>6} | {'incremental':>12} | {'full retrain':>12} | {'speedup':>8} | "
+          f"{'R² prev':>8} | {'R² incr':>8} | {'R² full':>8}")
+    print("-" * 96)
+
+    for n_history in args.history_rows:
+        work_dir = tempfile.mkdtemp(prefix="bench_incremental_")
+        try:
+            history = df.sample(n=n_history, replace=n_history > len(df), random_state=1)
+            new = df.sample(n=args.new_rows, replace=True, random_state=2).reset_index(drop=True)
+            new.loc[new.sample(frac=0.05, random_state=3).index, "course"] = "b.arch"
+            history_path, new_path = os.path.join(work_dir, "history.csv"), os.path.join(work_dir, "new.csv")
+            history.to_csv(history_path, index=False)
+            new.to_csv(new_path, index=False)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                registry = make_registry(work_dir, history)
+                report = incremental_update(new_path, registry_dir=registry, chunksize=args.chunksize,
+                                            history_path=history_path, publish=False)
+
+            incremental, full, previous = report["incremental"], report["full_retrain"], report["previous"]
+            print(f"{n_history:>10,} | {report['new_rows']:>6,} | {format_seconds(incremental['seconds']):>12} | "
+                  f"{format_seconds(full['seconds']):>12} | {full['seconds'] / incremental['seconds']:>7.1f}x | "
+                  f"{previous['Test_R2']:>8.4f} | {incremental['Test_R2']:>8.4f} | {full['Test_R2']:>8.4f}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Memory and load time of the raw dataset: pd.read_csv with inferred dtypes vs.
+src.utils.load_data with the declared schema (categoricals, narrow numerics),
+with and without the binary Arrow cache.
+
+Usage (from repo root):
+    python benchmarks/bench_loading.py [--rows 20000 10000000] [--workdir /tmp/loading_bench]
+
+Files larger than the real dataset are generated with src/synthetic.py.
+Each load runs in a fresh subprocess so its VmHWM is that load's peak RSS
+(Linux only); "frame" is DataFrame.memory_usage(deep=True).
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from common import DATA_PATH, ROOT
+
+from src.synthetic import generate
+
+LOADERS = {
+    "read_csv": "df = pd.read_csv(path)",
+    "typed": "df = load_data(path, cache_dir=None, verbose=False)",
+    "typed + write cache": "df = load_data(path, cache_dir=cache_dir, verbose=False)",
+    "typed from cache": "df = load_data(path, cache_dir=cache_dir, verbose=False)",
+}
+
+CHILD = """
+import json, sys, time
+sys.path.append({root!r})
+import pandas as pd
+from src.utils import load_data
+path, cache_dir = {path!r}, {cache_dir!r}
+start = time.perf_counter()
+{stmt}
+elapsed = time.perf_counter() - start
+frame = int(df.memory_usage(deep=True).sum())
+# VmHWM (unlike ru_maxrss) resets on exec, so it excludes the parent's footprint
+hwm = [int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmHWM:")][0]
+print(json.dumps({{"seconds": elapsed, "frame_mb": frame / 2**20, "max_rss_mb": hwm / 1024}}))
+"""
+
+def write_dataset(n_rows, workdir, seed=0):
+    if n_rows == 20_000:
+        return DATA_PATH
+    path = os.path.join(workdir, f"exam_{n_rows}.csv")
+    if not os.path.exists(path):
+        generate(path, n_rows, source_path=DATA_PATH, seed=seed)
+    return path
+
+def measure(path, cache_dir, stmt):
+    code = CHILD.format(root=ROOT, path=path, cache_dir=cache_dir, stmt=stmt)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[20_000, 10_000_000])
+    parser.add_argument("--workdir", default="/tmp/loading_bench")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    print(f"{'rows':>9} | {'loader':>19} | {'seconds':>8} | {'frame':>9} | {'peak RSS':>9}")
+    print("-" * 68)
+    for n_rows in args.rows:
+        path = write_dataset(n_rows, args.workdir)
+        cache_dir = os.path.join(args.workdir, f"cache_{n_rows}")
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        for name, stmt in LOADERS.items():
+            r = measure(path, cache_dir, stmt)
+            print(f"{n_rows:>9} | {name:>19} | {r['seconds']:>8.3f} | {r['frame_mb']:>6.1f} MB | "
+                  f"{r['max_rss_mb']:>6.0f} MB")
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Load time and peak RSS of processed feature matrices: CSV (pd.read_csv) vs.
+float32 .npy (memory-mapped via src.utils.load_matrix).
+
+Usage (from repo root):
+    python benchmarks/bench_matrix_io.py [--rows 20000 10000000] [--workdir /tmp/matrix_bench]
+
+Synthetic matrices have the real 31-column layout (5 scaled numerics + 26
+one-hot columns). Each load runs in a fresh subprocess so its VmHWM is that
+load's peak (Linux only). "mmap open" only maps the file; "mmap scan" also reads every value
+(a full pass such as model fitting makes).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from common import ROOT
+
+from src.utils import save_matrix
+
+N_NUMERIC, N_ONEHOT = 5, 26
+
+LOADERS = {
+    "import only": "pass",
+    "csv": "m = pd.read_csv(path.replace('.npy', '.csv')).to_numpy(); m.sum()",
+    "mmap open": "m, names = load_matrix(path)",
+    "mmap scan": "m, names = load_matrix(path); m.sum(axis=0, dtype=np.float64)",
+}
+
+CHILD = """
+import json, sys, time
+sys.path.append({root!r})
+import numpy as np, pandas as pd
+from src.utils import load_matrix
+path = {path!r}
+start = time.perf_counter()
+{stmt}
+elapsed = time.perf_counter() - start
+# VmHWM (unlike ru_maxrss) resets on exec, so it excludes the parent's footprint
+hwm = [int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmHWM:")][0]
+print(json.dumps({{"seconds": elapsed, "max_rss_mb": hwm / 1024}}))
+"""
+
+def write_matrices(n_rows, workdir, chunk_rows=500_000, seed=0):
+    """
+    Writes the same synthetic matrix as CSV (pandas default float64 text) and .npy,
+    chunk by chunk so generation itself stays within memory.
+    """
+    rng = np.random.default_rng(seed)
+    npy_path = os.path.join(workdir, f"X_{n_rows}.npy")
+    csv_path = npy_path.replace(".npy", ".csv")
+    names = [f"num__{i}" for i in range(N_NUMERIC)] + [f"cat__{i}" for i in range(N_ONEHOT)]
+
+    out = np.lib.format.open_memmap(npy_path + ".tmp.npy", mode="w+", dtype=np.float32,
+                                    shape=(n_rows, N_NUMERIC + N_ONEHOT))
+    with open(csv_path, "w") as f:
+        f.write(",".join(str(i) for i in range(len(names))) + "\n")
+        for start in range(0, n_rows, chunk_rows):
+            n = min(chunk_rows, n_rows - start)
+            block = np.zeros((n, N_NUMERIC + N_ONEHOT))
+            block[:, :N_NUMERIC] = rng.standard_normal((n, N_NUMERIC))
+            block[np.arange(n)[:, None], N_NUMERIC + rng.integers(0, N_ONEHOT, (n, 7))] = 1.0
+            pd.DataFrame(block).to_csv(f, header=False, index=False)
+            out[start:start + n] = block
+    out.flush()
+    save_matrix(npy_path, out, names)
+    del out
+    os.remove(npy_path + ".tmp.npy")
+    return npy_path
+
+def measure(path, stmt):
+    code = CHILD.format(root=ROOT, path=path, stmt=stmt)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[20_000, 10_000_000])
+    parser.add_argument("--workdir", default="/tmp/matrix_bench")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    print(f"{'rows':>9} | {'loader':>11} | {'seconds':>8} | {'peak RSS':>9} | {'file size':>9}")
+    print("-" * 60)
+    for n_rows in args.rows:
+        path = write_matrices(n_rows, args.workdir)
+        sizes = {"csv": os.path.getsize(path.replace(".npy", ".csv")), "npy": os.path.getsize(path)}
+        for name, stmt in LOADERS.items():
+            r = measure(path, stmt)
+            size = sizes["csv"] if name == "csv" else sizes["npy"] if name != "import only" else 0
+            print(f"{n_rows:>9} | {name:>11} | {r['seconds']:>8.3f} | {r['max_rss_mb']:>6.0f} MB | "
+                  f"{size / 2**20:>6.0f} MB")
+
+if __name__ == "__main__":
+    main()
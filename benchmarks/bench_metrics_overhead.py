@@ -0,0 +1,94 @@
+"""
+Cost of the latency instrumentation behind /metrics.
+
+Usage (from repo root):
+    python benchmarks/bench_metrics_overhead.py [--requests 3000]
+
+Measures:
+  1. Histogram.observe() on its own.
+  2. PredictPipeline.predict with and without a stage observer.
+  3. POST /predict through the full ASGI app (in-process TestClient) with
+     METRICS_ENABLED=1 vs 0, each in a fresh interpreter since the flag is read
+     at import. Runs alternate between the two settings and the median is
+     reported, as run-to-run noise is larger than the difference being measured.
+     The prediction cache is off so every request is scored.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import warnings
+
+from common import MODEL_DIR, ROOT, format_seconds, sample_profiles, time_call
+
+CHILD = r"""
+import json, os, sys, time, warnings
+warnings.filterwarnings("ignore")
+sys.path.insert(0, ROOT)
+from fastapi.testclient import TestClient
+import app.backend.main as main
+
+PROFILES = json.load(sys.stdin)
+
+with TestClient(main.app) as client:
+    for profile in PROFILES[:200]:
+        client.post("/predict", json=profile)
+    runs = []
+    for _ in range(3):
+        start = time.perf_counter()
+        for profile in PROFILES:
+            assert client.post("/predict", json=profile).status_code == 200
+        runs.append((time.perf_counter() - start) / len(PROFILES))
+print(json.dumps(sorted(runs)[1]))
+"""
+
+def request_latency(profiles, metrics_enabled):
+    env = dict(os.environ, METRICS_ENABLED="1" if metrics_enabled else "0", PREDICTION_CACHE_SIZE="0")
+    code = f"ROOT = {ROOT!r}\n" + CHILD
+    out = subprocess.run([sys.executable, "-c", code], input=json.dumps(profiles), cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def signed(seconds):
+    return ("+" if seconds >= 0 else "-") + format_seconds(abs(seconds))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=3, help="Alternating server runs per setting")
+    args = parser.parse_args()
+
+    from app.backend.metrics import Histogram, MetricsRegistry
+    from src.predict_pipeline import PredictPipeline
+
+    hist = Histogram()
+    observe = time_call(lambda: hist.observe(0.00042), repeat=5, number=100_000)
+    print(f"Histogram.observe:                 {format_seconds(observe['median'])}")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        pipeline = PredictPipeline(model_dir=MODEL_DIR)
+    profile = sample_profiles(1, seed=1)[0]
+    plain = time_call(lambda: pipeline.predict(profile), repeat=7, number=2000)
+
+    registry = MetricsRegistry()
+    pipeline.stage_observer = lambda stage, seconds: registry.observe("predict_stage_seconds", seconds, stage=stage)
+    timed = time_call(lambda: pipeline.predict(profile), repeat=7, number=2000)
+    print(f"PredictPipeline.predict, no timers: {format_seconds(plain['median'])}")
+    print(f"PredictPipeline.predict, timers:    {format_seconds(timed['median'])} "
+          f"({signed(timed['median'] - plain['median'])})")
+
+    profiles = sample_profiles(args.requests, seed=2)
+    runs = {False: [], True: []}
+    for _ in range(args.rounds):
+        for enabled in (False, True):
+            runs[enabled].append(request_latency(profiles, metrics_enabled=enabled))
+    off, on = statistics.median(runs[False]), statistics.median(runs[True])
+    print(f"POST /predict, metrics off:         {format_seconds(off)}")
+    print(f"POST /predict, metrics on:          {format_seconds(on)} "
+          f"({signed(on - off)}, {100 * (on - off) / off:+.1f}%)")
+
+if __name__ == "__main__":
+    main()
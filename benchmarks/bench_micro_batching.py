@@ -0,0 +1,72 @@
+"""
+Throughput of concurrent single-row predictions with and without the MicroBatcher.
+
+Usage (from repo root):
+    python benchmarks/bench_micro_batching.py [--clients 1 8 32 128] [--requests 4000] [--window-ms 2]
+
+Each client thread submits single rows back to back, like threadpool workers
+serving /predict. Also checks every batched score equals the single-row score.
+"""
+import argparse
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from common import MODEL_DIR, sample_profiles
+
+from app.backend.batching import MicroBatcher
+from src.predict_pipeline import PredictPipeline
+
+def run_clients(score_fn, profiles, n_clients):
+    chunks = [profiles[i::n_clients] for i in range(n_clients)]
+    barrier = threading.Barrier(n_clients + 1)
+
+    def client(rows):
+        barrier.wait()
+        return [score_fn(row) for row in rows]
+
+    with ThreadPoolExecutor(max_workers=n_clients) as pool:
+        futures = [pool.submit(client, rows) for rows in chunks]
+        barrier.wait()
+        start = time.perf_counter()
+        results = [f.result() for f in futures]
+        elapsed = time.perf_counter() - start
+
+    # Reassemble in input order
+    ordered = [None] * len(profiles)
+    for i, scores in enumerate(results):
+        ordered[i::n_clients] = scores
+    return ordered, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    pipeline = PredictPipeline(model_dir=MODEL_DIR)
+    profiles = sample_profiles(args.requests)
+    expected = [pipeline.predict(p) for p in profiles]
+
+    print(f"{'clients':>7} | {'direct req/s':>12} | {'batched req/s':>13} | {'mean batch':>10} | {'wait p50':>9} | {'wait p99':>9}")
+    print("-" * 78)
+    for n_clients in args.clients:
+        _, direct_elapsed = run_clients(pipeline.predict, profiles, n_clients)
+
+        batcher = MicroBatcher(pipeline.predict_batch, window_ms=args.window_ms,
+                               max_batch_size=args.max_batch_size).start()
+        scores, batched_elapsed = run_clients(lambda p: batcher.submit(p).result(), profiles, n_clients)
+        batcher.stop()
+
+        assert scores == expected, "batched scores differ from the single-row path"
+        stats = batcher.stats()
+        print(f"{n_clients:>7} | {len(profiles) / direct_elapsed:>12.0f} | {len(profiles) / batched_elapsed:>13.0f} | "
+              f"{stats['mean_batch_size']:>10.1f} | {stats['queue_wait']['p50'] * 1e3:>6.2f} ms | "
+              f"{stats['queue_wait']['p99'] * 1e3:>6.2f} ms")
+
+if __name__ == "__main__":
+    main()
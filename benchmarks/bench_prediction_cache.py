@@ -0,0 +1,79 @@
+"""
+Per-request latency of cached /predict scoring at different hit ratios.
+
+Usage (from repo root):
+    python benchmarks/bench_prediction_cache.py [--hit-ratios 0 0.5 0.9 0.99] [--requests 5000]
+
+Replays the /predict handler's cache logic in-process (make_key -> get ->
+predict on miss -> put) for both the compiled fast path and the sklearn path.
+"""
+import argparse
+import random
+import time
+import warnings
+
+from common import MODEL_DIR, format_seconds, sample_profiles
+
+from app.backend.cache import PredictionCache
+from src.predict_pipeline import PredictPipeline
+
+def build_workload(n_requests, hit_ratio, seed=0):
+    """
+    Request stream where roughly `hit_ratio` of requests repeat an earlier profile.
+    Fresh profiles are made unique by nudging study_hours.
+    """
+    rng = random.Random(seed)
+    fresh = sample_profiles(n_requests, seed=seed)
+    seen, workload = [], []
+    for i in range(n_requests):
+        if seen and rng.random() < hit_ratio:
+            workload.append(rng.choice(seen))
+        else:
+            profile = dict(fresh[i], study_hours=fresh[i]["study_hours"] + i * 1e-6)
+            seen.append(profile)
+            workload.append(profile)
+    return workload
+
+def replay(pipeline, cache, workload):
+    start = time.perf_counter()
+    for profile in workload:
+        key = cache.make_key(profile)
+        score = cache.get(key)
+        if score is None:
+            generation = cache.generation
+            score = pipeline.predict(profile)
+            cache.put(key, score, generation)
+    return (time.perf_counter() - start) / len(workload)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hit-ratios", type=float, nargs="+", default=[0.0, 0.5, 0.9, 0.99])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--cache-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    pipelines = {
+        "fast path": PredictPipeline(model_dir=MODEL_DIR),
+        "sklearn": PredictPipeline(model_dir=MODEL_DIR, fast_path=False),
+    }
+
+    print(f"{'path':>9} | {'target hit':>10} | {'actual hit':>10} | {'uncached':>10} | {'cached':>10}")
+    print("-" * 62)
+    for name, pipeline in pipelines.items():
+        for hit_ratio in args.hit_ratios:
+            workload = build_workload(args.requests, hit_ratio)
+
+            start = time.perf_counter()
+            for profile in workload:
+                pipeline.predict(profile)
+            uncached = (time.perf_counter() - start) / len(workload)
+
+            cache = PredictionCache(max_size=args.cache_size, ttl_seconds=3600)
+            cached = replay(pipeline, cache, workload)
+
+            print(f"{name:>9} | {hit_ratio:>10.2f} | {cache.stats()['hit_ratio']:>10.2f} | "
+                  f"{format_seconds(uncached):>10} | {format_seconds(cached):>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Per-worker memory and startup time of a multi-worker uvicorn API serving a
+Random Forest: every worker unpickling best_model.pkl (MODEL_MMAP=0) vs. every
+worker memory-mapping the same best_model.trees export (MODEL_MMAP=1).
+
+Usage (from repo root):
+    python benchmarks/bench_shared_model.py [--workers 1 4 16] [--modes pickle mmap] [--trees 100]
+                                            [--workdir /tmp/shared_model_bench]
+
+The forest is fitted once with train.py's settings (--trees overrides
+n_estimators) and exported under --workdir.
+For each mode and worker count, uvicorn is started and timed until every
+worker has printed its warm-up line. Memory is read from each worker's
+/proc/<pid>/smaps_rollup (Linux only), once after startup and again after
+batch requests have walked the trees:
+    RSS      resident pages, shared ones counted in full by every worker
+    PSS      resident pages, shared ones split between the processes mapping them
+    private  pages no other process maps
+"""
+import argparse
+import http.client
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from common import MODEL_DIR, ROOT, sample_profiles
+
+from src.explainability import write_feature_manifest
+from src.train import get_candidate_models
+from src.tree_engine import write_tree_artifact
+
+READY_LINE = "ready for traffic"
+
+def build_model_dir(workdir, n_trees):
+    if os.path.exists(os.path.join(workdir, "best_model.pkl")):
+        return
+    os.makedirs(workdir, exist_ok=True)
+    data = os.path.join(ROOT, "data")
+    X = np.load(os.path.join(data, "X_train_processed.npy"))
+    y = pd.read_csv(os.path.join(data, "y_train.csv")).iloc[:, 0].to_numpy()
+    shutil.copy(os.path.join(MODEL_DIR, "preprocessing_pipeline.pkl"), workdir)
+    model = get_candidate_models()["Random Forest"].set_params(n_estimators=n_trees)
+    joblib.dump(model.fit(X, y), os.path.join(workdir, "best_model.pkl"))
+    # Without a current manifest each worker would unpickle the model for /feature_importance
+    write_feature_manifest(workdir)
+    write_tree_artifact(workdir)
+
+def smaps(pid):
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {"rss": fields["Rss"], "pss": fields["Pss"],
+            "private": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+def worker_pids(pid, n_workers):
+    if n_workers == 1:
+        return [pid] # uvicorn serves in-process with a single worker
+    children = []
+    for tid in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{tid}/children") as f:
+            children.extend(int(c) for c in f.read().split())
+    with_cmdline = {c: open(f"/proc/{c}/cmdline", "rb").read() for c in children}
+    return [c for c, cmd in with_cmdline.items() if b"resource_tracker" not in cmd]
+
+def send_batches(port, profiles, n_requests, concurrency):
+    body = json.dumps({"profiles": profiles})
+
+    def post(_):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        conn.request("POST", "/predict/batch", body=body, headers={"Content-Type": "application/json"})
+        status = conn.getresponse().status
+        conn.close()
+        return status
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        statuses = list(pool.map(post, range(n_requests)))
+    if any(s != 200 for s in statuses):
+        raise RuntimeError(f"batch requests failed: {sorted(set(statuses))}")
+
+def measure(workdir, n_workers, mmap, port, profiles, timeout=600):
+    env = {**os.environ, "MODEL_DIR": workdir, "MODEL_MMAP": "1" if mmap else "0",
+           "MODEL_POLL_SECONDS": "0", "PREDICTION_CACHE_SIZE": "0", "PYTHONUNBUFFERED": "1"}
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.backend.main:app", "--port", str(port),
+         "--workers", str(n_workers), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    load_seconds, output, ready = [], [], threading.Event()
+
+    def read_output():
+        n_ready = 0
+        for line in server.stdout:
+            output.append(line)
+            # Workers share the pipe, so two workers' messages can land on one line
+            load_seconds.extend(float(s) for s in re.findall(r"loaded in ([\d.]+)s", line))
+            n_ready += line.count(READY_LINE)
+            if n_ready >= n_workers:
+                ready.set()
+
+    threading.Thread(target=read_output, daemon=True).start()
+    try:
+        while not ready.wait(0.05):
+            if server.poll() is not None or time.perf_counter() - start > timeout:
+                raise RuntimeError(f"{n_workers} worker(s) did not become ready:\n" + "".join(output[-20:]))
+        startup = time.perf_counter() - start
+        pids = worker_pids(server.pid, n_workers)
+        after_start = [smaps(pid) for pid in pids]
+        send_batches(port, profiles, n_requests=4 * n_workers, concurrency=2 * n_workers)
+        after_traffic = [smaps(pid) for pid in pids]
+    finally:
+        server.terminate()
+        server.wait()
+    return {"startup": startup, "load": statistics.mean(load_seconds),
+            "after_start": after_start, "after_traffic": after_traffic}
+
+def summarize(samples):
+    return {key: statistics.mean(s[key] for s in samples) for key in ("rss", "pss", "private")} | {
+        "total_pss": sum(s["pss"] for s in samples)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--modes", nargs="+", choices=["pickle", "mmap"], default=["pickle", "mmap"])
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--workdir", default="/tmp/shared_model_bench")
+    parser.add_argument("--batch-rows", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    workdir = os.path.join(args.workdir, f"rf_{args.trees}")
+    build_model_dir(workdir, args.trees)
+    pkl_mb = os.path.getsize(os.path.join(workdir, "best_model.pkl")) / 2**20
+    trees_dir = os.path.join(workdir, "best_model.trees")
+    trees_mb = sum(os.path.getsize(os.path.join(trees_dir, f)) for f in os.listdir(trees_dir)) / 2**20
+    print(f"best_model.pkl {pkl_mb:.0f} MB, best_model.trees {trees_mb:.0f} MB")
+    profiles = sample_profiles(args.batch_rows)
+
+    print(f"\n{'workers':>7} | {'mode':>6} | {'startup':>8} | {'load':>6} | {'stage':>13} | "
+          f"{'RSS':>7} | {'PSS':>7} | {'private':>7} | {'total PSS':>9}")
+    print("-" * 92)
+    runs = [(n_workers, mode) for n_workers in args.workers for mode in args.modes]
+    for i, (n_workers, mode) in enumerate(runs):
+        # A fresh port per run, so a socket still closing can't fail the next bind
+        r = measure(workdir, n_workers, mode == "mmap", args.port + i, profiles)
+        for stage in ("after_start", "after_traffic"):
+            m = summarize(r[stage])
+            timing = (f"{r['startup']:>7.1f}s | {r['load']:>5.2f}s" if stage == "after_start"
+                      else f"{'':>8} | {'':>6}")
+            print(f"{n_workers:>7} | {mode:>6} | {timing} | {stage.replace('_', ' '):>13} | "
+                  f"{m['rss']:>4.0f} MB | {m['pss']:>4.0f} MB | {m['private']:>4.0f} MB | "
+                  f"{m['total_pss']:>6.0f} MB")
+
+if __name__ == "__main__":
+    main()
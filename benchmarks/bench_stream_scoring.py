@@ -0,0 +1,125 @@
+"""
+Throughput and server memory of POST /predict/stream against a local uvicorn.
+
+Usage (from repo root):
+    python benchmarks/bench_stream_scoring.py [--rows 100000 1000000] [--port 8765]
+
+The upload is generated on the fly by cycling the rows of
+data/Exam_Score_Prediction.csv, so neither side holds the file in memory.
+Server RSS is sampled from /proc while the request is in flight (Linux only).
+
+The client uploads on one thread while reading results on another: the server
+streams results back before the upload finishes, so a client that sends the
+whole body before reading (requests, httpx) stalls once socket buffers fill.
+"""
+import argparse
+import http.client
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from common import DATA_PATH, ROOT
+
+def generate_csv(n_rows, chunk_rows=2000):
+    with open(DATA_PATH, "rb") as f:
+        header, *rows = f.read().splitlines()
+    yield header + b"\n"
+    for start in range(0, n_rows, chunk_rows):
+        count = min(chunk_rows, n_rows - start)
+        yield b"\n".join(rows[(start + i) % len(rows)] for i in range(count)) + b"\n"
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def wait_until_up(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+def stream_upload(port, path, chunks):
+    """
+    Full-duplex chunked upload: a sender thread writes the body while this thread
+    reads the streamed response. Returns the number of response lines.
+    """
+    sock = socket.create_connection(("127.0.0.1", port))
+    sock.sendall(
+        f"POST {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: text/csv\r\n"
+        "Transfer-Encoding: chunked\r\n\r\n".encode()
+    )
+
+    def send():
+        for chunk in chunks:
+            sock.sendall(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        sock.sendall(b"0\r\n\r\n")
+
+    sender = threading.Thread(target=send, daemon=True)
+    sender.start()
+
+    response = http.client.HTTPResponse(sock)
+    response.begin()
+    n_lines = 0
+    while True:
+        data = response.read1(1 << 16)
+        if not data:
+            break
+        n_lines += data.count(b"\n")
+    sender.join()
+    sock.close()
+    return n_lines
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", choices=["csv", "ndjson"], default="csv")
+    args = parser.parse_args()
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.backend.main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_up(args.port)
+        idle_rss = rss_mb(server.pid)
+        print(f"server idle RSS: {idle_rss:.0f} MB\n")
+        print(f"{'rows':>9} | {'seconds':>8} | {'rows/s':>9} | {'peak RSS':>9} | {'out rows':>9}")
+        print("-" * 56)
+
+        for n_rows in args.rows:
+            peak, done = [idle_rss], threading.Event()
+
+            def sample():
+                while not done.is_set():
+                    peak[0] = max(peak[0], rss_mb(server.pid))
+                    time.sleep(0.05)
+
+            sampler = threading.Thread(target=sample, daemon=True)
+            sampler.start()
+            start = time.perf_counter()
+            out_rows = stream_upload(args.port, f"/predict/stream?output={args.output}", generate_csv(n_rows))
+            elapsed = time.perf_counter() - start
+            done.set()
+            sampler.join()
+
+            out_rows -= args.output == "csv" # header
+            print(f"{n_rows:>9} | {elapsed:>8.2f} | {n_rows / elapsed:>9.0f} | {peak[0]:>6.0f} MB | {out_rows:>9}")
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+sklearn's model.predict vs. the flattened TreeEnsemble (src/tree_engine.py)
+for the tree candidates train.py fits, from a single row up to 1M rows.
+
+Usage (from repo root):
+    python benchmarks/bench_tree_engine.py [--models "Random Forest" "Gradient Boosting"]
+                                           [--sizes 1 10 100 1000 10000 100000 1000000]
+
+Models are fitted on data/X_train_processed.npy with train.py's settings;
+batches are rows of data/X_test_processed.npy drawn with replacement. Before
+timing, each engine's predictions are checked for exact equality with sklearn's.
+"""
+import argparse
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+from common import ROOT, format_seconds, time_call
+
+from src.train import get_candidate_models
+from src.tree_engine import flatten_ensemble
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+", default=["Random Forest", "Gradient Boosting"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    data = os.path.join(ROOT, "data")
+    X_train = np.load(os.path.join(data, "X_train_processed.npy"))
+    y_train = pd.read_csv(os.path.join(data, "y_train.csv")).iloc[:, 0].to_numpy()
+    X_test = np.load(os.path.join(data, "X_test_processed.npy"))
+    rng = np.random.default_rng(0)
+
+    candidates = get_candidate_models()
+    for name in args.models:
+        model = candidates[name].fit(X_train, y_train)
+        engine = flatten_ensemble(model)
+        if not np.array_equal(engine.predict(X_test), model.predict(X_test)):
+            raise SystemExit(f"{name}: flattened predictions differ from sklearn's")
+        print(f"\n{name}: {engine.n_trees} trees, {engine.n_nodes} nodes, max depth {engine.max_depth} "
+              f"(predictions identical to sklearn)")
+        print(f"{'rows':>8} | {'sklearn':>10} | {'flattened':>10} | {'speedup':>7} | {'flattened rows/s':>16}")
+        print("-" * 64)
+        for n_rows in args.sizes:
+            X = X_test[rng.integers(0, len(X_test), n_rows)]
+            repeat = args.repeat if n_rows <= 100_000 else 1
+            number = max(1, 1000 // n_rows)
+            base = time_call(lambda: model.predict(X), repeat=repeat, number=number)["median"]
+            flat = time_call(lambda: engine.predict(X), repeat=repeat, number=number)["median"]
+            print(f"{n_rows:>8} | {format_seconds(base):>10} | {format_seconds(flat):>10} | "
+                  f"{base / flat:>6.1f}x | {n_rows / flat:>16,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import os
+import statistics
+import sys
+import time
+
+# Benchmarks are run from the repo root: python benchmarks/<name>.py
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(ROOT)
+
+DATA_PATH = os.path.join(ROOT, "data", "Exam_Score_Prediction.csv")
+MODEL_DIR = os.path.join(ROOT, "models")
+
+FEATURE_COLUMNS = [
+    'age', 'gender', 'course', 'study_hours', 'class_attendance', 'internet_access',
+    'sleep_hours', 'sleep_quality', 'study_method', 'facility_rating', 'exam_difficulty'
+]
+
+def sample_profiles(n_rows, seed=0):
+    """
+    Returns n_rows student profiles (list of dicts) resampled from the real dataset,
+    so every categorical value is one the encoder has seen.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(DATA_PATH, usecols=FEATURE_COLUMNS)
+    sample = df.sample(n=n_rows, replace=n_rows > len(df), random_state=seed)
+    return sample.to_dict(orient="records")
+
+def time_call(fn, repeat=5, number=1):
+    """
+    Times fn() `repeat` times (each run calls it `number` times) after one warm-up call.
+    Returns per-call seconds as a dict of median/min/max.
+    """
+    fn()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter() - start) / number)
+    return {
+        "median": statistics.median(runs),
+        "min": min(runs),
+        "max": max(runs),
+    }
+
+def format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
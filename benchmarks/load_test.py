@@ -0,0 +1,241 @@
+"""
+Open-loop HTTP load generator for the API, sweeping client concurrency.
+
+Usage (from repo root):
+    python benchmarks/load_test.py                                   # 1 and 4 workers, concurrency 1..512
+    python benchmarks/load_test.py --workers 1 --concurrency 1 64 512 --rate 400 --duration 10
+    python benchmarks/load_test.py --mix predict=0.8 feature_importance=0.2 --histogram
+    python benchmarks/load_test.py --url http://127.0.0.1:8000       # use a running server instead
+
+For each worker count, a uvicorn server is started locally and given time to
+report /ready. Then, for each concurrency level, requests are sent at a fixed
+arrival rate (--rate per second) for --duration seconds by an async httpx
+client holding at most `concurrency` requests in flight. Requests are timed
+from when they were scheduled, not when a connection became free, so queueing
+behind a saturated server shows up in the tail instead of hiding it.
+
+/predict payloads are random but valid StudentProfiles: categorical fields
+draw from the schema's Literal values, numeric fields from their ge/le bounds.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+import typing
+
+import httpx
+
+from common import ROOT, format_seconds
+
+from app.backend.metrics import DEFAULT_BUCKETS
+from app.backend.schemas import StudentProfile
+
+ENDPOINTS = ("predict", "feature_importance")
+
+def field_sampler(field):
+    """
+    Returns a function rng -> value for one StudentProfile field.
+    """
+    annotation = field.annotation
+    if typing.get_origin(annotation) is typing.Literal:
+        choices = typing.get_args(annotation)
+        return lambda rng: rng.choice(choices)
+
+    low, high = 0.0, 100.0
+    for constraint in field.metadata:
+        low = getattr(constraint, "ge", low)
+        high = getattr(constraint, "le", high)
+    if annotation is int:
+        return lambda rng: rng.randint(int(low), int(high))
+    return lambda rng: round(rng.uniform(low, high), 2)
+
+def profile_generator(seed=0):
+    """
+    Yields random, schema-valid /predict payloads.
+    """
+    rng = random.Random(seed)
+    samplers = {name: field_sampler(field) for name, field in StudentProfile.model_fields.items()}
+    while True:
+        yield {name: sample(rng) for name, sample in samplers.items()}
+
+def start_server(port, workers):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.backend.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return server
+
+def wait_until_ready(base_url, workers=1, timeout=120):
+    """
+    Polls /ready until it has answered 200 several times in a row, so that with
+    several workers all of them have most likely finished warming up.
+    """
+    deadline, streak = time.time() + timeout, 0
+    while time.time() < deadline:
+        try:
+            streak = streak + 1 if httpx.get(f"{base_url}/ready", timeout=2).status_code == 200 else 0
+        except httpx.HTTPError:
+            streak = 0
+        if streak >= 4 * workers:
+            return
+        time.sleep(0.1 if streak else 0.3)
+    raise RuntimeError("server did not become ready")
+
+async def run_step(base_url, concurrency, rate, duration, mix, payloads, timeout=30.0):
+    """
+    Sends rate * duration requests at a fixed arrival rate with at most
+    `concurrency` in flight. Returns per-endpoint samples.
+    """
+    n_requests = max(1, int(rate * duration))
+    rng = random.Random(concurrency)
+    names, weights = zip(*mix.items())
+    plan = [(name, next(payloads) if name == "predict" else None)
+            for name in rng.choices(names, weights=weights, k=n_requests)]
+
+    results = {name: {"latency": [], "service": [], "errors": 0, "status": collections.Counter()} for name in names}
+    slots = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        start = time.perf_counter()
+
+        async def send(i, name, payload):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with slots:
+                sent = time.perf_counter()
+                try:
+                    if name == "predict":
+                        response = await client.post("/predict", json=payload)
+                    else:
+                        response = await client.get("/feature_importance")
+                    status = response.status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                done = time.perf_counter()
+
+            result = results[name]
+            result["status"][str(status)] += 1
+            if isinstance(status, int) and status < 400:
+                result["latency"].append(done - scheduled)
+                result["service"].append(done - sent)
+            else:
+                result["errors"] += 1
+
+        await asyncio.gather(*(send(i, name, payload) for i, (name, payload) in enumerate(plan)))
+        elapsed = time.perf_counter() - start
+
+    return results, elapsed
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def summarize(result, elapsed):
+    latency, service = sorted(result["latency"]), sorted(result["service"])
+    total = len(latency) + result["errors"]
+    return {
+        "requests": total,
+        "throughput": len(latency) / elapsed,
+        "error_rate": result["errors"] / total if total else 0.0,
+        "status": dict(result["status"]),
+        "latency": {f"p{int(q * 100)}": percentile(latency, q) for q in (0.5, 0.9, 0.99)},
+        "latency_max": latency[-1] if latency else float("nan"),
+        "latency_mean": statistics.mean(latency) if latency else float("nan"),
+        "service_p50": percentile(service, 0.5),
+        "service_p99": percentile(service, 0.99),
+        "histogram": histogram(latency),
+    }
+
+def histogram(latencies):
+    """
+    Counts per latency bucket (upper bounds in seconds, as used by /metrics).
+    """
+    counts = collections.Counter()
+    for value in latencies:
+        bound = next((b for b in DEFAULT_BUCKETS if value <= b), float("inf"))
+        counts[bound] += 1
+    return [(bound, counts[bound]) for bound in DEFAULT_BUCKETS + (float("inf"),) if counts[bound]]
+
+def print_histogram(buckets, width=40):
+    peak = max((n for _, n in buckets), default=0)
+    for bound, n in buckets:
+        label = "+Inf" if bound == float("inf") else format_seconds(bound)
+        print(f"      <= {label:>9} | {'#' * max(1, round(width * n / peak)):<{width}} {n}")
+
+def parse_mix(items):
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint '{name}'; choose from {ENDPOINTS}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="uvicorn worker counts to test")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64, 512])
+    parser.add_argument("--rate", type=float, default=300.0, help="Arrival rate, requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument("--mix", nargs="+", default=["predict=0.9", "feature_importance=0.1"])
+    parser.add_argument("--port", type=int, default=8768)
+    parser.add_argument("--url", default=None, help="Target a running server; --workers is then ignored")
+    parser.add_argument("--histogram", action="store_true", help="Print latency histograms")
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    payloads = profile_generator(args.seed)
+    configs = [None] if args.url else args.workers
+    report = []
+
+    for workers in configs:
+        base_url = args.url or f"http://127.0.0.1:{args.port}"
+        server = start_server(args.port, workers) if args.url is None else None
+        try:
+            wait_until_ready(base_url, workers or 1)
+            title = f"{workers} worker(s)" if workers else base_url
+            print(f"\n=== {title}: {args.rate:.0f} req/s for {args.duration:.0f}s per step ===")
+            print(f"{'conc':>5} | {'endpoint':<18} | {'req/s':>7} | {'errors':>7} | {'p50':>9} | {'p90':>9} | "
+                  f"{'p99':>9} | {'max':>9} | {'svc p99':>9}")
+            print("-" * 105)
+
+            for concurrency in args.concurrency:
+                results, elapsed = asyncio.run(
+                    run_step(base_url, concurrency, args.rate, args.duration, mix, payloads))
+                for name, result in results.items():
+                    summary = summarize(result, elapsed)
+                    report.append({"workers": workers, "concurrency": concurrency, "endpoint": name,
+                                   "rate": args.rate, "duration": elapsed, **summary})
+                    p = summary["latency"]
+                    print(f"{concurrency:>5} | {name:<18} | {summary['throughput']:>7.1f} | "
+                          f"{summary['error_rate']:>6.1%} | {format_seconds(p['p50']):>9} | "
+                          f"{format_seconds(p['p90']):>9} | {format_seconds(p['p99']):>9} | "
+                          f"{format_seconds(summary['latency_max']):>9} | {format_seconds(summary['service_p99']):>9}")
+                    if args.histogram:
+                        print_histogram(summary["histogram"])
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    print("\nLatency is measured from each request's scheduled send time. svc p99 starts the clock when a")
+    print("connection slot was free, so the gap between the two is time spent queued in the client.")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4, default=str)
+        print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+In-process microbenchmark suite for the prediction, preprocessing and training
+hot paths, with JSON results and regression checks against a stored baseline.
+
+Usage (from repo root):
+    python benchmarks/suite.py                              # run everything, compare to baseline.json
+    python benchmarks/suite.py --filter predict             # only cases whose name contains "predict"
+    python benchmarks/suite.py --output results.json        # also save this run
+    python benchmarks/suite.py --save-baseline              # make this run the new baseline
+    python benchmarks/suite.py --threshold 0.15             # flag cases >15% slower than baseline
+
+Every case is warmed up, then timed in `repeat` samples. Each sample runs
+enough iterations to last at least --min-time seconds, so fast calls aren't
+dominated by timer resolution. Statistics are per call. A case counts as a
+regression when its median is more than `threshold` slower than the baseline
+median and the slowdown is larger than the IQR of either run. The exit status
+is 1 if any case regressed.
+"""
+import argparse
+import atexit
+import contextlib
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+from common import DATA_PATH, MODEL_DIR, ROOT, format_seconds, sample_profiles
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def measure(fn, repeat=7, min_time=0.2, max_number=100_000):
+    """
+    Times fn() in `repeat` samples after one warm-up call. The iterations per
+    sample are calibrated so a sample takes at least `min_time` seconds.
+    Returns per-call statistics in seconds.
+    """
+    fn()
+    number = 1
+    while number < max_number:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            break
+        number *= 10 if time.perf_counter() - start < min_time / 10 else 2
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - start) / number)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    quartiles = statistics.quantiles(samples, n=4) if len(samples) > 1 else [samples[0]] * 3
+    return {
+        "median": statistics.median(samples),
+        "iqr": quartiles[2] - quartiles[0],
+        "mean": statistics.mean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "min": min(samples),
+        "max": max(samples),
+        "repeat": repeat,
+        "number": number,
+    }
+
+def build_cases(sizes, train_sizes):
+    """
+    Returns [(name, setup, options)]. setup() does untimed preparation and returns
+    the callable to time, so data loading never ends up in the measurement.
+    """
+    import pandas as pd
+    from src.explainability import get_feature_importance
+    from src.predict_pipeline import PredictPipeline
+
+    pipelines = {}
+
+    def pipeline(fast_path):
+        if fast_path not in pipelines:
+            pipelines[fast_path] = PredictPipeline(model_dir=MODEL_DIR, fast_path=fast_path)
+        return pipelines[fast_path]
+
+    def frame(n_rows):
+        return pd.DataFrame(sample_profiles(n_rows, seed=n_rows))
+
+    cases = []
+    for label, fast_path in (("fast", True), ("sklearn", False)):
+        def setup(fast_path=fast_path):
+            p, profile = pipeline(fast_path), sample_profiles(1, seed=1)[0]
+            return lambda: p.predict(profile)
+        cases.append((f"PredictPipeline.predict[{label}]", setup, {}))
+
+    for n_rows in sizes:
+        for label, fast_path in (("fast", True), ("sklearn", False)):
+            def setup(n_rows=n_rows, fast_path=fast_path):
+                p, profiles = pipeline(fast_path), sample_profiles(n_rows, seed=n_rows)
+                return lambda: p.predict_batch(profiles)
+            cases.append((f"PredictPipeline.predict_batch[{label},rows={n_rows}]", setup, {}))
+
+            def setup(n_rows=n_rows, fast_path=fast_path):
+                p, profiles = pipeline(fast_path), sample_profiles(n_rows, seed=n_rows)
+                return lambda: p.explain_batch(profiles)
+            cases.append((f"PredictPipeline.explain_batch[{label},rows={n_rows}]", setup, {}))
+
+        def setup(n_rows=n_rows):
+            fe, df = pipeline(False).preprocessor.named_steps["feature_engineering"], frame(n_rows)
+            return lambda: fe.transform(df)
+        cases.append((f"FeatureEngineer.transform[rows={n_rows}]", setup, {}))
+
+        def setup(n_rows=n_rows):
+            steps = pipeline(False).preprocessor.named_steps
+            engineered = steps["feature_engineering"].transform(frame(n_rows))
+            return lambda: steps["preprocessor"].transform(engineered)
+        cases.append((f"ColumnTransformer.transform[rows={n_rows}]", setup, {}))
+
+    def setup():
+        return lambda: get_feature_importance(model_dir=MODEL_DIR)
+    cases.append(("get_feature_importance", setup, {}))
+
+    for n_rows in train_sizes:
+        def setup(n_rows=n_rows):
+            return training_run(n_rows)
+        # Seconds per call: a few samples, no calibration
+        cases.append((f"train_and_evaluate[rows={n_rows}]", setup, {"repeat": 3, "min_time": 0}))
+
+    return cases
+
+def training_run(n_rows, n_test=1000):
+    """
+    Writes the first n_rows of the processed training matrix to a temp dir and
+    returns a callable running train_and_evaluate on it, with its output muted.
+    """
+    import pandas as pd
+    from src.train import train_and_evaluate
+    from src.utils import load_matrix, save_matrix
+
+    data_dir = os.path.join(ROOT, "data")
+    X_train, names = load_matrix(os.path.join(data_dir, "X_train_processed.npy"))
+    X_test, _ = load_matrix(os.path.join(data_dir, "X_test_processed.npy"))
+    y_train = pd.read_csv(os.path.join(data_dir, "y_train.csv"))
+    y_test = pd.read_csv(os.path.join(data_dir, "y_test.csv"))
+
+    work_dir = tempfile.mkdtemp(prefix="bench_train_")
+    atexit.register(shutil.rmtree, work_dir, True)
+    paths = [os.path.join(work_dir, name) for name in ("X_train.npy", "y_train.csv", "X_test.npy", "y_test.csv")]
+    save_matrix(paths[0], X_train[:n_rows], names)
+    y_train.iloc[:n_rows].to_csv(paths[1], index=False)
+    save_matrix(paths[2], X_test[:n_test], names)
+    y_test.iloc[:n_test].to_csv(paths[3], index=False)
+
+    def run():
+        # train_and_evaluate expects the fitted preprocessor next to the model it writes
+        output_dir = tempfile.mkdtemp(dir=work_dir)
+        shutil.copy(os.path.join(MODEL_DIR, "preprocessing_pipeline.pkl"), output_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            train_and_evaluate(*paths, output_dir=output_dir)
+        shutil.rmtree(output_dir)
+    return run
+
+def environment():
+    import numpy, pandas, sklearn
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "scikit-learn": sklearn.__version__,
+    }
+
+def is_regression(stats, base, threshold):
+    """
+    Slower than the baseline by more than `threshold` (0.10 = 10%), and by more
+    than the spread (IQR) of either run, so noisy cases don't flag on jitter.
+    """
+    slowdown = stats["median"] - base["median"]
+    return slowdown > threshold * base["median"] and slowdown > max(stats["iqr"], base["iqr"])
+
+def compare(results, baseline, threshold):
+    """
+    Returns {case: median ratio vs baseline} for every case that regressed.
+    """
+    regressions = {}
+    for name, stats in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is not None and is_regression(stats, base, threshold):
+            regressions[name] = stats["median"] / base["median"]
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default=None, help="Only run cases whose name contains this string")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--train-sizes", type=int, nargs="+", default=[1000, 4000])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per sample")
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run to --baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regression threshold (0.10 = 10%% slower)")
+    args = parser.parse_args()
+
+    if not os.path.exists(DATA_PATH):
+        sys.exit(f"Dataset not found at {DATA_PATH}")
+    warnings.filterwarnings("ignore")
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    print(f"{'case':<55} | {'median':>10} | {'iqr':>10} | {'vs baseline':>11}")
+    print("-" * 95)
+    for name, setup, options in build_cases(args.sizes, args.train_sizes):
+        if args.filter and args.filter not in name:
+            continue
+        stats = measure(setup(), repeat=options.get("repeat", args.repeat),
+                        min_time=options.get("min_time", args.min_time))
+        results[name] = stats
+
+        change = ""
+        base = (baseline or {}).get("results", {}).get(name)
+        if base:
+            ratio = stats["median"] / base["median"]
+            change = f"{(ratio - 1) * 100:+.1f}%" + (" !" if is_regression(stats, base, args.threshold) else "")
+        print(f"{name:<55} | {format_seconds(stats['median']):>10} | {format_seconds(stats['iqr']):>10} | {change:>11}")
+
+    report = {"environment": environment(), "threshold": args.threshold, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nResults saved to {args.output}")
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+        return
+    regressions = compare(results, baseline, args.threshold)
+    env = baseline.get("environment", {})
+    print(f"\nBaseline: commit {env.get('commit')} on {env.get('platform')} ({env.get('cpu_count')} CPUs)")
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for name, ratio in sorted(regressions.items(), key=lambda item: -item[1]):
+            print(f"  {name}: {ratio:.2f}x baseline")
+        sys.exit(1)
+    print(f"No regressions over {args.threshold:.0%}.")
+
+if __name__ == "__main__":
+    main()
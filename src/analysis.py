@@ -4,20 +4,38 @@ import os
 
 # Add the current directory to path to import utils
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.utils import load_data, get_column_info
+from src.profiling import profile_csv
 
-def analyze_dataset(filepath):
+def analyze_dataset(filepath, jobs=None):
+    """
+    Prints the dataset summary without loading the file: it is profiled in
+    parallel chunks (see profiling.profile_csv), so multi-gigabyte exports fit
+    in bounded memory. On files small enough for the sketches to stay exact,
+    the column table is identical to utils.get_column_info on the full DataFrame.
+
+    Returns:
+        DatasetProfile: The merged profile.
+    """
     print("--- Phase 1: Dataset Understanding ---")
-    
-    df = load_data(filepath)
-    
+
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"File not found: {filepath}")
+    profile = profile_csv(filepath, jobs=jobs)
+    print(f"Successfully profiled data from {filepath}")
+    print(f"Shape: ({profile.rows}, {len(profile.columns)})")
+    if not profile.exact:
+        print("Unique counts and quartiles are approximate (HyperLogLog / quantile sketches)")
+
     print("\n--- Column Analysis ---")
-    info = get_column_info(df)
+    info = profile.column_info()
     print(info)
-    
+
+    print("\n--- Numeric Summary ---")
+    print(profile.numeric_summary().to_string())
+
     print("\n--- Target Variable Detection ---")
     # Heuristic: Look for score-related keywords
-    potential_targets = [col for col in df.columns if any(keyword in col.lower() for keyword in ['score', 'grade', 'result', 'mark', 'performance'])]
+    potential_targets = [col for col in profile.columns if any(keyword in col.lower() for keyword in ['score', 'grade', 'result', 'mark', 'performance'])]
     
     if potential_targets:
         print(f"Potential target columns detected: {potential_targets}")
@@ -26,13 +44,20 @@ def analyze_dataset(filepath):
     else:
         print("No obvious target column detected based on keywords.")
 
-    return df
+    return profile
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Profile a CSV dataset in one streaming pass.")
+    parser.add_argument("filepath", nargs="?", default=os.path.join("data", "Exam_Score_Prediction.csv"))
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
     # Assuming run from root
-    filepath = os.path.join("data", "Exam_Score_Prediction.csv")
+    filepath = args.filepath
     if not os.path.exists(filepath):
         # Fallback if running from src
-        filepath = os.path.join("..", "data", "Exam_Score_Prediction.csv")
+        filepath = os.path.join("..", filepath)
         
-    analyze_dataset(filepath)
+    analyze_dataset(filepath, jobs=args.jobs)
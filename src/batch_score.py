@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.registry import serving_dir, verify_version
+from src.utils import file_sha256
+
+# Set once per worker process by _init_worker, so artifacts are unpickled once per worker
+_worker_pipeline = None
+
+def _init_worker(model_dir):
+    global _worker_pipeline
+    import warnings
+    from src.predict_pipeline import PredictPipeline
+
+    warnings.filterwarnings("ignore")
+    _worker_pipeline = PredictPipeline(model_dir=model_dir)
+
+def _score_chunk(index, first_row, chunk, parts_dir):
+    """
+    Scores one chunk and writes it as its own Parquet part. The part is written to a
+    temp name and renamed, so an existing part file always means a finished chunk.
+    """
+    start = time.perf_counter()
+    scores = _worker_pipeline.predict_batch(chunk)
+
+    result = pd.DataFrame({"row": pd.RangeIndex(first_row, first_row + len(chunk))})
+    if "student_id" in chunk.columns:
+        result["student_id"] = chunk["student_id"].to_numpy()
+    result["exam_score"] = scores
+
+    part_path = os.path.join(parts_dir, f"part-{index:06d}.parquet")
+    tmp_path = part_path + ".tmp"
+    result.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, part_path)
+
+    return index, len(chunk), time.perf_counter() - start, os.getpid()
+
+def iter_chunks(input_path, chunksize):
+    """
+    Yields DataFrames of at most `chunksize` rows from a CSV or Parquet file.
+    """
+    if input_path.endswith(".parquet"):
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunksize)
+
+def _load_progress(parts_dir, job):
+    """
+    Returns the set of finished chunk indices, or an empty set if the parts
+    directory belongs to a different job (input, chunk size or model changed).
+    """
+    manifest_path = os.path.join(parts_dir, "_job.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f) == job:
+                return {
+                    int(name[len("part-"):-len(".parquet")])
+                    for name in os.listdir(parts_dir)
+                    if name.startswith("part-") and name.endswith(".parquet")
+                }
+        print("Existing progress is for a different job; starting over.")
+        shutil.rmtree(parts_dir)
+
+    os.makedirs(parts_dir, exist_ok=True)
+    with open(manifest_path, "w") as f:
+        json.dump(job, f, indent=4)
+    return set()
+
+def _merge_parts(parts_dir, output_path, n_chunks):
+    """
+    Concatenates the parts in chunk order into one Parquet file, one part in memory at a time.
+    """
+    writer = None
+    try:
+        for index in range(n_chunks):
+            table = pq.read_table(os.path.join(parts_dir, f"part-{index:06d}.parquet"))
+            if writer is None:
+                writer = pq.ParquetWriter(output_path + ".tmp", table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        pq.write_table(pa.table({"row": pa.array([], pa.int64()), "exam_score": pa.array([], pa.float64())}),
+                       output_path + ".tmp")
+    os.replace(output_path + ".tmp", output_path)
+
+def score_file(input_path, output_path, model_dir="models", chunksize=100_000, workers=None, keep_parts=False,
+               version=None):
+    """
+    Scores a large CSV/Parquet file across a process pool and writes exam scores to Parquet.
+
+    Chunks are scored in parallel but written in input order. Progress is kept in
+    `<output_path>.parts/`; rerunning the same command after a crash skips chunks
+    that already finished.
+
+    `model_dir` is a registry root: like the API, scoring uses the version its
+    CURRENT points at (or `version`), and the flat artifacts in `model_dir`
+    only when nothing has been published.
+    """
+    print("--- Offline Batch Scoring ---")
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"File not found: {input_path}")
+
+    version, model_path = serving_dir(model_dir, version)
+    if version is not None:
+        verify_version(model_dir, version)
+    print(f"Scoring with model {version or 'unversioned'} from {model_path}")
+
+    workers = workers or os.cpu_count() or 1
+    parts_dir = output_path + ".parts"
+    job = {
+        "input": os.path.abspath(input_path),
+        "input_size": os.path.getsize(input_path),
+        "input_mtime": os.path.getmtime(input_path),
+        "chunksize": chunksize,
+        "model_sha256": file_sha256(os.path.join(model_path, "best_model.pkl")),
+    }
+    done = _load_progress(parts_dir, job)
+    if done:
+        print(f"Resuming: {len(done)} chunk(s) already scored.")
+
+    rows_by_worker = defaultdict(int)
+    seconds_by_worker = defaultdict(float)
+    n_chunks, total_rows = 0, 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+        in_flight = set()
+
+        def collect(futures):
+            for future in futures:
+                _, n_rows, seconds, pid = future.result()
+                rows_by_worker[pid] += n_rows
+                seconds_by_worker[pid] += seconds
+
+        for index, chunk in enumerate(iter_chunks(input_path, chunksize)):
+            n_chunks += 1
+            first_row = total_rows
+            total_rows += len(chunk)
+            if index in done:
+                continue
+
+            # Bound the number of chunks held in memory while workers catch up
+            if len(in_flight) >= 2 * workers:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(finished)
+            in_flight.add(pool.submit(_score_chunk, index, first_row, chunk, parts_dir))
+
+        collect(wait(in_flight).done)
+
+    elapsed = time.perf_counter() - start
+    _merge_parts(parts_dir, output_path, n_chunks)
+    if not keep_parts:
+        shutil.rmtree(parts_dir)
+
+    print(f"Scored {total_rows} rows in {n_chunks} chunk(s) in {elapsed:.2f}s "
+          f"({total_rows / elapsed if elapsed else 0:.0f} rows/s overall)")
+    for i, pid in enumerate(sorted(rows_by_worker)):
+        rate = rows_by_worker[pid] / seconds_by_worker[pid] if seconds_by_worker[pid] else 0
+        print(f"  worker {i} (pid {pid}): {rows_by_worker[pid]} rows, {rate:.0f} rows/s")
+    print(f"Scores saved to {output_path}")
+    return output_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of students offline.")
+    parser.add_argument("input", help="CSV or .parquet file shaped like data/Exam_Score_Prediction.csv")
+    parser.add_argument("output", help="Output .parquet file")
+    parser.add_argument("--model-dir", default="models", help="Registry root; its CURRENT version is used")
+    parser.add_argument("--version", default=None, help="Score with this registry version instead of CURRENT")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--keep-parts", action="store_true", help="Keep per-chunk part files after merging")
+    args = parser.parse_args(argv)
+
+    score_file(args.input, args.output, model_dir=args.model_dir, chunksize=args.chunksize,
+               workers=args.workers, keep_parts=args.keep_parts, version=args.version)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import numpy as np
+import os
+import sys
+from scipy import sparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+def field_groups(col_trans):
+    """
+    Maps every ColumnTransformer output column back to the input field it came
+    from: one-hot columns to their categorical field, everything else one to one.
+    Derived features such as study_efficiency keep their own name.
+
+    Returns:
+        tuple: (fields, group) where group[j] is the index into `fields` of
+        output column j, or None if a transformer's outputs can't be traced.
+    """
+    fields, group = [], []
+    for name, est, cols in col_trans.transformers_:
+        if est == 'drop' or len(cols) == 0:
+            continue
+        if not all(isinstance(c, str) for c in cols):
+            return None
+        steps = getattr(est, "named_steps", {})
+        encoder = steps.get('onehot')
+
+        if encoder is None:
+            if est != 'passthrough' and not set(steps) <= {'scaler', 'imputer'}:
+                return None
+            widths = [1] * len(cols)
+        else:
+            if encoder.min_frequency is not None or encoder.max_categories is not None:
+                return None
+            drop_idx = encoder.drop_idx_ if encoder.drop_idx_ is not None else [None] * len(cols)
+            widths = [len(cats) - (dropped is not None) for cats, dropped in zip(encoder.categories_, drop_idx)]
+
+        for col, width in zip(cols, widths):
+            group.extend([len(fields)] * width)
+            fields.append(col)
+    return fields, np.asarray(group, dtype=np.intp)
+
+class LinearExplainer:
+    """
+    Contributions of a fitted linear model over the transformed matrix:
+    coefficient x transformed value, with one-hot columns summed per field.
+    """
+    def __init__(self, model, fields, group):
+        coef = np.ravel(model.coef_)
+        self.model = model
+        self.fields = fields
+        self.base_value = float(np.ravel(model.intercept_)[0])
+        # (n_columns, n_fields) weights, so grouping rides along with the matmul
+        self.weights = np.zeros((len(coef), len(fields)))
+        self.weights[np.arange(len(coef)), group] = coef
+
+    def explain(self, X):
+        contributions = np.asarray(X @ self.weights)
+        return np.asarray(self.model.predict(X), dtype=float), contributions
+
+class TreeExplainer:
+    """
+    Path-based (Saabas) attribution for tree ensembles. Walking a sample from
+    the root to its leaf, every split moves the node value by
+    value[child] - value[parent]; that change is credited to the field the
+    parent split on. Summed over the path it telescopes to leaf - root, so a
+    row's contributions add up to its prediction minus `base_value`.
+
+    Each tree is flattened once into per-node arrays (the change a node adds
+    and the field it is credited to). Explaining a batch is then one
+    decision_path traversal per tree, the same walk predict() does, plus a
+    bincount over the visited nodes.
+    """
+    def __init__(self, trees, tree_weights, offset, fields, group):
+        self.trees = list(trees)
+        self.fields = fields
+        self.offset = float(offset)
+        self.node_field, self.node_delta, self.node_value = [], [], []
+        base_value = self.offset
+
+        for tree, weight in zip(self.trees, tree_weights):
+            value = tree.value[:, 0, 0] * weight
+            left, right = tree.children_left, tree.children_right
+            internal = np.flatnonzero(left != -1)
+            parent = np.zeros(tree.node_count, dtype=np.intp) # The root credits 0 to field 0
+            parent[left[internal]] = internal
+            parent[right[internal]] = internal
+
+            self.node_field.append(group[np.maximum(tree.feature[parent], 0)])
+            self.node_delta.append(value - value[parent])
+            self.node_value.append(value)
+            base_value += value[0]
+        self.base_value = base_value
+
+    def explain(self, X):
+        # Tree.decision_path wants float32, as the estimators' own predict() casts it
+        X = sparse.csr_matrix(X, dtype=np.float32) if sparse.issparse(X) else np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_fields = X.shape[0], len(self.fields)
+        row_offsets = np.arange(n_rows) * n_fields
+        prediction = np.full(n_rows, self.offset)
+        contributions = np.zeros(n_rows * n_fields)
+
+        for tree, field, delta, value in zip(self.trees, self.node_field, self.node_delta, self.node_value):
+            visited = tree.decision_path(X)
+            nodes, counts = visited.indices, np.diff(visited.indptr)
+            contributions += np.bincount(np.repeat(row_offsets, counts) + field[nodes],
+                                         weights=delta[nodes], minlength=n_rows * n_fields)
+            # Node ids grow along a path, so each row's last visited node is its leaf
+            prediction += value[nodes[visited.indptr[1:] - 1]]
+        return prediction, contributions.reshape(n_rows, n_fields)
+
+def _tree_ensemble(model):
+    """
+    (trees, per-tree weights, constant offset) such that the model's prediction
+    is offset + sum(weight * tree value); None for unsupported models.
+    """
+    from sklearn.ensemble import ExtraTreesRegressor, GradientBoostingRegressor, RandomForestRegressor
+    from sklearn.tree import DecisionTreeRegressor
+
+    if isinstance(model, DecisionTreeRegressor):
+        return [model.tree_], [1.0], 0.0
+    if isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)):
+        trees = [est.tree_ for est in model.estimators_]
+        return trees, [1.0 / len(trees)] * len(trees), 0.0
+    if isinstance(model, GradientBoostingRegressor):
+        if model.init_ == 'zero':
+            offset = 0.0
+        elif hasattr(model.init_, "constant_"):
+            offset = float(np.ravel(model.init_.constant_)[0])
+        else:
+            return None
+        trees = [est.tree_ for est in model.estimators_[:, 0]]
+        return trees, [model.learning_rate] * len(trees), offset
+    return None
+
+def build_explainer(preprocessor, model):
+    """
+    Returns an explainer for the fitted preprocessing pipeline + model, with
+    `fields`, `base_value` and `explain(X_transformed) -> (predictions,
+    contributions)`. Returns None when the model type or the preprocessor's
+    outputs aren't supported.
+    """
+    steps = getattr(preprocessor, "named_steps", None)
+    if not steps or 'preprocessor' not in steps:
+        return None
+    traced = field_groups(steps['preprocessor'])
+    if traced is None:
+        return None
+    fields, group = traced
+    if getattr(model, "n_features_in_", len(group)) != len(group):
+        return None
+
+    if type(model).__module__.startswith("sklearn.linear_model"):
+        if np.ravel(model.coef_).size != len(group) or np.ravel(model.intercept_).size != 1:
+            return None
+        return LinearExplainer(model, fields, group)
+
+    ensemble = _tree_ensemble(model)
+    if ensemble is None:
+        return None
+    trees, weights, offset = ensemble
+    return TreeExplainer(trees, weights, offset, fields, group)
@@ -1,11 +1,28 @@
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+import hashlib
+import json
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg") # Plots are only ever written to files, possibly from worker processes
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
 
 # Add src to path if needed (though we likely run from root)
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.utils import file_sha256, load_data
+
+# Per-plot input hashes from the last run, kept next to the plots
+MANIFEST_NAME = ".eda_manifest.json"
+# Binned mode: fine bins per histogram bar, for the KDE
+KDE_SUBBINS = 8
+# Binned mode: exam_score resolution for boxplot quartiles
+BOX_BINS = 4096
+ROWS_PER_CHUNK = 1_000_000
 
 def set_style():
     sns.set_theme(style="whitegrid")
@@ -13,80 +30,302 @@ def set_style():
     plt.rcParams["axes.titlesize"] = 16
     plt.rcParams["axes.labelsize"] = 12
 
-def plot_correlation_heatmap(df: pd.DataFrame, output_dir: str):
-    plt.figure(figsize=(12, 10))
-    # Select only numeric columns for correlation
-    numeric_df = df.select_dtypes(include=['number'])
-    # Drop ID if present
-    if 'student_id' in numeric_df.columns:
-        numeric_df = numeric_df.drop(columns=['student_id'])
-        
-    corr = numeric_df.corr()
-    sns.heatmap(corr, annot=True, cmap='coolwarm', fmt=".2f", linewidths=0.5)
-    plt.title("Feature Correlation Heatmap")
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "correlation_heatmap.png"))
-    plt.close()
-    print("Generated: correlation_heatmap.png")
+def plot_specs(df: pd.DataFrame):
+    """
+    One spec per plot: the file it writes, what kind of plot it is and the
+    columns it reads.
+    """
+    numeric_cols = [c for c in df.select_dtypes(include=['number']).columns if c != 'student_id']
+    categorical_cols = list(df.select_dtypes(exclude=['number']).columns)
 
-def plot_distributions(df: pd.DataFrame, output_dir: str):
-    numeric_cols = df.select_dtypes(include=['number']).columns
-    numeric_cols = [c for c in numeric_cols if c not in ['student_id', 'exam_score']]
-    
+    specs = [{"file": "correlation_heatmap.png", "kind": "heatmap", "columns": numeric_cols}]
     for col in numeric_cols:
+        if col != 'exam_score':
+            specs.append({"file": f"dist_{col}.png", "kind": "hist", "columns": [col],
+                          "title": f"Distribution of {col}", "xlabel": col, "color": 'skyblue'})
+    # Target Variable Distribution
+    specs.append({"file": "dist_exam_score.png", "kind": "hist", "columns": ['exam_score'],
+                  "title": "Distribution of Target: Exam Score", "xlabel": "Exam Score", "color": 'purple'})
+    for col in categorical_cols:
+        specs.append({"file": f"boxplot_{col}.png", "kind": "box", "columns": [col, 'exam_score']})
+    return specs
+
+# --- Pre-aggregation (binned mode) ---
+
+def _correlation(numeric: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pearson correlation from centred cross-products accumulated chunk by chunk,
+    so no (rows x columns) float copy of the whole frame is ever made.
+    """
+    mean = numeric.mean().to_numpy()
+    cross = np.zeros((len(mean), len(mean)))
+    for start in range(0, len(numeric), ROWS_PER_CHUNK):
+        chunk = numeric.iloc[start:start + ROWS_PER_CHUNK].to_numpy(dtype=float) - mean
+        cross += chunk.T @ chunk
+    std = np.sqrt(np.diag(cross))
+    return pd.DataFrame(cross / np.outer(std, std), index=numeric.columns, columns=numeric.columns)
+
+def _histogram(values: pd.Series, bins: int):
+    """
+    Bar counts plus KDE_SUBBINS-times finer counts for the density curve.
+    Integer columns with few distinct values get one bar per value, which
+    makes the binned KDE exact.
+    """
+    x = values.to_numpy()
+    lo, hi = float(x.min()), float(x.max())
+    if np.issubdtype(x.dtype, np.integer) and hi - lo < bins:
+        edges = np.arange(lo - 0.5, hi + 1.5)
+        fine_edges = edges
+    else:
+        hi = hi if hi > lo else lo + 1.0
+        edges = np.linspace(lo, hi, bins + 1)
+        fine_edges = np.linspace(lo, hi, bins * KDE_SUBBINS + 1)
+    fine_counts, _ = np.histogram(x, bins=fine_edges)
+    counts = fine_counts.reshape(len(edges) - 1, -1).sum(axis=1)
+    return {"edges": edges, "counts": counts, "fine_edges": fine_edges, "fine_counts": fine_counts,
+            "std": float(x.std(ddof=1)) if len(x) > 1 else 0.0}
+
+def _score_bins(scores: pd.Series):
+    """
+    (bin edges, bin index per row) for BOX_BINS equal-width exam_score bins.
+    """
+    y = scores.to_numpy(dtype=float)
+    lo, hi = float(y.min()), float(y.max())
+    hi = hi if hi > lo else lo + 1.0
+    bin_idx = np.minimum(((y - lo) * (BOX_BINS / (hi - lo))).astype(np.intp), BOX_BINS - 1)
+    return np.linspace(lo, hi, BOX_BINS + 1), bin_idx
+
+def _box_stats(categories: pd.Series, score_bins):
+    """
+    Per-category quartiles and whiskers (Tukey's 1.5 IQR rule) read off one
+    (category x score bin) count table, to within (score range) / BOX_BINS.
+    """
+    edges, bin_idx = score_bins
+    codes, labels = pd.factorize(categories, sort=True)
+    table = np.bincount(codes * BOX_BINS + bin_idx, minlength=len(labels) * BOX_BINS).reshape(len(labels), BOX_BINS)
+
+    stats = []
+    for label, counts in zip(labels, table):
+        cum = np.cumsum(counts)
+        n = cum[-1]
+
+        def quantile(q):
+            i = int(np.searchsorted(cum, q * n))
+            before = cum[i - 1] if i else 0
+            return float(edges[i] + (edges[i + 1] - edges[i]) * (q * n - before) / max(counts[i], 1))
+
+        q1, med, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+        iqr = q3 - q1
+        nonempty = np.flatnonzero(counts)
+        centres = (edges[nonempty] + edges[nonempty + 1]) / 2
+        inside = centres[(centres >= q1 - 1.5 * iqr) & (centres <= q3 + 1.5 * iqr)]
+        stats.append({"label": str(label), "q1": q1, "med": med, "q3": q3,
+                      "whislo": float(inside.min()) if len(inside) else q1,
+                      "whishi": float(inside.max()) if len(inside) else q3})
+    return stats
+
+def aggregate(df: pd.DataFrame, spec: dict, bins: int, shared=None):
+    """
+    Everything a binned-mode plot needs, in O(rows) time and O(bins) space.
+    `shared` carries intermediates reused across plots (the score bins every
+    boxplot needs) from one call to the next.
+    """
+    if spec["kind"] == "heatmap":
+        return _correlation(df[spec["columns"]])
+    if spec["kind"] == "hist":
+        return _histogram(df[spec["columns"][0]], bins)
+    col, target = spec["columns"]
+    shared = {} if shared is None else shared
+    if target not in shared:
+        shared[target] = _score_bins(df[target])
+    return _box_stats(df[col], shared[target])
+
+# --- Rendering ---
+
+def _binned_kde(hist, n_points=200):
+    """
+    Gaussian KDE (Scott's bandwidth, as seaborn uses) evaluated from the fine
+    bin counts instead of the raw values, scaled to bar counts.
+    """
+    counts, edges = hist["fine_counts"], hist["fine_edges"]
+    n = counts.sum()
+    centres = (edges[:-1] + edges[1:]) / 2
+    bandwidth = hist["std"] * n ** (-1 / 5)
+    grid = np.linspace(centres[counts > 0].min(), centres[counts > 0].max(), n_points)
+    if bandwidth <= 0:
+        return grid, np.zeros_like(grid)
+    nonempty = counts > 0
+    z = (grid[:, None] - centres[nonempty][None, :]) / bandwidth
+    density = (np.exp(-0.5 * z ** 2) @ counts[nonempty]) / (n * bandwidth * np.sqrt(2 * np.pi))
+    bar_width = np.diff(hist["edges"]).mean()
+    return grid, density * n * bar_width
+
+def render_plot(spec: dict, data, output_dir: str, binned: bool):
+    """
+    Draws one plot. `data` is the plot's columns (exact mode) or the output
+    of aggregate() (binned mode).
+    """
+    if spec["kind"] == "heatmap":
+        plt.figure(figsize=(12, 10))
+        corr = data if binned else data.corr()
+        sns.heatmap(corr, annot=True, cmap='coolwarm', fmt=".2f", linewidths=0.5)
+        plt.title("Feature Correlation Heatmap")
+
+    elif spec["kind"] == "hist":
         plt.figure(figsize=(8, 5))
-        sns.histplot(df[col], kde=True, color='skyblue')
-        plt.title(f"Distribution of {col}")
-        plt.xlabel(col)
+        if binned:
+            plt.stairs(data["counts"], data["edges"], fill=True, color=spec["color"], alpha=0.5)
+            plt.stairs(data["counts"], data["edges"], color='white', linewidth=0.5)
+            plt.plot(*_binned_kde(data), color=spec["color"], linewidth=1.5)
+        else:
+            sns.histplot(data[spec["columns"][0]], kde=True, color=spec["color"])
+        plt.title(spec["title"])
+        plt.xlabel(spec["xlabel"])
         plt.ylabel("Frequency")
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, f"dist_{col}.png"))
-        plt.close()
-    
-    # Target Variable Distribution
-    plt.figure(figsize=(8, 5))
-    sns.histplot(df['exam_score'], kde=True, color='purple')
-    plt.title("Distribution of Target: Exam Score")
-    plt.xlabel("Exam Score")
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "dist_exam_score.png"))
-    plt.close()
-    print("Generated: Feature & Target distribution plots")
 
-def plot_categorical_boxplots(df: pd.DataFrame, output_dir: str):
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns
-    
-    for col in categorical_cols:
+    else:
+        col = spec["columns"][0]
         plt.figure(figsize=(10, 6))
-        # Sort by median score to make plot readable
-        order = df.groupby(col)['exam_score'].median().sort_values().index
-        sns.boxplot(x=col, y='exam_score', data=df, order=order, palette="viridis")
+        if binned:
+            # Sort by median score to make plot readable; outliers aren't drawn
+            stats = sorted(data, key=lambda s: s["med"])
+            ax = plt.gca()
+            colors = sns.color_palette("viridis", len(stats))
+            line = {"color": "0.3"}
+            artists = ax.bxp(stats, showfliers=False, patch_artist=True, widths=0.8, medianprops=line,
+                             whiskerprops=line, capprops=line, boxprops={"edgecolor": "0.3"})
+            for box, color in zip(artists["boxes"], colors):
+                box.set_facecolor(color)
+            ax.set_xlabel(col)
+            ax.set_ylabel('exam_score')
+        else:
+            # Sort by median score to make plot readable
+            order = data.groupby(col)['exam_score'].median().sort_values().index
+            sns.boxplot(x=col, y='exam_score', data=data, order=order, hue=col, palette="viridis", legend=False)
         plt.title(f"Exam Score vs {col}")
         plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, f"boxplot_{col}.png"))
-        plt.close()
-    print("Generated: Categorical boxplots")
 
-def generate_eda(filepath, output_dir="plots"):
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, spec["file"]))
+    plt.close()
+
+# Exact-mode workers read plot columns from this frame, handed over once per
+# worker by the pool initializer rather than once per plot
+_FRAME = None
+
+def _init_worker(frame):
+    global _FRAME
+    _FRAME = frame
+    set_style()
+
+def _render_task(spec, data, output_dir, binned):
+    if data is None:
+        data = _FRAME[spec["columns"]]
+    render_plot(spec, data, output_dir, binned)
+    return spec["file"]
+
+def _plot_key(spec, data, binned, code_sha256):
+    """
+    Hash of everything a plot depends on: its spec, this module's code and
+    its input (the columns themselves, or the aggregates in binned mode).
+    """
+    h = hashlib.sha256(json.dumps({"spec": spec, "binned": binned, "code": code_sha256}, sort_keys=True).encode())
+    if isinstance(data, pd.DataFrame):
+        h.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    elif binned and spec["kind"] == "hist":
+        for name in ("edges", "counts", "fine_edges", "fine_counts", "std"):
+            h.update(np.asarray(data[name]).tobytes())
+    else:
+        h.update(json.dumps(data, sort_keys=True).encode())
+    return h.hexdigest()
+
+def generate_eda(filepath, output_dir="plots", jobs=None, binned=False, bins=50, sample=None, force=False):
+    """
+    Writes the EDA plots. Plots are rendered in parallel worker processes,
+    and a plot whose inputs (and this module) are unchanged since the last
+    run is skipped, keyed by a content hash stored in `output_dir`.
+
+    Args:
+        filepath (str): CSV or .parquet dataset.
+        output_dir (str): Where the PNGs go.
+        jobs (int): Worker processes; defaults to one per CPU, 1 renders in-process.
+        binned (bool): Draw histograms, KDEs and boxplots from pre-aggregated
+            counts instead of raw rows, for datasets with millions of rows.
+        bins (int): Histogram bars in binned mode.
+        sample (int): Plot a fixed random sample of this many rows instead of all of them.
+        force (bool): Re-render every plot.
+    """
     print("--- Phase 3: Exploratory Data Analysis ---")
     if not os.path.exists(filepath):
         print(f"File not found: {filepath}")
         return
 
-    df = pd.read_csv(filepath)
+    start = time.perf_counter()
+    df = load_data(filepath, verbose=False)
+    if sample is not None and sample < len(df):
+        df = df.sample(n=sample, random_state=0).reset_index(drop=True)
     os.makedirs(output_dir, exist_ok=True)
     set_style()
-    
-    plot_correlation_heatmap(df, output_dir)
-    plot_distributions(df, output_dir)
-    plot_categorical_boxplots(df, output_dir)
-    
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    code_sha256 = file_sha256(__file__)
+
+    # Decide what is stale. A plot is only skipped if its file is still the
+    # one this run's key was recorded for.
+    tasks, keys, shared = [], {}, {}
+    for spec in plot_specs(df):
+        data = aggregate(df, spec, bins, shared) if binned else df[spec["columns"]]
+        key = keys[spec["file"]] = _plot_key(spec, data, binned, code_sha256)
+        path = os.path.join(output_dir, spec["file"])
+        previous = manifest.get(spec["file"], {})
+        if (not force and previous.get("key") == key and os.path.exists(path)
+                and file_sha256(path) == previous.get("sha256")):
+            continue
+        tasks.append((spec, data if binned else None))
+    n_skipped = len(keys) - len(tasks)
+
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+    if jobs > 1:
+        frame = None if binned else df[sorted({c for spec, _ in tasks for c in spec["columns"]})]
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(frame,)) as pool:
+            futures = [pool.submit(_render_task, spec, data, output_dir, binned) for spec, data in tasks]
+            for future in futures:
+                print(f"Generated: {future.result()}")
+    else:
+        for spec, data in tasks:
+            render_plot(spec, df[spec["columns"]] if data is None else data, output_dir, binned)
+            print(f"Generated: {spec['file']}")
+
+    for spec, _ in tasks:
+        manifest[spec["file"]] = {"key": keys[spec["file"]],
+                                  "sha256": file_sha256(os.path.join(output_dir, spec["file"]))}
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=4)
+
+    print(f"Rendered {len(tasks)} plot(s), {n_skipped} unchanged, in {time.perf_counter() - start:.2f}s")
     print(f"All plots saved to {output_dir}/")
 
 if __name__ == "__main__":
-    filepath = os.path.join("data", "Exam_Score_Prediction.csv")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate EDA plots.")
+    parser.add_argument("filepath", nargs="?", default=os.path.join("data", "Exam_Score_Prediction.csv"))
+    parser.add_argument("--output-dir", default="plots")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--binned", action="store_true", help="Plot from pre-aggregated counts (large datasets)")
+    parser.add_argument("--bins", type=int, default=50, help="Histogram bars in binned mode")
+    parser.add_argument("--sample", type=int, default=None, help="Plot a random sample of this many rows")
+    parser.add_argument("--force", action="store_true", help="Re-render plots even if unchanged")
+    args = parser.parse_args()
+
+    filepath = args.filepath
     if not os.path.exists(filepath):
-        filepath = os.path.join("..", "data", "Exam_Score_Prediction.csv")
-        
-    generate_eda(filepath)
+        filepath = os.path.join("..", filepath)
+
+    generate_eda(filepath, output_dir=args.output_dir, jobs=args.jobs, binned=args.binned,
+                 bins=args.bins, sample=args.sample, force=args.force)
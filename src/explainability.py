@@ -1,42 +1,115 @@
 import joblib
+import json
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 import os
 import sys
 
 # Ensure src is in path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.utils import file_sha256, load_matrix_schema
+
+MANIFEST_FILE = "feature_importance.json"
 
 def get_feature_names(pipeline):
     """
-    Attempts to extract feature names from a scikit-learn pipeline.
-    This is non-trivial because ColumnTransformer changes names/order.
+    Extracts the transformed feature names from the fitted preprocessing pipeline,
+    e.g. ['num__age', ..., 'cat__gender_female', ...], in model column order.
     """
-    # This is a heuristic extraction based on our known structure
-    # pipeline = [('feature_engineering', FeatEng), ('preprocessor', ColTrans)]
-    
-    # 1. Get raw columns (numeric + categorical)
-    # We don't have the original df here easily, but we can inspect the transformer
-    
     col_trans = pipeline.named_steps['preprocessor']
-    
-    # Extract feature names from OneHotEncoder
-    # We need to know which transformer is which.
-    # Transformers: [('num', ...), ('cat', ...)]
-    
-    feature_names = []
-    
-    # Check 'num' transformer
-    # In standard scaler, names don't change, but we need the input names.
-    # We saved them implicitly in the order of columns.
-    # This is tricky without the dataframe metadata.
-    
-    # ALTERNATIVE: Use the model's coefficients directly and just try to map them meaningfully 
-    # OR, rely on the fact that we saved X_train_processed.csv which HAS headers!
-    
-    return feature_names
+    return [str(name) for name in col_trans.get_feature_names_out()]
+
+def format_feature_name(name):
+    # Clean up sklearn output like "cat__gender_male" -> "Gender Male"
+    name = name.replace("cat__", "").replace("num__", "")
+    return name.replace("_", " ").title()
+
+def build_feature_manifest(model, pipeline, model_sha256=None):
+    """
+    Builds the feature-name/importance manifest for a fitted model.
+    Returns None when the model exposes neither coefficients nor importances.
+    """
+    if hasattr(model, "coef_"):
+        importances, kind = np.ravel(model.coef_), "coefficient"
+    elif hasattr(model, "feature_importances_"):
+        importances, kind = model.feature_importances_, "feature_importance"
+    else:
+        return None
+
+    feature_names = get_feature_names(pipeline)
+    if len(feature_names) != len(importances):
+        print("Feature names don't line up with the model's inputs; using positional names.")
+        feature_names = [f"Feature {i}" for i in range(len(importances))]
+
+    return {
+        "model_type": type(model).__name__,
+        "model_sha256": model_sha256,
+        "importance_kind": kind,
+        "features": [
+            {"name": name, "feature": format_feature_name(name), "importance": float(imp)}
+            for name, imp in zip(feature_names, importances)
+        ],
+    }
+
+def write_feature_manifest(model_dir="models"):
+    """
+    Writes models/feature_importance.json for the current best_model.pkl, stamped
+    with the model's SHA-256 so consumers can tell when it is stale.
+    """
+    model_path = os.path.join(model_dir, "best_model.pkl")
+    pipeline_path = os.path.join(model_dir, "preprocessing_pipeline.pkl")
+
+    manifest = build_feature_manifest(
+        joblib.load(model_path), joblib.load(pipeline_path), model_sha256=file_sha256(model_path)
+    )
+    if manifest is None:
+        print("Model structure not supported for direct extraction; no manifest written.")
+        return None
+
+    manifest_path = os.path.join(model_dir, MANIFEST_FILE)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=4)
+    print(f"Feature manifest saved to {manifest_path}")
+    return manifest
+
+def load_feature_manifest(model_dir="models"):
+    """
+    Loads the feature manifest for the current model. If the manifest is missing
+    or was written for a different best_model.pkl, it is rebuilt in memory from
+    the pickles instead. Returns None if the model can't be found.
+    """
+    model_path = os.path.join(model_dir, "best_model.pkl")
+    if not os.path.exists(model_path):
+        model_dir = os.path.join("..", "..", model_dir)
+        model_path = os.path.join(model_dir, "best_model.pkl")
+    pipeline_path = os.path.join(model_dir, "preprocessing_pipeline.pkl")
+
+    if not os.path.exists(model_path) or not os.path.exists(pipeline_path):
+        print("Model or pipeline not found.")
+        return None
+
+    model_sha256 = file_sha256(model_path)
+    manifest_path = os.path.join(model_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("model_sha256") == model_sha256:
+            return manifest
+        print("Feature manifest is stale; rebuilding from model artifacts.")
+
+    return build_feature_manifest(joblib.load(model_path), joblib.load(pipeline_path), model_sha256)
+
+def top_feature_importance(manifest, top_n=10):
+    """
+    Formats a manifest as the API payload: [{'feature', 'importance'}], sorted by
+    absolute importance.
+    """
+    data = [
+        {"feature": f["feature"], "importance": abs(f["importance"])}
+        for f in manifest["features"]
+    ]
+    data.sort(key=lambda x: x['importance'], reverse=True)
+    return data[:top_n]
 
 def generate_explanations(model_dir="models", data_dir="data", output_dir="plots"):
     print("--- Phase 7: Explainability & Insights ---")
@@ -50,9 +123,9 @@ def generate_explanations(model_dir="models", data_dir="data", output_dir="plots
     
     model = joblib.load(model_path)
     
-    # Load processed training data to get feature names
-    X_train = pd.read_csv(os.path.join(data_dir, "X_train_processed.csv"))
-    feature_names = X_train.columns.tolist()
+    # Feature names come from the processed matrix's schema sidecar; no need to load the data
+    feature_names = load_matrix_schema(os.path.join(data_dir, "X_train_processed.npy"))["feature_names"]
+    feature_names = [format_feature_name(name) for name in feature_names]
     
     importances = None
     
@@ -79,9 +152,13 @@ def generate_explanations(model_dir="models", data_dir="data", output_dir="plots
     fi_df['Abs_Importance'] = fi_df['Importance'].abs()
     fi_df = fi_df.sort_values(by='Abs_Importance', ascending=False).head(15) # Top 15
     
-    # Plot
+    # Plot. Plotting libraries are imported here, not at module level, because the
+    # API imports this module for the manifest helpers and never draws anything
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     plt.figure(figsize=(10, 8))
-    sns.barplot(x="Importance", y="Feature", data=fi_df, palette="viridis")
+    sns.barplot(x="Importance", y="Feature", data=fi_df, hue="Feature", palette="viridis", legend=False)
     plt.title("Top Feature Drivers of Exam Score")
     plt.xlabel("Impact (Coefficient/Importance)")
     plt.tight_layout()
@@ -95,76 +172,10 @@ def get_feature_importance(model_dir="models", data_dir="data"):
     """
     Returns feature importance as a list of dicts for API consumption.
     """
-    model_path = os.path.join(model_dir, "best_model.pkl")
-    pipeline_path = os.path.join(model_dir, "preprocessing_pipeline.pkl")
-    
-    # Path fallbacks
-    if not os.path.exists(model_path):
-        model_path = os.path.join("..", "..", model_dir, "best_model.pkl")
-        pipeline_path = os.path.join("..", "..", model_dir, "preprocessing_pipeline.pkl")
-        
-    if not os.path.exists(model_path) or not os.path.exists(pipeline_path): 
-        print("Model or pipeline not found.")
+    manifest = load_feature_manifest(model_dir)
+    if manifest is None:
         return []
-
-    model = joblib.load(model_path)
-    pipeline = joblib.load(pipeline_path)
-    
-    feature_names = []
-    
-    # Try to extract names from ColumnTransformer
-    try:
-        if hasattr(pipeline, "get_feature_names_out"):
-            feature_names = pipeline.get_feature_names_out()
-        else:
-            # Fallback manual extraction
-            # Based on preprocessing.py structure: ['num', 'cat']
-            # We know the order: numeric then categorical
-            
-            # Numeric columns from preprocessing.py
-            num_cols = ['age', 'study_hours', 'class_attendance', 'sleep_hours', 'study_efficiency']
-            
-            # Categorical columns
-            cat_cols = ['gender', 'course', 'internet_access', 'sleep_quality', 'study_method', 'facility_rating', 'exam_difficulty']
-            
-            # Get encoder from transformer
-            # Accessing the 'cat' transformer
-            # ColumnTransformer.transformers_ is a list of tuples
-            # We search for 'cat'
-            trans = pipeline.named_steps.get('preprocessor')
-            if trans:
-                for name, est, cols in trans.transformers_:
-                    if name == "num":
-                        feature_names.extend(num_cols)
-                    elif name == "cat" and hasattr(est, "get_feature_names_out"):
-                        feature_names.extend(est.get_feature_names_out(cat_cols))
-    except Exception as e:
-        print(f"Error extracting names: {e}")
-        # Last resort fallback if everything fails
-        feature_names = [f"Feature {i}" for i in range(100)] 
-
-    importances = []
-    if hasattr(model, "coef_"):
-        importances = model.coef_
-    elif hasattr(model, "feature_importances_"):
-        importances = model.feature_importances_
-    else:
-        return []
-        
-    # Create list of dicts
-    data = []
-    for i, imp in enumerate(importances):
-        if i < len(feature_names):
-            name = str(feature_names[i])
-            # Clean up sklearn output like "cat__gender_male" -> "Gender: Male"
-            name = name.replace("cat__", "").replace("num__", "")
-            name = name.replace("_", " ").title()
-            
-            data.append({"feature": name, "importance": abs(float(imp))})
-        
-    # Sort by importance desc
-    data.sort(key=lambda x: x['importance'], reverse=True)
-    return data[:10] # Top 10
+    return top_feature_importance(manifest) # Top 10
 
 
 if __name__ == "__main__":
@@ -0,0 +1,216 @@
+import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.preprocessing import FeatureEngineer, compute_study_efficiency
+
+# Columns FeatureEngineer derives from raw inputs rather than reading them directly
+DERIVED_FEATURES = {
+    'study_efficiency': (compute_study_efficiency, ('study_hours', 'sleep_hours')),
+}
+
+class LinearPlan:
+    """
+    Flat NumPy execution plan for FeatureEngineer -> ColumnTransformer -> linear model.
+
+    The scaler is folded into the coefficients (w_j / scale_j, with the mean moved
+    into the intercept) and every one-hot block becomes a per-category coefficient
+    lookup, so scoring is a handful of vector ops with no DataFrame in sight.
+
+    `numeric_offsets` keeps the share of the intercept each numeric column's mean
+    was folded into (w_j * mean_j / scale_j), so explain() can still report
+    coefficient x standardized value per column.
+    """
+    def __init__(self, intercept, numeric_cols, numeric_weights, categorical_cols,
+                 categories, category_weights, handle_unknown='ignore', numeric_offsets=None):
+        self.intercept = float(intercept)
+        self.numeric_cols = list(numeric_cols)
+        self.numeric_weights = np.asarray(numeric_weights, dtype=float)
+        self.numeric_offsets = (np.zeros(len(self.numeric_cols)) if numeric_offsets is None
+                                else np.asarray(numeric_offsets, dtype=float))
+        self.categorical_cols = list(categorical_cols)
+        self.categories = [np.asarray(c).astype(str) for c in categories]
+        self.category_weights = [np.asarray(w, dtype=float) for w in category_weights]
+        self.handle_unknown = handle_unknown
+
+        # Raw inputs the caller has to supply
+        required = []
+        for col in self.numeric_cols:
+            sources = DERIVED_FEATURES[col][1] if col in DERIVED_FEATURES else (col,)
+            required.extend(c for c in sources if c not in required)
+        required.extend(c for c in self.categorical_cols if c not in required)
+        self.input_columns = required
+
+    def _numeric_matrix(self, columns, n_rows):
+        raw = {col: np.asarray(columns[col], dtype=float) for col in self.input_columns
+               if col not in self.categorical_cols}
+        matrix = np.empty((n_rows, len(self.numeric_cols)), dtype=float)
+        for j, col in enumerate(self.numeric_cols):
+            if col in DERIVED_FEATURES:
+                fn, sources = DERIVED_FEATURES[col]
+                matrix[:, j] = fn(*(raw[c] for c in sources))
+            else:
+                matrix[:, j] = raw[col]
+        return matrix
+
+    def _category_index(self, j, values):
+        """
+        Returns (index into categories[j], known mask) for each value.
+        Categories are sorted (OneHotEncoder sorts them), so a binary search suffices.
+        """
+        cats = self.categories[j]
+        values = np.asarray(values).astype(str)
+        idx = np.searchsorted(cats, values)
+        idx = np.minimum(idx, len(cats) - 1)
+        known = cats[idx] == values
+        if self.handle_unknown == 'error' and not known.all():
+            unknown = sorted(set(values[~known]))
+            raise ValueError(f"Found unknown categories {unknown} in column {self.categorical_cols[j]}")
+        return idx, known
+
+    @property
+    def fields(self):
+        # Columns explain() attributes to: numeric features, then one per categorical input
+        return self.numeric_cols + self.categorical_cols
+
+    @property
+    def base_value(self):
+        # The model's own intercept: the prediction for a row at the training means
+        # with every one-hot column at zero
+        return self.intercept + float(np.sum(self.numeric_offsets))
+
+    def _check_columns(self, columns):
+        missing = [c for c in self.input_columns if c not in columns]
+        if missing:
+            raise ValueError(f"Missing input column(s): {missing}")
+        return len(columns[self.input_columns[0]])
+
+    def predict(self, columns) -> np.ndarray:
+        """
+        Args:
+            columns (dict): Mapping of raw input column -> sequence of values.
+        Returns:
+            np.ndarray: Unrounded predictions, one per row.
+        """
+        n_rows = self._check_columns(columns)
+        numeric = self._numeric_matrix(columns, n_rows)
+
+        # Accumulate column by column rather than with a BLAS matmul, so each row's
+        # result is bit-identical no matter how many rows share the batch
+        prediction = np.full(n_rows, self.intercept)
+        for j, weight in enumerate(self.numeric_weights):
+            prediction += numeric[:, j] * weight
+
+        for j, col in enumerate(self.categorical_cols):
+            idx, known = self._category_index(j, columns[col])
+            prediction += np.where(known, self.category_weights[j][idx], 0.0)
+
+        return prediction
+
+    def explain(self, columns):
+        """
+        Predicts and attributes each prediction to `fields` in the same pass.
+        A numeric column contributes coefficient x standardized value; a
+        categorical column contributes the coefficient of its one-hot category
+        (0 for unknown categories), i.e. its one-hot block summed.
+
+        Returns:
+            tuple: (predictions identical to predict(), contributions of shape
+            (n_rows, len(fields))). Each row's contributions sum to its
+            prediction minus `base_value`.
+        """
+        n_rows = self._check_columns(columns)
+        numeric = self._numeric_matrix(columns, n_rows)
+        contributions = np.empty((n_rows, len(self.fields)), dtype=float)
+
+        # Same accumulation order as predict(), so the scores match it bit for bit
+        prediction = np.full(n_rows, self.intercept)
+        for j, weight in enumerate(self.numeric_weights):
+            term = numeric[:, j] * weight
+            prediction += term
+            contributions[:, j] = term - self.numeric_offsets[j]
+
+        offset = len(self.numeric_cols)
+        for j, col in enumerate(self.categorical_cols):
+            idx, known = self._category_index(j, columns[col])
+            term = np.where(known, self.category_weights[j][idx], 0.0)
+            prediction += term
+            contributions[:, offset + j] = term
+
+        return prediction, contributions
+
+def _is_sorted(values):
+    return bool(np.all(values[:-1] < values[1:]))
+
+def compile_plan(preprocessor, model):
+    """
+    Compiles the fitted preprocessing pipeline + model into a LinearPlan.
+    Returns None when the pipeline or model isn't a shape the plan can reproduce
+    exactly; callers should then fall back to the sklearn path.
+    """
+    steps = getattr(preprocessor, "named_steps", None)
+    if not steps or list(steps) != ['feature_engineering', 'preprocessor']:
+        return None
+    if not isinstance(steps['feature_engineering'], FeatureEngineer):
+        return None
+
+    if not type(model).__module__.startswith("sklearn.linear_model"):
+        return None
+    coef = np.ravel(getattr(model, "coef_", None))
+    intercept = np.ravel(getattr(model, "intercept_", 0.0))
+    if coef.dtype == object or intercept.size != 1:
+        return None
+
+    col_trans = steps['preprocessor']
+    offset = 0
+    intercept = float(intercept[0])
+    numeric_cols, numeric_weights, numeric_offsets = [], [], []
+    categorical_cols, categories, category_weights = [], [], []
+    handle_unknown = 'ignore'
+
+    for name, est, cols in col_trans.transformers_:
+        if name == 'remainder':
+            if est == 'drop' or len(cols) == 0:
+                continue
+            return None
+        est_steps = getattr(est, "named_steps", {})
+
+        if name == 'num' and list(est_steps) == ['scaler']:
+            scaler = est_steps['scaler']
+            n = len(cols)
+            mean = scaler.mean_ if scaler.with_mean else np.zeros(n)
+            scale = scaler.scale_ if scaler.with_std else np.ones(n)
+            w = coef[offset:offset + n]
+            if not all(isinstance(c, str) for c in cols):
+                return None
+            numeric_cols.extend(cols)
+            numeric_weights.extend(w / scale)
+            numeric_offsets.extend(w * mean / scale)
+            intercept -= float(np.sum(w * mean / scale))
+            offset += n
+
+        elif name == 'cat' and list(est_steps) == ['onehot']:
+            encoder = est_steps['onehot']
+            if encoder.drop is not None or encoder.min_frequency is not None or encoder.max_categories is not None:
+                return None
+            if encoder.handle_unknown not in ('ignore', 'error'):
+                return None
+            # The lookup relies on binary search, so categories must be sorted as strings
+            if not all(_is_sorted(np.asarray(c).astype(str)) for c in encoder.categories_):
+                return None
+            handle_unknown = encoder.handle_unknown
+            for col, cats in zip(cols, encoder.categories_):
+                categorical_cols.append(col)
+                categories.append(cats)
+                category_weights.append(coef[offset:offset + len(cats)])
+                offset += len(cats)
+        else:
+            return None
+
+    if offset != coef.size:
+        return None
+
+    return LinearPlan(intercept, numeric_cols, numeric_weights, categorical_cols,
+                      categories, category_weights, handle_unknown=handle_unknown,
+                      numeric_offsets=numeric_offsets)
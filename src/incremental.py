@@ -0,0 +1,316 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression, SGDRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import OneHotEncoder
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.batch_score import iter_chunks
+from src.explainability import write_feature_manifest
+from src.preprocessing import build_full_pipeline
+from src.registry import publish_version, serving_dir
+from src.utils import load_data
+
+TARGET = "exam_score"
+
+def make_online_model(model, random_state=42):
+    """
+    Returns an SGDRegressor that predicts exactly like `model`, so partial_fit
+    continues from the current coefficients instead of from zero. A model that
+    already is an SGDRegressor (a previous incremental update) is reused.
+    """
+    if isinstance(model, SGDRegressor):
+        return model
+    if not type(model).__module__.startswith("sklearn.linear_model") or np.ravel(model.intercept_).size != 1:
+        raise ValueError(f"Incremental updates need a linear model, not {type(model).__name__}; run a full retrain")
+
+    # Small decaying steps: the warm start is already close, new chunks only nudge it
+    online = SGDRegressor(penalty=None, learning_rate="invscaling", eta0=1e-3, random_state=random_state)
+    online.coef_ = np.ravel(model.coef_).astype(float)
+    online.intercept_ = np.ravel(model.intercept_).astype(float)
+    online.n_features_in_ = online.coef_.size
+    online.t_ = 1.0
+    return online
+
+def _column_transformer(preprocessor):
+    return preprocessor.named_steps['preprocessor']
+
+def _feature_names(preprocessor):
+    return [str(name) for name in _column_transformer(preprocessor).get_feature_names_out()]
+
+def extend_vocabulary(preprocessor, engineered):
+    """
+    Adds categories seen in `engineered` (FeatureEngineer output) but not at fit
+    time to the fitted OneHotEncoder, keeping each vocabulary sorted.
+
+    Unknown categories were encoded as all zeros (handle_unknown='ignore'), and
+    the new one-hot columns get zero coefficients in remap_coefficients(), so
+    predictions don't change until the model has been trained on them.
+
+    Returns:
+        dict: column -> sorted list of categories that were added.
+    """
+    col_trans = _column_transformer(preprocessor)
+    for name, est, cols in col_trans.transformers_:
+        encoder = getattr(est, "named_steps", {}).get('onehot')
+        if encoder is not None:
+            break
+    else:
+        return {}
+    if encoder.drop is not None or encoder.min_frequency is not None or encoder.max_categories is not None:
+        raise ValueError("Can't extend a OneHotEncoder that drops or groups categories; run a full retrain")
+
+    added, categories = {}, []
+    for col, known in zip(cols, encoder.categories_):
+        seen = pd.unique(engineered[col].dropna().astype(str))
+        new = sorted(set(seen) - set(known.astype(str)))
+        if new:
+            added[col] = new
+        categories.append(np.array(sorted(set(known.astype(str)) | set(new)), dtype=object))
+    if not added:
+        return {}
+
+    # A fresh encoder with an explicit vocabulary, fitted on a single valid row
+    extended = OneHotEncoder(categories=categories, handle_unknown=encoder.handle_unknown,
+                             sparse_output=encoder.sparse_output, dtype=encoder.dtype)
+    extended.fit(pd.DataFrame([[cats[0] for cats in categories]], columns=cols))
+    est.steps[-1] = ('onehot', extended)
+
+    # The encoder's output block grew; shift the column ranges recorded at fit time
+    grown = sum(len(cats) for cats in categories) - sum(len(cats) for cats in encoder.categories_)
+    block = col_trans.output_indices_[name]
+    for key, span in col_trans.output_indices_.items():
+        if key == name:
+            col_trans.output_indices_[key] = slice(span.start, span.stop + grown)
+        elif span.start >= block.stop and span.stop > span.start:
+            col_trans.output_indices_[key] = slice(span.start + grown, span.stop + grown)
+    return added
+
+def remap_coefficients(model, old_names, new_names):
+    """
+    Re-lays out the coefficients after the vocabulary grew: existing columns
+    keep their weight, new one-hot columns start at zero.
+    """
+    if old_names == new_names:
+        return
+    position = {name: j for j, name in enumerate(new_names)}
+    coef = np.zeros(len(new_names))
+    coef[[position[name] for name in old_names]] = model.coef_
+    model.coef_ = coef
+    model.n_features_in_ = coef.size
+
+def update_scaler(preprocessor, model, engineered):
+    """
+    Folds a chunk into the StandardScaler's running mean/variance and rescales
+    the coefficients to match, so the model's predictions are unchanged:
+    with f(x) = b + sum(w (x - m) / s), the new statistics m', s' need
+    w' = w s' / s and b' = b + sum(w (m' - m) / s).
+    """
+    col_trans = _column_transformer(preprocessor)
+    for name, est, cols in col_trans.transformers_:
+        scaler = getattr(est, "named_steps", {}).get('scaler')
+        if scaler is None:
+            continue
+        names = list(_feature_names(preprocessor))
+        positions = [names.index(f"{name}__{col}") for col in cols]
+
+        old_mean, old_scale = scaler.mean_.copy(), scaler.scale_.copy()
+        scaler.partial_fit(engineered[cols])
+        w = model.coef_[positions]
+        model.intercept_ = model.intercept_ + np.sum(w * (scaler.mean_ - old_mean) / old_scale)
+        model.coef_[positions] = w * scaler.scale_ / old_scale
+
+def partial_update(preprocessor, model, chunk, epochs=1):
+    """
+    One incremental step on a chunk of raw rows (with the target column):
+    vocabulary, scaler statistics, then `epochs` partial_fit passes.
+
+    Returns:
+        dict: column -> categories added by this chunk.
+    """
+    y = chunk[TARGET].to_numpy(dtype=float)
+    engineered = preprocessor.named_steps['feature_engineering'].transform(chunk.drop(columns=[TARGET]))
+
+    old_names = _feature_names(preprocessor)
+    added = extend_vocabulary(preprocessor, engineered)
+    remap_coefficients(model, old_names, _feature_names(preprocessor))
+    update_scaler(preprocessor, model, engineered)
+
+    X = _column_transformer(preprocessor).transform(engineered)
+    for _ in range(epochs):
+        model.partial_fit(X, y)
+    return added
+
+def evaluate(preprocessor, model, frame):
+    if frame is None or frame.empty:
+        return None
+    y_true = frame[TARGET].to_numpy()
+    y_pred = model.predict(preprocessor.transform(frame.drop(columns=[TARGET])))
+    return {
+        "Test_R2": r2_score(y_true, y_pred),
+        "MAE": mean_absolute_error(y_true, y_pred),
+        "RMSE": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+    }
+
+def full_retrain(frame):
+    """
+    The from-scratch baseline: detect columns, fit FeatureEngineer, the
+    scaler/encoder and a LinearRegression on every row. Returns (preprocessor,
+    model, seconds).
+    """
+    start = time.perf_counter()
+    preprocessor = build_full_pipeline(frame)
+    X = preprocessor.fit_transform(frame.drop(columns=[TARGET]))
+    model = LinearRegression().fit(X, frame[TARGET].to_numpy())
+    return preprocessor, model, time.perf_counter() - start
+
+def load_serving_artifacts(registry_dir):
+    """
+    (version, path, preprocessor, model) for the registry's CURRENT version, or
+    for the flat artifacts in `registry_dir` when nothing is published.
+    """
+    version, path = serving_dir(registry_dir)
+    preprocessor = joblib.load(os.path.join(path, "preprocessing_pipeline.pkl"))
+    model = joblib.load(os.path.join(path, "best_model.pkl"))
+    return version, path, preprocessor, model
+
+def incremental_update(new_data_path, registry_dir="models", chunksize=1000, epochs=1, eval_fraction=0.2,
+                       history_path=None, publish=True, seed=42):
+    """
+    Updates the serving model with new labelled rows, reading them chunk by
+    chunk, and publishes the result as a new registry version.
+
+    Per chunk, new categories are added to the encoder, the scaler's running
+    statistics absorb the chunk, and an SGDRegressor (warm-started from the
+    current linear model) takes partial_fit steps. A random `eval_fraction`
+    of the new rows is held out for the report and never trained on.
+
+    Args:
+        new_data_path (str): CSV or Parquet file with the new rows, including exam_score.
+        registry_dir (str): Registry root holding the serving version.
+        chunksize (int): Rows per chunk.
+        epochs (int): partial_fit passes per chunk.
+        eval_fraction (float): Share of new rows held out for evaluation.
+        history_path (str): Optional CSV of every previously seen row. When given,
+            the report includes a full retrain on history + new rows, and the
+            original test split (train_test_split, random_state=42) joins the
+            evaluation set.
+        publish (bool): Whether to publish and activate the updated model.
+        seed (int): Seed for the holdout split.
+
+    Returns:
+        dict: The report (also stored in the new version's manifest).
+    """
+    print("--- Incremental Model Update ---")
+    base_version, base_path, preprocessor, model = load_serving_artifacts(registry_dir)
+    previous_preprocessor = joblib.load(os.path.join(base_path, "preprocessing_pipeline.pkl"))
+    previous_model = model
+    print(f"Updating {base_version or base_path} ({type(model).__name__})")
+
+    model = make_online_model(model, random_state=seed)
+    rng = np.random.default_rng(seed)
+    holdout, train_parts, added = [], [], {}
+    n_rows, n_chunks = 0, 0
+
+    start = time.perf_counter()
+    for chunk in iter_chunks(new_data_path, chunksize):
+        held = rng.random(len(chunk)) < eval_fraction
+        holdout.append(chunk[held])
+        train = chunk[~held]
+        if len(train):
+            for col, cats in partial_update(preprocessor, model, train, epochs=epochs).items():
+                added.setdefault(col, []).extend(cats)
+            n_rows += len(train)
+            n_chunks += 1
+            if history_path:
+                train_parts.append(train)
+    update_seconds = time.perf_counter() - start
+    print(f"Trained on {n_rows} new row(s) in {n_chunks} chunk(s) in {update_seconds:.2f}s")
+    for col, cats in added.items():
+        print(f"  New {col} categories: {cats}")
+
+    eval_frame = pd.concat(holdout) if holdout else None
+    report = {
+        "base_version": base_version,
+        "new_rows": n_rows,
+        "held_out_rows": 0 if eval_frame is None else len(eval_frame),
+        "chunks": n_chunks,
+        "added_categories": added,
+        "incremental": {"seconds": update_seconds},
+        "previous": {},
+    }
+
+    if history_path:
+        # A full retrain has to re-read every earlier row, so that counts towards its time
+        start = time.perf_counter()
+        history = load_data(history_path, verbose=False)
+        read_seconds = time.perf_counter() - start
+        history_train, history_test = train_test_split(history, test_size=0.2, random_state=42)
+        eval_frame = pd.concat([history_test, eval_frame])
+        report["held_out_rows"] = len(eval_frame)
+        full_preprocessor, full_model, fit_seconds = full_retrain(pd.concat([history_train, *train_parts]))
+        report["full_retrain"] = {
+            "seconds": read_seconds + fit_seconds,
+            "rows": len(history_train) + n_rows,
+            **(evaluate(full_preprocessor, full_model, eval_frame) or {}),
+        }
+
+    report["incremental"].update(evaluate(preprocessor, model, eval_frame) or {})
+    report["previous"].update(evaluate(previous_preprocessor, previous_model, eval_frame) or {})
+
+    print(f"\n{'model':<14} | {'R²':>7} | {'RMSE':>7} | {'seconds':>8}")
+    for name in ("previous", "incremental", "full_retrain"):
+        if name in report and "Test_R2" in report[name]:
+            result = report[name]
+            seconds = f"{result['seconds']:.2f}" if "seconds" in result else "-"
+            print(f"{name:<14} | {result['Test_R2']:>7.4f} | {result['RMSE']:>7.3f} | {seconds:>8}")
+
+    if publish:
+        staging = tempfile.mkdtemp(prefix="incremental_")
+        try:
+            joblib.dump(model, os.path.join(staging, "best_model.pkl"))
+            joblib.dump(preprocessor, os.path.join(staging, "preprocessing_pipeline.pkl"))
+            write_feature_manifest(staging)
+            metrics = {"Incremental SGD": {**report["incremental"], "Wall_Time_s": update_seconds}}
+            with open(os.path.join(staging, "metrics.json"), "w") as f:
+                json.dump(metrics, f, indent=4)
+            report["version"] = publish_version(registry_dir, staging, metadata={
+                "best_model": "Incremental SGD", "update": "incremental", "report": report,
+            })
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update the serving model with new labelled rows.")
+    parser.add_argument("new_data", help="CSV or Parquet file of new rows, with exam_score")
+    parser.add_argument("--registry", default="models", help="Registry root (default: models)")
+    parser.add_argument("--chunksize", type=int, default=1000)
+    parser.add_argument("--epochs", type=int, default=1, help="partial_fit passes per chunk")
+    parser.add_argument("--eval-fraction", type=float, default=0.2, help="Share of new rows held out")
+    parser.add_argument("--history", default=None, help="CSV of all earlier rows, to compare with a full retrain")
+    parser.add_argument("--no-publish", action="store_true", help="Report only; don't publish a version")
+    parser.add_argument("--report", default=None, help="Also write the report as JSON here")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    report = incremental_update(args.new_data, registry_dir=args.registry, chunksize=args.chunksize,
+                                epochs=args.epochs, eval_fraction=args.eval_fraction, history_path=args.history,
+                                publish=not args.no_publish, seed=args.seed)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Report saved to {args.report}")
+
+if __name__ == "__main__":
+    main()
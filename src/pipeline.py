@@ -0,0 +1,418 @@
+import argparse
+import contextlib
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.utils import file_sha256
+
+CACHE_DIR = ".pipeline_cache"
+DATA_PATH = os.path.join("data", "Exam_Score_Prediction.csv")
+
+# Stage bodies. Each runs in a worker process with the repo root as working
+# directory and calls the same entry point as running the script by hand.
+def _run_analysis(params):
+    from src.analysis import analyze_dataset
+    with open("analysis_output.txt", "w") as f, contextlib.redirect_stdout(f):
+        analyze_dataset(DATA_PATH)
+
+def _run_preprocessing(params):
+    from src.preprocessing import run_preprocessing
+    run_preprocessing(DATA_PATH)
+
+def _run_eda(params):
+    from src.eda import generate_eda
+    generate_eda(DATA_PATH, output_dir="plots")
+
+def _run_train(params):
+    from src.train import train_and_evaluate
+    train_and_evaluate(
+        os.path.join("data", "X_train_processed.npy"), os.path.join("data", "y_train.csv"),
+        os.path.join("data", "X_test_processed.npy"), os.path.join("data", "y_test.csv"),
+        output_dir="models", n_jobs=params.get("n_jobs", -1), cv=params["cv"], publish=False,
+    )
+
+def _run_publish(params):
+    from src.registry import publish_if_changed
+    with open(os.path.join("models", "metrics.json")) as f:
+        metrics = json.load(f)
+    # train.py keeps the model with the best test R²
+    best_model = max(metrics, key=lambda name: metrics[name]["Test_R2"])
+    publish_if_changed("models", "models", metadata={"best_model": best_model})
+
+def _run_explainability(params):
+    from src.explainability import generate_explanations
+    generate_explanations(model_dir="models", data_dir="data", output_dir="plots")
+
+# The offline pipeline as a DAG. Edges aren't listed: a stage depends on
+# whichever stage declares one of its inputs as an output. `code` files count as
+# inputs, so editing a stage's module invalidates it. Paths may be glob patterns.
+# `params` are part of the cache key; `runtime` params (e.g. worker counts) are
+# passed to the stage but don't change its outputs, so they aren't.
+STAGES = {
+    "analysis": {
+        "run": _run_analysis,
+        "code": ["src/analysis.py", "src/profiling.py"],
+        "inputs": [DATA_PATH],
+        "outputs": ["analysis_output.txt"],
+        "params": {},
+    },
+    "preprocessing": {
+        "run": _run_preprocessing,
+        "code": ["src/preprocessing.py", "src/utils.py"],
+        "inputs": [DATA_PATH],
+        "outputs": [
+            "models/preprocessing_pipeline.pkl",
+            "data/X_train_processed.npy", "data/X_train_processed.schema.json",
+            "data/X_test_processed.npy", "data/X_test_processed.schema.json",
+            "data/y_train.csv", "data/y_test.csv",
+        ],
+        "params": {},
+    },
+    "eda": {
+        "run": _run_eda,
+        "code": ["src/eda.py", "src/utils.py"],
+        "inputs": [DATA_PATH],
+        "outputs": ["plots/correlation_heatmap.png", "plots/dist_*.png", "plots/boxplot_*.png"],
+        "params": {},
+    },
+    "train": {
+        "run": _run_train,
+        "code": ["src/train.py", "src/explainability.py", "src/tree_engine.py", "src/utils.py"],
+        "inputs": [
+            "data/X_train_processed.npy", "data/X_train_processed.schema.json",
+            "data/X_test_processed.npy", "data/y_train.csv", "data/y_test.csv",
+            "models/preprocessing_pipeline.pkl",
+        ],
+        "outputs": ["models/best_model.pkl", "models/metrics.json", "models/feature_importance.json",
+                    "models/best_model.trees/*"],
+        "params": {"cv": 5},
+        "runtime": {"n_jobs": -1},
+    },
+    # CURRENT is this stage's output, so restoring it from the cache points the
+    # API back at the version holding the restored model. Versions themselves
+    # are append-only and outside the cache; unchanged artifacts reuse theirs.
+    "publish": {
+        "run": _run_publish,
+        "code": ["src/registry.py", "src/utils.py"],
+        "inputs": ["models/best_model.pkl", "models/preprocessing_pipeline.pkl", "models/metrics.json",
+                   "models/feature_importance.json", "models/best_model.trees/*"],
+        "outputs": ["models/CURRENT"],
+        "params": {},
+    },
+    "explainability": {
+        "run": _run_explainability,
+        "code": ["src/explainability.py", "src/utils.py"],
+        "inputs": ["models/best_model.pkl", "data/X_train_processed.schema.json"],
+        "outputs": ["plots/feature_importance.png"],
+        "params": {},
+    },
+}
+
+def expand(patterns):
+    """
+    Existing files matching the given paths or glob patterns, sorted.
+    """
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(pattern) if glob.has_magic(pattern) else [pattern] if os.path.exists(pattern) else [])
+    return sorted(paths)
+
+def dependencies(stages):
+    """
+    {stage: set of upstream stages}, matching each input against the other
+    stages' declared outputs (patterns included).
+    """
+    deps = {}
+    for name, stage in stages.items():
+        deps[name] = {
+            other for other, upstream in stages.items() if other != name
+            for path in stage["inputs"] for pattern in upstream["outputs"]
+            if path == pattern or fnmatch.fnmatch(path, pattern)
+        }
+    return deps
+
+def with_ancestors(targets, deps):
+    selected, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in selected:
+            selected.add(name)
+            todo.extend(deps[name])
+    return selected
+
+class HashCache:
+    """
+    File content hashes keyed by (path, size, mtime), persisted between runs,
+    so unchanged inputs aren't re-read just to find out they're unchanged.
+    """
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def sha256(self, path):
+        st = os.stat(path)
+        stamp = [st.st_size, st.st_mtime_ns]
+        entry = self.entries.get(path)
+        if entry is None or entry[:2] != stamp:
+            entry = self.entries[path] = stamp + [file_sha256(path)]
+        return entry[2]
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+class ArtifactStore:
+    """
+    Content-addressed cache under `root`: output files are stored once by their
+    SHA-256 in objects/, and stages/<key>.json records which files (and which
+    contents) a stage produced for a given cache key. A key seen before can be
+    satisfied by copying its outputs back instead of re-running the stage.
+    """
+    def __init__(self, root):
+        self.root = root
+        self.hashes = HashCache(os.path.join(root, "hashes.json"))
+        for sub in ("objects", "stages", "logs"):
+            os.makedirs(os.path.join(root, sub), exist_ok=True)
+
+    def _object_path(self, sha256):
+        return os.path.join(self.root, "objects", sha256[:2], sha256)
+
+    def _entry_path(self, key):
+        return os.path.join(self.root, "stages", f"{key}.json")
+
+    def stage_key(self, name, stage):
+        """
+        SHA-256 over the stage name, its params and the content of every input
+        and code file. Missing inputs hash as None, so they still change the key.
+        """
+        files = {}
+        for pattern in stage.get("code", []) + stage["inputs"]:
+            matched = expand([pattern])
+            files[pattern] = [(path, self.hashes.sha256(path)) for path in matched] or None
+        payload = json.dumps({"stage": name, "params": stage["params"], "files": files}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def lookup(self, key):
+        try:
+            with open(self._entry_path(key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def outputs_match(self, entry):
+        return all(os.path.exists(path) and self.hashes.sha256(path) == sha256
+                   for path, sha256 in entry["outputs"].items())
+
+    def restore(self, entry):
+        """
+        Copies a cached run's outputs back into place. Returns False if any
+        object has gone missing, in which case the stage has to run.
+        """
+        if not all(os.path.exists(self._object_path(sha256)) for sha256 in entry["outputs"].values()):
+            return False
+        for path, sha256 in entry["outputs"].items():
+            if os.path.exists(path) and self.hashes.sha256(path) == sha256:
+                continue
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            shutil.copy2(self._object_path(sha256), tmp_path)
+            os.replace(tmp_path, path)
+        return True
+
+    def record(self, key, name, stage, seconds):
+        """
+        Stores a finished stage's outputs as objects (copies, not links: stages
+        overwrite their outputs in place) and writes its entry.
+        """
+        outputs = {}
+        for path in expand(stage["outputs"]):
+            sha256 = outputs[path] = self.hashes.sha256(path)
+            target = self._object_path(sha256)
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copy2(path, f"{target}.tmp")
+                os.replace(f"{target}.tmp", target)
+        entry = {"stage": name, "key": key, "params": stage["params"], "outputs": outputs,
+                 "seconds": seconds, "finished_at": time.time()}
+        with open(self._entry_path(key), "w") as f:
+            json.dump(entry, f, indent=4)
+        return entry
+
+def _execute(run, params, log_path):
+    """
+    Runs one stage body in a worker process with its output captured in `log_path`.
+    """
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    start = time.perf_counter()
+    with open(log_path, "w") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            run(params)
+        except BaseException:
+            traceback.print_exc()
+            raise
+    return time.perf_counter() - start
+
+def run_pipeline(targets=None, force=(), jobs=None, dry_run=False, cache_dir=CACHE_DIR, params=None, stages=None):
+    """
+    Brings the selected stages (default: all) and their upstream stages up to
+    date. A stage whose cache key (inputs + code + params) matches a previous
+    run is skipped when its outputs are still in place, or restored from the
+    artifact store when they aren't; otherwise it runs. Stages run in a process
+    pool as soon as everything upstream has finished, so independent branches
+    (e.g. eda and train) overlap.
+
+    Args:
+        targets (list[str]): Stages to bring up to date; upstream stages are included.
+        force (iterable[str]): Stages to re-run even if cached.
+        jobs (int): Worker processes; defaults to one per CPU.
+        dry_run (bool): Only report what would run.
+        cache_dir (str): Where the artifact store lives.
+        params (dict): {stage: {param: value}} overrides.
+        stages (dict): Stage definitions; defaults to STAGES.
+
+    Returns:
+        dict: {stage: {"status": ..., "seconds": ...}}; status is one of
+        "cached", "restored", "ran", "would restore", "would run", "failed"
+        or "skipped".
+    """
+    print("--- Pipeline ---")
+    stages = {name: dict(stage) for name, stage in (stages or STAGES).items()}
+    for name, overrides in (params or {}).items():
+        if name not in stages:
+            raise ValueError(f"Unknown stage: {name}")
+        for key, value in overrides.items():
+            section = "runtime" if key in stages[name].get("runtime", {}) else "params"
+            stages[name][section] = {**stages[name].get(section, {}), key: value}
+
+    deps = dependencies(stages)
+    unknown = set(targets or []) - set(stages)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {sorted(unknown)}")
+    selected = with_ancestors(targets or list(stages), deps)
+    store = ArtifactStore(cache_dir)
+    results, running = {}, {}
+    wall_start = time.perf_counter()
+
+    def ready():
+        # Insertion order of STAGES breaks ties, so output is stable run to run
+        return [name for name in stages if name in selected and name not in results
+                and name not in running.values() and deps[name] <= set(results)]
+
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        while len(results) < len(selected):
+            for name in ready():
+                stage = stages[name]
+                upstream = {results[d]["status"] for d in deps[name] & selected}
+                if upstream & {"failed", "skipped"}:
+                    results[name] = {"status": "skipped", "seconds": 0.0}
+                    print(f"[{name}] skipped: an upstream stage failed")
+                    continue
+                if dry_run and "would run" in upstream:
+                    results[name] = {"status": "would run", "seconds": 0.0}
+                    print(f"[{name}] would run (upstream changes)")
+                    continue
+
+                key = store.stage_key(name, stage)
+                entry = None if name in force else store.lookup(key)
+                if entry is not None and store.outputs_match(entry):
+                    results[name] = {"status": "cached", "seconds": 0.0, "key": key}
+                    print(f"[{name}] up to date ({key[:12]})")
+                    continue
+                if entry is not None and dry_run:
+                    results[name] = {"status": "would restore", "seconds": 0.0, "key": key}
+                    print(f"[{name}] would restore from cache ({key[:12]})")
+                    continue
+                if entry is not None and store.restore(entry):
+                    results[name] = {"status": "restored", "seconds": 0.0, "key": key}
+                    print(f"[{name}] restored {len(entry['outputs'])} output(s) from cache ({key[:12]})")
+                    continue
+                if dry_run:
+                    results[name] = {"status": "would run", "seconds": 0.0, "key": key}
+                    print(f"[{name}] would run ({key[:12]})")
+                    continue
+
+                log_path = os.path.join(cache_dir, "logs", f"{name}.log")
+                run_params = {**stage["params"], **stage.get("runtime", {})}
+                future = pool.submit(_execute, stage["run"], run_params, log_path)
+                future.key = key
+                running[future] = name
+                print(f"[{name}] running ({key[:12]}); log: {log_path}")
+
+            if not running:
+                if len(results) < len(selected) and not ready():
+                    # Nothing runs and nothing can start, e.g. stages that depend on each other
+                    stuck = {name: sorted(deps[name] - set(results)) for name in sorted(selected - set(results))}
+                    raise RuntimeError(f"Stage(s) can never run, still waiting on (stage: dependencies): {stuck}")
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    seconds = future.result()
+                except Exception as e:
+                    results[name] = {"status": "failed", "seconds": 0.0, "error": repr(e)}
+                    print(f"[{name}] FAILED: {e!r} (see {os.path.join(cache_dir, 'logs', name + '.log')})")
+                    continue
+                missing = [p for p in stages[name]["outputs"] if not expand([p])]
+                if missing:
+                    results[name] = {"status": "failed", "seconds": seconds, "error": f"missing outputs {missing}"}
+                    print(f"[{name}] FAILED: declared output(s) not produced: {missing}")
+                    continue
+                store.record(future.key, name, stages[name], seconds)
+                results[name] = {"status": "ran", "seconds": seconds, "key": future.key}
+                print(f"[{name}] finished in {seconds:.2f}s")
+
+    store.hashes.save()
+    counts = {}
+    for result in results.values():
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"Pipeline finished in {time.perf_counter() - wall_start:.2f}s: {summary}")
+    return results
+
+def _parse_params(items):
+    params = {}
+    for item in items:
+        target, _, value = item.partition("=")
+        stage, _, key = target.partition(".")
+        if not key or not value:
+            raise SystemExit(f"Expected stage.param=value, got '{item}'")
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass # Plain strings don't need quoting
+        params.setdefault(stage, {})[key] = value
+    return params
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline pipeline, re-executing only stale stages.")
+    parser.add_argument("stages", nargs="*", help=f"Stages to bring up to date (default: all of {list(STAGES)})")
+    parser.add_argument("--force", nargs="+", default=[], metavar="STAGE", help="Re-run these even if cached")
+    parser.add_argument("--jobs", type=int, default=None, help="Stages run at once (default: CPU count)")
+    parser.add_argument("--param", nargs="+", default=[], metavar="STAGE.KEY=VALUE", help="e.g. train.cv=3")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would run")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    results = run_pipeline(args.stages or None, force=set(args.force), jobs=args.jobs, dry_run=args.dry_run,
+                           cache_dir=args.cache_dir, params=_parse_params(args.param))
+    if any(r["status"] in ("failed", "skipped") for r in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
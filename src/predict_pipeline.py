@@ -1,21 +1,78 @@
 import joblib
+import numpy as np
 import pandas as pd
 import os
 import sys
+import time
 
 # Ensure src is in path so pickle can find FeatureEngineer class if needed
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 # We need to import FeatureEngineer because it's part of the pickled pipeline
 from src.preprocessing import FeatureEngineer
+from src.fast_inference import compile_plan
+from src.tree_engine import TREES_ARTIFACT, TreeEnsemble, flatten_ensemble
+from src.utils import file_sha256
+from src.contributions import build_explainer
+
+# The flattened engine skips sklearn's per-call overhead, which dominates small
+# batches; past a few hundred rows sklearn's compiled traversal is faster
+# (see benchmarks/bench_tree_engine.py)
+TREE_ENGINE_MAX_ROWS = 512
 
 class PredictPipeline:
-    def __init__(self, model_dir="models"):
+    def __init__(self, model_dir="models", fast_path=True, mmap=False):
+        """
+        Args:
+            model_dir (str): Directory holding the pickled artifacts.
+            fast_path (bool): Score with the compiled NumPy plan or flattened
+                trees where the model supports it.
+            mmap (bool): Serve a tree model from its memory-mapped best_model.trees
+                export (see src/tree_engine.py) instead of unpickling it. Every
+                process mapping the same files shares one copy in the page cache;
+                best_model.pkl is only unpickled if explanations are asked for.
+        """
         self.model_dir = model_dir
         self.preprocessor_path = os.path.join(model_dir, "preprocessing_pipeline.pkl")
         self.model_path = os.path.join(model_dir, "best_model.pkl")
         
         self.preprocessor = self._load_object(self.preprocessor_path)
-        self.model = self._load_object(self.model_path)
+        self._model = None
+        self.plan = None
+
+        # Flattened arrays for tree ensembles; None means model.predict()
+        self.trees = self._map_trees() if fast_path and mmap else None
+        if self.trees is None:
+            self._model = self._load_object(self.model_path)
+            # Pandas-free NumPy plan for models that support it; None means use sklearn
+            self.plan = compile_plan(self.preprocessor, self._model) if fast_path else None
+            self.trees = flatten_ensemble(self._model) if fast_path and self.plan is None else None
+
+        # Optional callable(stage, seconds) receiving per-stage timings, e.g. for metrics
+        self.stage_observer = None
+
+        # Per-prediction attribution for the sklearn path; built on first use
+        self._explainer = None
+
+    @property
+    def model(self):
+        # Unpickled on first use when the trees are served memory-mapped
+        if self._model is None:
+            self._model = self._load_object(self.model_path)
+        return self._model
+
+    def _map_trees(self):
+        """
+        The memory-mapped tree export next to best_model.pkl, or None if there
+        isn't one or it was exported from a different pickle.
+        """
+        path = os.path.join(self.model_dir, TREES_ARTIFACT)
+        if not os.path.isdir(path) or not os.path.exists(self.model_path):
+            return None
+        trees = TreeEnsemble.load(path, mmap=True)
+        if trees.model_sha256 != file_sha256(self.model_path):
+            print(f"{path} is stale; unpickling {self.model_path} instead.")
+            return None
+        return trees
         
     def _load_object(self, path):
         if not os.path.exists(path):
@@ -33,38 +90,161 @@ class PredictPipeline:
         Returns:
             float: Predicted exam score.
         """
-        # Convert dict to DataFrame
-        input_df = pd.DataFrame([input_data])
-        
-        # Preprocess (Feature Engineering + Scaling/Encoding)
-        processed_data = self.preprocessor.transform(input_df)
-        
-        # Predict
-        prediction = self.model.predict(processed_data)
-        
-        return round(float(prediction[0]), 2)
+        # A single row is just a batch of one, so both paths round identically
+        return float(self.predict_batch([input_data])[0])
+
+    def predict_batch(self, input_data) -> np.ndarray:
+        """
+        Scores many students with one vectorized transform + predict call.
+
+        Args:
+            input_data (list[dict] | dict[str, list]): Either a list of student
+                profiles (row-oriented) or a mapping of column name to values
+                (columnar), e.g. {'age': [20, 21], 'gender': ['male', 'female'], ...}.
+        Returns:
+            np.ndarray: Predicted exam scores rounded to 2 decimals, in input order.
+        """
+        return np.round(self._predict_raw(input_data), 2)
+
+    def _predict_raw(self, input_data) -> np.ndarray:
+        observe = self.stage_observer
+        start = time.perf_counter() if observe else 0.0
+
+        if self.plan is not None:
+            columns = self._to_columns(input_data)
+            if columns is None:
+                return np.empty(0, dtype=float)
+            if observe:
+                now = time.perf_counter()
+                observe("to_columns", now - start)
+                start = now
+            prediction = self.plan.predict(columns)
+            if observe:
+                observe("plan_predict", time.perf_counter() - start)
+            return prediction
+
+        input_df = self._to_frame(input_data)
+        if input_df.empty:
+            return np.empty(0, dtype=float)
+        if observe:
+            now = time.perf_counter()
+            observe("dataframe", now - start)
+            start = now
+
+        # Same as preprocessor.transform(), one step at a time so each can be timed
+        processed_data = input_df
+        for name, step in self.preprocessor.steps:
+            if step is None or step == "passthrough":
+                continue
+            processed_data = step.transform(processed_data)
+            if observe:
+                now = time.perf_counter()
+                observe(name, now - start)
+                start = now
+
+        # Mapped trees serve every batch size: unpickling the model for big
+        # batches would bring back the per-process copy mmap avoids
+        if self.trees is not None and (self._model is None or processed_data.shape[0] <= TREE_ENGINE_MAX_ROWS):
+            prediction = self.trees.predict(processed_data)
+        else:
+            prediction = self.model.predict(processed_data)
+        if observe:
+            observe("model_predict", time.perf_counter() - start)
+
+        return np.asarray(prediction, dtype=float)
+
+    def explain_batch(self, input_data) -> dict:
+        """
+        Scores students and attributes every score to the input fields in the
+        same pass (see src/contributions.py and LinearPlan.explain).
+
+        Args:
+            input_data: Same shapes as predict_batch().
+        Returns:
+            dict: 'predictions' (rounded like predict_batch), 'base_value' (the
+            score every explanation starts from), 'fields' and 'contributions',
+            an (n_rows, n_fields) array whose rows sum to prediction - base_value.
+        """
+        if self.plan is not None:
+            fields, base_value = self.plan.fields, self.plan.base_value
+            columns = self._to_columns(input_data)
+            if columns is None:
+                prediction, contributions = np.empty(0), np.empty((0, len(fields)))
+            else:
+                prediction, contributions = self.plan.explain(columns)
+        else:
+            if self._explainer is None:
+                self._explainer = build_explainer(self.preprocessor, self.model)
+                if self._explainer is None:
+                    raise NotImplementedError(f"Per-prediction explanations aren't supported for {type(self.model).__name__}")
+            explainer = self._explainer
+            fields, base_value = explainer.fields, explainer.base_value
+            input_df = self._to_frame(input_data)
+            if input_df.empty:
+                prediction, contributions = np.empty(0), np.empty((0, len(fields)))
+            else:
+                prediction, contributions = explainer.explain(self.preprocessor.transform(input_df))
+
+        return {
+            "predictions": np.round(prediction, 2),
+            "base_value": float(base_value),
+            "fields": list(fields),
+            "contributions": contributions,
+        }
+
+    def _to_columns(self, input_data) -> dict:
+        """
+        Columnar view of the input for the compiled plan, without building a DataFrame.
+        Returns None for an empty batch.
+        """
+        if isinstance(input_data, pd.DataFrame):
+            if input_data.empty:
+                return None
+            return {c: input_data[c].to_numpy() for c in self.plan.input_columns if c in input_data}
+        if isinstance(input_data, dict):
+            lengths = {len(values) for values in input_data.values()}
+            if len(lengths) > 1:
+                raise ValueError("All columns in a columnar batch must have the same length.")
+            return input_data if lengths and lengths.pop() > 0 else None
+        rows = list(input_data)
+        if not rows:
+            return None
+        return {c: [row[c] for row in rows] for c in self.plan.input_columns if c in rows[0]}
+
+    @staticmethod
+    def _to_frame(input_data) -> pd.DataFrame:
+        if isinstance(input_data, pd.DataFrame):
+            return input_data
+        if isinstance(input_data, dict):
+            # Columnar payload: every value must be a sequence of equal length
+            lengths = {len(values) for values in input_data.values()}
+            if len(lengths) > 1:
+                raise ValueError("All columns in a columnar batch must have the same length.")
+            return pd.DataFrame(input_data)
+        return pd.DataFrame(list(input_data))
 
 if __name__ == "__main__":
     # Test Run
     pipeline = PredictPipeline(model_dir="models")
     
-    # Sample input based on dataset columns
+    # Sample input based on dataset columns.
+    # Categorical values must match what was seen during training (see the encoder's
+    # categories_); unseen values are ignored by the OneHotEncoder.
     sample_input = {
         'age': 20,
-        'gender': 'Female', # Case sensitivity might be handled by OneHotEncoder if categories match
-        'course': 'Engineering',
+        'gender': 'female',
+        'course': 'b.tech',
         'study_hours': 6.5,
         'class_attendance': 90,
-        'internet_access': 'Yes',
+        'internet_access': 'yes',
         'sleep_hours': 7,
-        'sleep_quality': 'Good',
-        'study_method': 'Self-Study',
-        'facility_rating': 'High',
-        'exam_difficulty': 'Medium'
+        'sleep_quality': 'good',
+        'study_method': 'self-study',
+        'facility_rating': 'high',
+        'exam_difficulty': 'moderate'
     }
     
-    # Note: Categorical values must match what was seen during training.
-    # In a real app we would validate these against the allowed unique values.
+    # For whole files, use the offline scorer instead: python src/batch_score.py <input> <output.parquet>
     
     try:
         score = pipeline.predict(sample_input)
@@ -7,6 +7,18 @@ from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
 import joblib
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.utils import load_data, save_matrix
+
+def compute_study_efficiency(study_hours, sleep_hours):
+    """
+    Study Efficiency = Study Hours / Sleep Hours (avoid div by zero).
+    Works on pandas Series and NumPy arrays alike, so the compiled inference
+    plan in src/fast_inference.py computes exactly the same value.
+    """
+    return study_hours / (sleep_hours + 0.1)
 
 class FeatureEngineer(BaseEstimator, TransformerMixin):
     def __init__(self):
@@ -20,7 +32,7 @@ class FeatureEngineer(BaseEstimator, TransformerMixin):
         # Drop ID col if present (handled in transform usually, but good to know here)
         remaining_cols = [c for c in X.columns if c != self.id_col and c != self.target_col]
         
-        self.numerical_cols = X[remaining_cols].select_dtypes(include=['int64', 'float64']).columns.tolist()
+        self.numerical_cols = X[remaining_cols].select_dtypes(include=['number']).columns.tolist()
         self.categorical_cols = X[remaining_cols].select_dtypes(include=['object', 'category']).columns.tolist()
         
         print(f"Detected Numerical Columns: {self.numerical_cols}")
@@ -33,7 +45,7 @@ class FeatureEngineer(BaseEstimator, TransformerMixin):
         # Feature Engineering: Derived Features
         # 1. Study Efficiency = Study Hours / Sleep Hours (avoid div by zero)
         if 'study_hours' in X.columns and 'sleep_hours' in X.columns:
-            X['study_efficiency'] = X['study_hours'] / (X['sleep_hours'] + 0.1)
+            X['study_efficiency'] = compute_study_efficiency(X['study_hours'], X['sleep_hours'])
         
         # 2. Total active time
         # if 'study_hours' in X.columns and 'class_attendance' in X.columns:
@@ -69,14 +81,11 @@ def get_preprocessing_pipeline(numerical_cols, categorical_cols):
     
     return preprocessor
 
-def run_preprocessing(filepath):
-    print("--- Phase 2: Feature Engineering & Preprocessing ---")
-    if not os.path.exists(filepath):
-        print(f"Error: {filepath} not found.")
-        return
-    
-    df = pd.read_csv(filepath)
-    
+def build_full_pipeline(df):
+    """
+    FeatureEngineer -> ColumnTransformer pipeline for a raw frame. Column types
+    are detected on `df`; the ColumnTransformer is returned unfitted.
+    """
     # 1. Feature Engineering Step (Custom Transformer)
     fe = FeatureEngineer()
     fe.fit(df) # Detects columns
@@ -97,15 +106,24 @@ def run_preprocessing(filepath):
     # 2. Build Full Pipeline
     preprocessor = get_preprocessing_pipeline(num_cols, cat_cols)
     
-    # Split data
-    X = df.drop(columns=['exam_score'])
-    y = df['exam_score']
-    
     # Full pipeline: FE -> Preprocessor
-    full_pipeline = Pipeline(steps=[
+    return Pipeline(steps=[
         ('feature_engineering', fe),
         ('preprocessor', preprocessor)
     ])
+
+def run_preprocessing(filepath):
+    print("--- Phase 2: Feature Engineering & Preprocessing ---")
+    if not os.path.exists(filepath):
+        print(f"Error: {filepath} not found.")
+        return
+    
+    df = load_data(filepath)
+    full_pipeline = build_full_pipeline(df)
+    
+    # Split data
+    X = df.drop(columns=['exam_score'])
+    y = df['exam_score']
     
     # Fit and Transform
     # Only Fit on Train to avoid leakage (standard practice)
@@ -120,9 +138,10 @@ def run_preprocessing(filepath):
     # Save artifacts
     os.makedirs("models", exist_ok=True)
     joblib.dump(full_pipeline, "models/preprocessing_pipeline.pkl")
-    # Save split data for next steps
-    pd.DataFrame(X_train_processed if not isinstance(X_train_processed, np.ndarray) else X_train_processed).to_csv("data/X_train_processed.csv", index=False)
-    pd.DataFrame(X_test_processed if not isinstance(X_test_processed, np.ndarray) else X_test_processed).to_csv("data/X_test_processed.csv", index=False)
+    # Save split data for next steps: float32 .npy + schema sidecar with the real feature names
+    feature_names = full_pipeline.named_steps['preprocessor'].get_feature_names_out()
+    save_matrix("data/X_train_processed.npy", X_train_processed, feature_names)
+    save_matrix("data/X_test_processed.npy", X_test_processed, feature_names)
     y_train.to_csv("data/y_train.csv", index=False)
     y_test.to_csv("data/y_test.csv", index=False)
     
@@ -0,0 +1,238 @@
+import argparse
+import datetime
+import json
+import os
+import shutil
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.utils import file_sha256
+
+# Layout under the registry root (models/ by default):
+#   versions/<version>/   one directory per published model, never modified after publishing
+#   versions/<version>/manifest.json
+#   CURRENT               name of the version the API should serve
+VERSIONS_DIR = "versions"
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+
+# Artifacts copied into a version; the first two are required. Directories
+# (the memory-mappable best_model.trees) are copied whole, each file hashed.
+ARTIFACTS = ["best_model.pkl", "preprocessing_pipeline.pkl", "feature_importance.json", "metrics.json",
+             "best_model.trees"]
+REQUIRED_ARTIFACTS = ARTIFACTS[:2]
+
+def version_dir(registry_dir, version):
+    return os.path.join(registry_dir, VERSIONS_DIR, version)
+
+def list_versions(registry_dir):
+    """
+    Returns published version names, oldest first.
+    """
+    root = os.path.join(registry_dir, VERSIONS_DIR)
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if os.path.exists(os.path.join(root, name, MANIFEST_FILE))
+    )
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def get_current(registry_dir):
+    """
+    Returns the version CURRENT points at, or None if nothing has been published.
+    """
+    try:
+        with open(os.path.join(registry_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def serving_dir(registry_dir, version=None):
+    """
+    (version, path) of the artifacts to serve: `version` if given, else the
+    version CURRENT points at, else the flat artifacts in `registry_dir`
+    itself (version None).
+    """
+    version = version or get_current(registry_dir)
+    return version, version_dir(registry_dir, version) if version else registry_dir
+
+def set_current(registry_dir, version):
+    """
+    Points CURRENT at `version`. The pointer is replaced atomically, so readers
+    see either the old or the new version name, never a partial write.
+    """
+    if version not in list_versions(registry_dir):
+        raise ValueError(f"Unknown model version: {version}")
+    _write_atomic(os.path.join(registry_dir, CURRENT_FILE), version + "\n")
+    print(f"CURRENT -> {version}")
+
+def load_version_manifest(registry_dir, version):
+    with open(os.path.join(version_dir(registry_dir, version), MANIFEST_FILE)) as f:
+        return json.load(f)
+
+def verify_version(registry_dir, version):
+    """
+    Checks every artifact of a version against the hashes in its manifest.
+    Returns the manifest; raises ValueError on a missing or modified file.
+    """
+    manifest = load_version_manifest(registry_dir, version)
+    path = version_dir(registry_dir, version)
+    for name, sha256 in manifest["files"].items():
+        artifact = os.path.join(path, name)
+        if not os.path.exists(artifact) or file_sha256(artifact) != sha256:
+            raise ValueError(f"Artifact {name} of version {version} is missing or modified")
+    return manifest
+
+def _next_version(registry_dir):
+    numbers = [int(v[1:]) for v in list_versions(registry_dir) if v.startswith("v") and v[1:].isdigit()]
+    return f"v{max(numbers, default=0) + 1:04d}"
+
+def artifact_hashes(source_dir):
+    """
+    Returns {artifact: sha256} for the artifacts in `source_dir`, keyed the way
+    a version manifest's "files" are.
+    """
+    files = {}
+    for name in ARTIFACTS:
+        src = os.path.join(source_dir, name)
+        if os.path.isdir(src):
+            for entry in sorted(os.listdir(src)):
+                files[f"{name}/{entry}"] = file_sha256(os.path.join(src, entry))
+        elif os.path.exists(src):
+            files[name] = file_sha256(src)
+    return files
+
+def find_version(registry_dir, source_dir):
+    """
+    Returns the newest version whose artifacts are byte-identical to the ones
+    in `source_dir`, or None.
+    """
+    files = artifact_hashes(source_dir)
+    for version in reversed(list_versions(registry_dir)):
+        if load_version_manifest(registry_dir, version)["files"] == files:
+            return version
+    return None
+
+def publish_if_changed(registry_dir, source_dir, metadata=None):
+    """
+    Publishes `source_dir` as a new version unless an existing version already
+    holds the same artifacts, and points CURRENT at whichever version matches.
+    Re-running a publish on unchanged artifacts doesn't create a new version.
+
+    Returns:
+        str: The matching or newly published version name.
+    """
+    version = find_version(registry_dir, source_dir)
+    if version is None:
+        return publish_version(registry_dir, source_dir, metadata=metadata)
+    print(f"Artifacts in {source_dir} are unchanged since version {version}")
+    if get_current(registry_dir) != version:
+        set_current(registry_dir, version)
+    return version
+
+def publish_version(registry_dir, source_dir, version=None, activate=True, metadata=None):
+    """
+    Copies the model artifacts in `source_dir` into a new version directory,
+    writes its manifest and, by default, points CURRENT at it.
+
+    The version is assembled in a temporary directory and renamed into place,
+    so a version directory with a manifest is always complete.
+
+    Args:
+        registry_dir (str): Registry root, e.g. "models".
+        source_dir (str): Directory holding best_model.pkl and preprocessing_pipeline.pkl.
+        version (str): Version name; defaults to the next "vNNNN".
+        activate (bool): Whether to update CURRENT.
+        metadata (dict): Extra JSON-serializable fields stored in the manifest.
+
+    Returns:
+        str: The published version name.
+    """
+    missing = [name for name in REQUIRED_ARTIFACTS if not os.path.exists(os.path.join(source_dir, name))]
+    if missing:
+        raise FileNotFoundError(f"Missing artifact(s) in {source_dir}: {missing}")
+
+    version = version or _next_version(registry_dir)
+    target = version_dir(registry_dir, version)
+    if os.path.exists(target):
+        raise ValueError(f"Model version {version} already exists")
+
+    staging = f"{target}.{os.getpid()}.tmp"
+    os.makedirs(staging)
+    try:
+        for name in ARTIFACTS:
+            src = os.path.join(source_dir, name)
+            if os.path.isdir(src):
+                shutil.copytree(src, os.path.join(staging, name))
+            elif os.path.exists(src):
+                shutil.copy2(src, os.path.join(staging, name))
+        # Hashed from the copies, the same way find_version hashes a source dir
+        files = artifact_hashes(staging)
+
+        metrics = None
+        if "metrics.json" in files:
+            with open(os.path.join(staging, "metrics.json")) as f:
+                metrics = json.load(f)
+
+        manifest = {
+            "version": version,
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "files": files,
+            "metrics": metrics,
+            "metadata": metadata or {},
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=4)
+        os.rename(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    print(f"Published model version {version} to {target}")
+    if activate:
+        set_current(registry_dir, version)
+    return version
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the versioned model registry.")
+    parser.add_argument("--registry", default="models", help="Registry root (default: models)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    publish = commands.add_parser("publish", help="Publish artifacts as a new version")
+    publish.add_argument("--from", dest="source_dir", default="models", help="Directory with the artifacts")
+    publish.add_argument("--version", default=None)
+    publish.add_argument("--no-activate", action="store_true", help="Publish without moving CURRENT")
+    publish.add_argument("--if-changed", action="store_true",
+                         help="Reuse an existing version with identical artifacts instead of publishing a copy")
+
+    activate = commands.add_parser("activate", help="Point CURRENT at a version (deploy or roll back)")
+    activate.add_argument("version")
+
+    commands.add_parser("list", help="List versions")
+    args = parser.parse_args(argv)
+
+    if args.command == "publish" and args.if_changed:
+        if args.version or args.no_activate:
+            parser.error("--if-changed can't be combined with --version or --no-activate")
+        publish_if_changed(args.registry, args.source_dir)
+    elif args.command == "publish":
+        publish_version(args.registry, args.source_dir, version=args.version, activate=not args.no_activate)
+    elif args.command == "activate":
+        set_current(args.registry, args.version)
+    else:
+        current = get_current(args.registry)
+        for version in list_versions(args.registry):
+            manifest = load_version_manifest(args.registry, version)
+            marker = "*" if version == current else " "
+            print(f"{marker} {version}  {manifest['created_at']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.utils import load_data
+
+TARGET = "exam_score"
+ID_COL = "student_id"
+# Numeric columns with at most this many distinct values are sampled as discrete
+MAX_DISCRETE_VALUES = 64
+# Points of each learned quantile function
+QUANTILE_POINTS = 1025
+
+def _decimals(values, share=0.99):
+    """
+    Fewest decimal places that reproduce at least `share` of the values, so a
+    stray 19.599 doesn't make a one-decimal column print three.
+    """
+    for d in range(7):
+        if np.mean(np.isclose(np.round(values, d), values, rtol=0, atol=1e-9)) >= share:
+            return d
+    return 6
+
+class SyntheticModel:
+    """
+    What the generator learns from a real file:
+
+    - numeric features: a quantile function each (or value frequencies for
+      discrete columns such as age), tied together by a Gaussian copula so
+      their rank correlations carry over;
+    - categorical features: category frequencies;
+    - the target: a linear fit on the features plus residuals drawn from the
+      empirical residual distribution, clipped to the observed range.
+
+    All state is small NumPy arrays, so the model pickles cheaply to workers.
+    """
+    def __init__(self, df: pd.DataFrame):
+        self.columns = list(df.columns)
+        features = [c for c in df.columns if c not in (ID_COL, TARGET)]
+        self.numeric = [c for c in features if pd.api.types.is_numeric_dtype(df[c])]
+        self.categorical = [c for c in features if c not in self.numeric]
+        self.dtypes = {c: np.dtype(df[c].dtype) for c in [*self.numeric, TARGET]}
+
+        levels = np.linspace(0, 1, QUANTILE_POINTS)
+        self.marginals = {}
+        for col in self.numeric:
+            x = df[col].to_numpy(dtype=float)
+            values, counts = np.unique(x, return_counts=True)
+            if len(values) <= MAX_DISCRETE_VALUES:
+                self.marginals[col] = ("discrete", values, np.cumsum(counts) / counts.sum())
+            else:
+                self.marginals[col] = ("continuous", np.quantile(x, levels), _decimals(x))
+
+        # Copula: correlation of the numeric columns' normal scores
+        ranks = df[self.numeric].rank(method="average").to_numpy()
+        scores = ndtri(ranks / (len(df) + 1))
+        corr = np.atleast_2d(np.corrcoef(scores, rowvar=False)) if self.numeric else np.eye(0)
+        self.copula = np.linalg.cholesky(corr + 1e-9 * np.eye(len(self.numeric)))
+
+        self.categories = {}
+        for col in self.categorical:
+            freq = df[col].astype(str).value_counts(normalize=True).sort_index()
+            self.categories[col] = (freq.index.to_numpy(dtype=object), np.cumsum(freq.to_numpy()))
+        # Labels CSV can carry unquoted, like the source file writes them
+        self.plain_labels = not any(set(label) & set(',"\r\n') for labels, _ in self.categories.values()
+                                    for label in labels)
+
+        # Target: least squares on the same design the generator will produce
+        y = df[TARGET].to_numpy(dtype=float)
+        design = self._design({c: df[c].to_numpy(dtype=float) for c in self.numeric},
+                              {c: df[c].astype(str).to_numpy(dtype=object) for c in self.categorical})
+        coef = np.linalg.lstsq(design, y, rcond=None)[0]
+        self.residuals = np.quantile(y - design @ coef, levels)
+        # Split per column, so sampling can add lookups instead of building one-hot blocks
+        self.intercept, self.numeric_coef = coef[0], coef[1:1 + len(self.numeric)]
+        self.category_coef, offset = {}, 1 + len(self.numeric)
+        for col in self.categorical:
+            width = len(self.categories[col][0])
+            self.category_coef[col] = coef[offset:offset + width]
+            offset += width
+        self.target_range = (float(y.min()), float(y.max()))
+        self.target_decimals = _decimals(y)
+
+    def _design(self, numeric, categorical):
+        n = len(next(iter(numeric.values()))) if numeric else len(next(iter(categorical.values())))
+        blocks = [np.ones((n, 1))] + [numeric[c][:, None] for c in self.numeric]
+        for col in self.categorical:
+            labels = self.categories[col][0]
+            blocks.append((categorical[col][:, None] == labels[None, :]).astype(float))
+        return np.hstack(blocks)
+
+    def sample(self, n, rng, first_id=1):
+        """
+        `n` synthetic rows as a DataFrame with the source's columns and dtypes.
+        """
+        u = ndtr(rng.standard_normal((n, len(self.numeric))) @ self.copula.T)
+        score = np.full(n, self.intercept)
+        columns = {}
+        for j, col in enumerate(self.numeric):
+            kind, values, extra = self.marginals[col]
+            if kind == "discrete":
+                x = values[np.minimum(np.searchsorted(extra, u[:, j]), len(values) - 1)]
+            else:
+                x = np.round(np.interp(u[:, j], np.linspace(0, 1, len(values)), values), extra)
+            score += self.numeric_coef[j] * x
+            columns[col] = x.astype(self.dtypes[col])
+
+        for col in self.categorical:
+            labels, cdf = self.categories[col]
+            codes = np.minimum(np.searchsorted(cdf, rng.random(n)), len(labels) - 1)
+            score += self.category_coef[col][codes]
+            columns[col] = pd.Categorical.from_codes(codes, categories=labels)
+
+        score += np.interp(rng.random(n), np.linspace(0, 1, len(self.residuals)), self.residuals)
+        score = np.round(np.clip(score, *self.target_range), self.target_decimals)
+        columns[TARGET] = score.astype(self.dtypes[TARGET])
+        columns[ID_COL] = np.arange(first_id, first_id + n, dtype=np.int64)
+        return pd.DataFrame({col: columns[col] for col in self.columns})
+
+# Workers get the model once, through the pool initializer
+_MODEL = None
+
+def _init_worker(model):
+    global _MODEL
+    _MODEL = model
+
+def _generate_chunk(index, start, n, seed, fmt):
+    """
+    Chunk `index` (rows start .. start + n) in the output format: CSV text, or
+    an Arrow table for Parquet. The RNG is seeded by (seed, index), so a chunk's
+    rows don't depend on how many workers there are or the order they finish in.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    df = _MODEL.sample(n, np.random.default_rng([seed, index]), first_id=start + 1)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if fmt == "parquet":
+        return table
+    # Arrow's writer is ~10x faster than DataFrame.to_csv
+    table = table.cast(pa.schema([pa.field(f.name, pa.string() if pa.types.is_dictionary(f.type) else f.type)
+                                  for f in table.schema]))
+    quoting = "none" if _MODEL.plain_labels else "needed"
+    buffer = pa.BufferOutputStream()
+    pa_csv.write_csv(table, buffer, pa_csv.WriteOptions(include_header=False, quoting_style=quoting))
+    header = (",".join(table.column_names) + "\n").encode() if index == 0 else b""
+    return header + buffer.getvalue().to_pybytes()
+
+def generate(output_path, n_rows, source_path=os.path.join("data", "Exam_Score_Prediction.csv"), seed=0,
+             chunk_rows=1_000_000, jobs=None):
+    """
+    Writes `n_rows` synthetic rows to a CSV or .parquet file, learning the
+    distributions from `source_path`. Chunks are generated in parallel worker
+    processes and written in order, with at most 2 x jobs chunks in memory.
+    The same seed and chunk_rows always produce the same file.
+
+    Returns:
+        dict: rows, chunks, seconds and output size in bytes.
+    """
+    fmt = "parquet" if output_path.endswith(".parquet") else "csv"
+    model = SyntheticModel(load_data(source_path, schema=None, verbose=False))
+    chunks = [(i, start, min(chunk_rows, n_rows - start)) for i, start in enumerate(range(0, n_rows, chunk_rows))]
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(chunks)))
+    start_time = time.perf_counter()
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+
+    writer = None
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+    else:
+        out = open(tmp_path, "wb")
+
+    def write(result):
+        nonlocal writer
+        if fmt == "parquet":
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, result.schema)
+            writer.write_table(result)
+        else:
+            out.write(result)
+
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(model,)) as pool:
+            pending = []
+            for index, start, n in chunks:
+                pending.append(pool.submit(_generate_chunk, index, start, n, seed, fmt))
+                if len(pending) >= 2 * jobs:
+                    write(pending.pop(0).result())
+            for future in pending:
+                write(future.result())
+    finally:
+        if fmt == "parquet":
+            if writer is not None:
+                writer.close()
+        else:
+            out.close()
+    os.replace(tmp_path, output_path)
+
+    seconds = time.perf_counter() - start_time
+    size = os.path.getsize(output_path)
+    print(f"Wrote {n_rows} row(s) in {len(chunks)} chunk(s) to {output_path} "
+          f"({size / 2**20:.0f} MB) in {seconds:.1f}s ({n_rows / max(seconds, 1e-9) / 1e6:.2f}M rows/s)")
+    return {"rows": n_rows, "chunks": len(chunks), "seconds": seconds, "bytes": size}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic exam dataset shaped like the real one.")
+    parser.add_argument("output", help="Output .csv or .parquet file")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--source", default=os.path.join("data", "Exam_Score_Prediction.csv"),
+                        help="Real data to learn the distributions from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    generate(args.output, args.rows, source_path=args.source, seed=args.seed,
+             chunk_rows=args.chunk_rows, jobs=args.jobs)
+
+if __name__ == "__main__":
+    main()
@@ -3,29 +3,71 @@ import numpy as np
 import joblib
 import json
 import os
+import sys
+import time
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import clone
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.model_selection import cross_val_score
+from sklearn.model_selection import KFold
 
-def train_and_evaluate(X_train_path, y_train_path, X_test_path, y_test_path, output_dir="models"):
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.explainability import write_feature_manifest
+from src.registry import publish_version
+from src.tree_engine import write_tree_artifact
+from src.utils import load_matrix
+
+def get_candidate_models():
+    """
+    The model zoo. Every candidate is cross-validated and refit in parallel, so
+    adding one here costs its own fits, not another serial pass.
+    """
+    return {
+        "Linear Regression": LinearRegression(),
+        "Random Forest": RandomForestRegressor(n_estimators=100, random_state=42),
+        "Gradient Boosting": GradientBoostingRegressor(n_estimators=100, random_state=42)
+    }
+
+def _fit_task(name, model, X, y, train_idx=None, val_idx=None):
+    """
+    One unit of parallel work: a CV fold fit (scored on its validation split) or,
+    when train_idx is None, the final fit on the full training set.
+    Returns timings so per-model wall/CPU time can be reported.
+    """
+    started_at = time.time()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+    if train_idx is None:
+        model.fit(X, y)
+        score = None
+    else:
+        model.fit(X[train_idx], y[train_idx])
+        score = r2_score(y[val_idx], model.predict(X[val_idx]))
+        model = None # Fold models aren't needed once scored; don't ship them back
+
+    return {
+        "name": name,
+        "model": model,
+        "score": score,
+        "started_at": started_at,
+        "finished_at": time.time(),
+        "wall": time.perf_counter() - wall_start,
+        "cpu": time.process_time() - cpu_start,
+    }
+
+def train_and_evaluate(X_train_path, y_train_path, X_test_path, y_test_path, output_dir="models", n_jobs=-1, cv=5, publish=True):
     print("--- Phase 4: Model Training & Selection ---")
     
-    # Load processed data
-    # Note: X_train_processed.csv from Phase 2 might lack headers if converted to numpy array in previous step.
-    # But in preprocessing.py I saved it as DataFrame with to_csv, so headers should be there.
-    X_train = pd.read_csv(X_train_path)
+    # Load processed data: float32 .npy matrices are memory-mapped rather than parsed
+    X_train, feature_names = load_matrix(X_train_path)
     y_train = pd.read_csv(y_train_path).values.ravel() # Flatten target
-    X_test = pd.read_csv(X_test_path)
+    X_test, _ = load_matrix(X_test_path)
     y_test = pd.read_csv(y_test_path).values.ravel()
     
     print(f"Data Loaded. X_train shape: {X_train.shape}")
 
-    models = {
-        "Linear Regression": LinearRegression(),
-        "Random Forest": RandomForestRegressor(n_estimators=100, random_state=42),
-        "Gradient Boosting": GradientBoostingRegressor(n_estimators=100, random_state=42)
-    }
+    models = get_candidate_models()
     
     results = {}
     best_model_name = None
@@ -35,15 +77,24 @@ def train_and_evaluate(X_train_path, y_train_path, X_test_path, y_test_path, out
     os.makedirs(output_dir, exist_ok=True)
     
     print("\n--- Training & Evaluation ---")
+    # Same unshuffled KFold that cross_val_score uses for regressors, so CV R² is unchanged
+    folds = list(KFold(n_splits=cv).split(X_train))
+    tasks = []
     for name, model in models.items():
-        print(f"Training {name}...")
-        
-        # Cross Validation (R2)
-        cv_scores = cross_val_score(model, X_train, y_train, cv=5, scoring='r2')
-        mean_cv_r2 = cv_scores.mean()
-        
-        # Train on full train set
-        model.fit(X_train, y_train)
+        tasks.extend(delayed(_fit_task)(name, clone(model), X_train, y_train, tr, va) for tr, va in folds)
+        # The full-data refit runs alongside its folds instead of after them
+        tasks.append(delayed(_fit_task)(name, clone(model), X_train, y_train))
+
+    n_workers = effective_n_jobs(n_jobs)
+    print(f"Running {len(tasks)} fits ({len(models)} models x ({cv} folds + refit)) on {n_workers} worker(s)...")
+    wall_start = time.perf_counter()
+    outcomes = Parallel(n_jobs=n_jobs)(tasks)
+    print(f"All fits finished in {time.perf_counter() - wall_start:.2f}s")
+
+    for name in models:
+        runs = [o for o in outcomes if o["name"] == name]
+        model = next(o["model"] for o in runs if o["model"] is not None)
+        mean_cv_r2 = np.mean([o["score"] for o in runs if o["score"] is not None])
         
         # Predict on Test set
         y_pred = model.predict(X_test)
@@ -57,11 +108,16 @@ def train_and_evaluate(X_train_path, y_train_path, X_test_path, y_test_path, out
             "CV_R2": mean_cv_r2,
             "Test_R2": r2,
             "MAE": mae,
-            "RMSE": rmse
+            "RMSE": rmse,
+            # Wall: first fit started -> last fit finished; CPU: summed over all of its fits
+            "Wall_Time_s": max(o["finished_at"] for o in runs) - min(o["started_at"] for o in runs),
+            "CPU_Time_s": sum(o["cpu"] for o in runs),
         }
         
+        print(f"{name}:")
         print(f"  > CV R²: {mean_cv_r2:.4f}")
         print(f"  > Test R²: {r2:.4f}, RMSE: {rmse:.4f}")
+        print(f"  > Wall: {results[name]['Wall_Time_s']:.2f}s, CPU: {results[name]['CPU_Time_s']:.2f}s")
         
         # Model Selection logic: Use CV score or Test R2? Usually CV is safer for selection.
         if r2 > best_score:
@@ -75,19 +131,36 @@ def train_and_evaluate(X_train_path, y_train_path, X_test_path, y_test_path, out
     model_path = os.path.join(output_dir, "best_model.pkl")
     joblib.dump(best_model, model_path)
     print(f"Best model saved to {model_path}")
+
+    # Feature names + importances for the API, stamped with the model's hash
+    write_feature_manifest(output_dir)
+
+    # Tree models also get a memory-mappable export that API workers share
+    write_tree_artifact(output_dir)
     
     # Save Metrics
     metrics_path = os.path.join(output_dir, "metrics.json")
     with open(metrics_path, "w") as f:
         json.dump(results, f, indent=4)
     print(f"Metrics saved to {metrics_path}")
+
+    # Publish as a new registry version; running APIs pick it up without a restart.
+    # The pipeline publishes in its own stage instead, so a cached train stage can't skip it
+    if publish:
+        publish_version(output_dir, output_dir, metadata={"best_model": best_model_name})
     
     return best_model_name
 
 if __name__ == "__main__":
-    X_train_path = os.path.join("data", "X_train_processed.csv")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train candidate models and save the best one.")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel worker budget (-1 = all cores)")
+    args = parser.parse_args()
+
+    X_train_path = os.path.join("data", "X_train_processed.npy")
     y_train_path = os.path.join("data", "y_train.csv")
-    X_test_path = os.path.join("data", "X_test_processed.csv")
+    X_test_path = os.path.join("data", "X_test_processed.npy")
     y_test_path = os.path.join("data", "y_test.csv")
     
     # Fix paths if running from src
@@ -97,4 +170,4 @@ if __name__ == "__main__":
         X_test_path = os.path.join("..", X_test_path)
         y_test_path = os.path.join("..", y_test_path)
         
-    train_and_evaluate(X_train_path, y_train_path, X_test_path, y_test_path)
+    train_and_evaluate(X_train_path, y_train_path, X_test_path, y_test_path, n_jobs=args.n_jobs)
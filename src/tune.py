@@ -0,0 +1,427 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from scipy.stats import loguniform, randint
+from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import Ridge
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold, ParameterSampler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.utils import file_sha256, load_matrix, save_matrix
+
+TRIAL_LOG = "trials.jsonl"
+
+# One entry per model family. `resource` is what successive halving hands out:
+# "n_samples" grows the number of training rows, anything else is an estimator
+# parameter (e.g. n_estimators) grown from min_resource up to max_resource.
+SEARCH_SPACES = {
+    "ridge": {
+        "estimator": Ridge,
+        "fixed": {},
+        "params": {"alpha": loguniform(1e-3, 1e3)},
+        "resource": "n_samples",
+        "min_resource": 1000,
+        "max_resource": None, # every row of the training fold
+    },
+    "random_forest": {
+        "estimator": RandomForestRegressor,
+        "fixed": {"random_state": 42},
+        "params": {
+            "max_depth": [6, 8, 12, 16, None],
+            "min_samples_leaf": randint(1, 50),
+            "max_features": [0.3, 0.5, 0.8, 1.0],
+        },
+        "resource": "n_estimators",
+        "min_resource": 10,
+        "max_resource": 270,
+    },
+    "gradient_boosting": {
+        "estimator": GradientBoostingRegressor,
+        "fixed": {"random_state": 42},
+        "params": {
+            "learning_rate": loguniform(0.01, 0.3),
+            "max_depth": randint(2, 6),
+            "subsample": [0.6, 0.8, 1.0],
+            "min_samples_leaf": randint(1, 50),
+        },
+        "resource": "n_estimators",
+        "min_resource": 20,
+        "max_resource": 540,
+    },
+    "hist_gradient_boosting": {
+        "estimator": HistGradientBoostingRegressor,
+        "fixed": {"random_state": 42, "early_stopping": False},
+        "params": {
+            "learning_rate": loguniform(0.01, 0.3),
+            "max_leaf_nodes": randint(7, 63),
+            "l2_regularization": loguniform(1e-3, 10),
+            "min_samples_leaf": randint(5, 100),
+        },
+        "resource": "max_iter",
+        "min_resource": 25,
+        "max_resource": 675,
+    },
+}
+
+def _to_builtin(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+def _trial_id(family, params, budget):
+    key = json.dumps({"family": family, "params": params, "budget": budget}, sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+def prepare_folds(X_train_path, y_train_path, cache_dir, cv=5, seed=42):
+    """
+    Splits the processed training matrix into CV folds once and saves each fold's
+    train/validation matrices under `cache_dir` as .npy files, which every trial
+    then memory-maps instead of re-slicing the data. Training rows are stored in a
+    seeded random order so a prefix is a random subsample (the n_samples budget).
+    The cache is rebuilt only when the inputs, fold count or seed change.
+
+    Returns:
+        dict: Fold metadata, including the file paths of every fold.
+    """
+    meta = {
+        "X_sha256": file_sha256(X_train_path),
+        "y_sha256": file_sha256(y_train_path),
+        "cv": cv,
+        "seed": seed,
+    }
+    meta_path = os.path.join(cache_dir, "_folds.json")
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            cached = json.load(f)
+        if {k: cached.get(k) for k in meta} == meta:
+            print(f"Reusing cached folds from {cache_dir}")
+            return cached
+
+    print(f"Building {cv} cached folds in {cache_dir}...")
+    os.makedirs(cache_dir, exist_ok=True)
+    X, feature_names = load_matrix(X_train_path)
+    y = pd.read_csv(y_train_path).values.ravel()
+    rng = np.random.default_rng(seed)
+
+    folds = []
+    for k, (train_idx, val_idx) in enumerate(KFold(n_splits=cv, shuffle=True, random_state=seed).split(X)):
+        train_idx = rng.permutation(train_idx)
+        paths = {name: os.path.join(cache_dir, f"fold{k}_{name}.npy")
+                 for name in ("X_train", "y_train", "X_val", "y_val")}
+        save_matrix(paths["X_train"], X[train_idx], feature_names)
+        save_matrix(paths["X_val"], X[val_idx], feature_names)
+        np.save(paths["y_train"], y[train_idx])
+        np.save(paths["y_val"], y[val_idx])
+        folds.append({"n_train": len(train_idx), "n_val": len(val_idx), "paths": paths})
+
+    meta["folds"] = folds
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=4)
+    return meta
+
+def _run_fold(trial, fold_index, fold):
+    """
+    Fits one trial's configuration at its budget on one cached fold and scores it
+    on the fold's validation split. Runs in a worker process.
+    """
+    spec = SEARCH_SPACES[trial["family"]]
+    paths = fold["paths"]
+    X_train, _ = load_matrix(paths["X_train"])
+    y_train = np.load(paths["y_train"], mmap_mode="r")
+    X_val, _ = load_matrix(paths["X_val"])
+    y_val = np.load(paths["y_val"], mmap_mode="r")
+
+    params = {**spec["fixed"], **trial["params"]}
+    if spec["resource"] == "n_samples":
+        X_train, y_train = X_train[:trial["budget"]], y_train[:trial["budget"]]
+    else:
+        params[spec["resource"]] = trial["budget"]
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    model = spec["estimator"](**params).fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - wall_start
+    cpu_seconds = time.process_time() - cpu_start
+
+    return {
+        **trial,
+        "fold": fold_index,
+        "r2": float(r2_score(y_val, model.predict(X_val))),
+        "fit_seconds": fit_seconds,
+        "cpu_seconds": cpu_seconds,
+        "finished_at": time.time(),
+    }
+
+def _budget_schedule(spec, n_train, eta, n_candidates):
+    """
+    Per-rung budgets, growing by eta and ending at max_resource. There are as many
+    rungs as it takes to narrow n_candidates down to one, as long as the first
+    rung still gets at least min_resource.
+    """
+    max_resource = spec["max_resource"] or n_train
+    min_resource = min(spec["min_resource"], max_resource)
+    n_rungs = 1 + min(
+        int(math.log(max(n_candidates, 1), eta) + 1e-9),
+        int(math.log(max_resource / min_resource, eta) + 1e-9),
+    )
+    return [int(max_resource / eta ** (n_rungs - 1 - r)) for r in range(n_rungs)]
+
+def _load_trial_log(log_path, search):
+    """
+    Returns the fold results already recorded for this search, keyed by
+    (trial id, fold). A log written by a different search is discarded.
+    """
+    done = {}
+    if os.path.exists(log_path):
+        with open(log_path) as f:
+            lines = f.read().splitlines()
+        header = json.loads(lines[0]) if lines else None
+        if header == {"search": search}:
+            for line in lines[1:]:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue # Torn final line from an interrupted run
+                done[(record["trial"], record["fold"])] = record
+            # Rewrite without any torn line so new records start on a fresh line
+            with open(log_path + ".tmp", "w") as f:
+                f.write(lines[0] + "\n")
+                f.writelines(json.dumps(record) + "\n" for record in done.values())
+            os.replace(log_path + ".tmp", log_path)
+            return done
+        print("Existing trial log is for a different search; starting over.")
+
+    with open(log_path, "w") as f:
+        f.write(json.dumps({"search": search}) + "\n")
+    return done
+
+def _summarize_trials(records):
+    """
+    Collapses fold records into one row per fully evaluated trial.
+    """
+    by_trial = {}
+    for record in records:
+        by_trial.setdefault(record["trial"], []).append(record)
+
+    trials = []
+    for trial_id, folds in by_trial.items():
+        first = folds[0]
+        scores = [r["r2"] for r in folds]
+        trials.append({
+            "trial": trial_id,
+            "family": first["family"],
+            "config": first["config"],
+            "rung": first["rung"],
+            "budget": first["budget"],
+            "n_folds": len(folds),
+            "cv_r2": float(np.mean(scores)),
+            "cv_r2_std": float(np.std(scores)),
+            "fit_seconds": float(sum(r["fit_seconds"] for r in folds)),
+            "finished_at": max(r["finished_at"] for r in folds),
+            "params": first["params"],
+        })
+    return trials
+
+def time_to_accuracy(records):
+    """
+    Best CV R² reached so far against cumulative fit time, overall and per family.
+    Time is summed fit seconds across all folds and workers, so the curve doesn't
+    depend on how many workers ran the search or whether it was resumed.
+
+    Returns:
+        pd.DataFrame: One row per completed trial, in completion order.
+    """
+    records = sorted(records, key=lambda r: r["finished_at"])
+    pending, compute_seconds, rows = {}, 0.0, []
+    best_overall, best_family = -float("inf"), {}
+    n_folds = max((r["fold"] for r in records), default=-1) + 1
+
+    for record in records:
+        compute_seconds += record["fit_seconds"]
+        folds = pending.setdefault(record["trial"], [])
+        folds.append(record["r2"])
+        if len(folds) < n_folds:
+            continue
+        cv_r2 = float(np.mean(folds))
+        family = record["family"]
+        best_overall = max(best_overall, cv_r2)
+        best_family[family] = max(best_family.get(family, -float("inf")), cv_r2)
+        rows.append({
+            "compute_seconds": compute_seconds,
+            "trial": record["trial"],
+            "family": family,
+            "budget": record["budget"],
+            "cv_r2": cv_r2,
+            "best_cv_r2": best_overall,
+            "family_best_cv_r2": best_family[family],
+        })
+    return pd.DataFrame(rows)
+
+def plot_time_to_accuracy(curve, output_path):
+    """
+    Step plot of the best-so-far CV R² per family and overall.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(9, 5))
+    for family, rows in curve.groupby("family"):
+        ax.step(rows["compute_seconds"], rows["family_best_cv_r2"], where="post", label=family)
+    ax.step(curve["compute_seconds"], curve["best_cv_r2"], where="post", color="black",
+            linestyle="--", label="overall")
+    ax.set_xlabel("Cumulative fit time (s)")
+    ax.set_ylabel("Best CV R²")
+    ax.set_title("Time to Accuracy")
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(output_path)
+    plt.close(fig)
+
+def run_search(X_train_path, y_train_path, output_dir=os.path.join("models", "search"), families=None,
+               n_candidates=9, eta=3, cv=5, n_jobs=-1, seed=42):
+    """
+    Successive-halving hyperparameter search over SEARCH_SPACES.
+
+    Every family samples `n_candidates` configurations, evaluates them all at the
+    smallest budget, keeps the best 1/eta and multiplies the budget by eta until
+    one configuration remains at the full budget. Rungs of different families run
+    in the same parallel pool. Each finished fold is appended to
+    `<output_dir>/trials.jsonl`; rerunning the same command skips everything
+    already logged.
+
+    Returns:
+        pd.DataFrame: The leaderboard, best trial first.
+    """
+    print("--- Hyperparameter Search (successive halving) ---")
+    families = families or list(SEARCH_SPACES)
+    unknown = [f for f in families if f not in SEARCH_SPACES]
+    if unknown:
+        raise ValueError(f"Unknown model families {unknown}; choose from {list(SEARCH_SPACES)}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    folds_meta = prepare_folds(X_train_path, y_train_path, os.path.join(output_dir, "folds"), cv=cv, seed=seed)
+    folds = folds_meta["folds"]
+    n_train = min(f["n_train"] for f in folds)
+
+    search = {
+        "families": families,
+        "n_candidates": n_candidates,
+        "eta": eta,
+        "cv": cv,
+        "seed": seed,
+        "X_sha256": folds_meta["X_sha256"],
+        "y_sha256": folds_meta["y_sha256"],
+    }
+    log_path = os.path.join(output_dir, TRIAL_LOG)
+    done = _load_trial_log(log_path, search)
+    if done:
+        print(f"Resuming: {len(done)} fold fit(s) already logged.")
+
+    # Sampling is seeded, so a resumed search regenerates the same candidates
+    survivors, schedules = {}, {}
+    for family in families:
+        spec = SEARCH_SPACES[family]
+        sampler = ParameterSampler(spec["params"], n_iter=n_candidates, random_state=seed)
+        survivors[family] = [
+            {"config": i, "params": {k: _to_builtin(v) for k, v in sorted(params.items())}}
+            for i, params in enumerate(sampler)
+        ]
+        schedules[family] = _budget_schedule(spec, n_train, eta, n_candidates)
+        print(f"{family}: {spec['resource']} budgets {schedules[family]}")
+
+    print(f"Running on {effective_n_jobs(n_jobs)} worker(s)")
+    start = time.perf_counter()
+    with open(log_path, "a") as log, Parallel(n_jobs=n_jobs, return_as="generator_unordered") as parallel:
+        for rung in range(max(len(s) for s in schedules.values())):
+            rung_trials, tasks = {}, []
+            for family in families:
+                if rung >= len(schedules[family]):
+                    continue
+                budget = schedules[family][rung]
+                for candidate in survivors[family]:
+                    trial = {"trial": _trial_id(family, candidate["params"], budget), "family": family,
+                             "config": candidate["config"], "rung": rung, "budget": budget,
+                             "params": candidate["params"]}
+                    rung_trials.setdefault(family, []).append(trial)
+                    tasks.extend(delayed(_run_fold)(trial, k, fold) for k, fold in enumerate(folds)
+                                 if (trial["trial"], k) not in done)
+
+            print(f"Rung {rung}: {sum(len(t) for t in rung_trials.values())} trial(s), {len(tasks)} fold fit(s) to run")
+            for record in parallel(tasks):
+                done[(record["trial"], record["fold"])] = record
+                log.write(json.dumps(record) + "\n")
+                log.flush()
+
+            # Promote the top 1/eta of each family to the next rung
+            for family, trials in rung_trials.items():
+                scored = _summarize_trials(r for t in trials for k in range(len(folds))
+                                           for r in [done[(t["trial"], k)]])
+                scored.sort(key=lambda t: t["cv_r2"], reverse=True)
+                keep = max(1, len(scored) // eta)
+                kept = {t["config"] for t in scored[:keep]}
+                survivors[family] = [c for c in survivors[family] if c["config"] in kept]
+                print(f"  {family} @ {schedules[family][rung]}: best CV R² {scored[0]['cv_r2']:.4f}")
+
+    print(f"Search finished in {time.perf_counter() - start:.2f}s")
+    return write_leaderboard(list(done.values()), output_dir)
+
+def write_leaderboard(records, output_dir):
+    """
+    Writes leaderboard.json (each configuration at the largest budget it reached,
+    best first) and the time-to-accuracy curve as CSV and PNG.
+    """
+    trials = _summarize_trials(records)
+    best_by_config = {}
+    for trial in trials:
+        key = (trial["family"], trial["config"])
+        if key not in best_by_config or trial["budget"] > best_by_config[key]["budget"]:
+            best_by_config[key] = trial
+    leaderboard = pd.DataFrame(sorted(best_by_config.values(), key=lambda t: t["cv_r2"], reverse=True))
+    leaderboard.insert(0, "rank", range(1, len(leaderboard) + 1))
+
+    leaderboard_path = os.path.join(output_dir, "leaderboard.json")
+    with open(leaderboard_path, "w") as f:
+        json.dump(leaderboard.drop(columns=["finished_at"]).to_dict(orient="records"), f, indent=4)
+
+    curve = time_to_accuracy(records)
+    curve.to_csv(os.path.join(output_dir, "time_to_accuracy.csv"), index=False)
+    plot_time_to_accuracy(curve, os.path.join(output_dir, "time_to_accuracy.png"))
+
+    print("\n🏆 Leaderboard (top 10):")
+    for row in leaderboard.head(10).itertuples():
+        print(f"  {row.rank:>2}. {row.family:<24} CV R² {row.cv_r2:.4f} ± {row.cv_r2_std:.4f} "
+              f"(budget {row.budget}) {row.params}")
+    print(f"Leaderboard saved to {leaderboard_path}")
+    return leaderboard
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Successive-halving hyperparameter search.")
+    parser.add_argument("--output-dir", default=os.path.join("models", "search"))
+    parser.add_argument("--families", nargs="+", default=None, choices=list(SEARCH_SPACES))
+    parser.add_argument("--n-candidates", type=int, default=9, help="Configurations sampled per family")
+    parser.add_argument("--eta", type=int, default=3, help="Keep 1/eta of trials per rung; budget grows by eta")
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel worker budget (-1 = all cores)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    X_train_path = os.path.join("data", "X_train_processed.npy")
+    y_train_path = os.path.join("data", "y_train.csv")
+
+    # Fix paths if running from src
+    if not os.path.exists(X_train_path):
+        X_train_path = os.path.join("..", X_train_path)
+        y_train_path = os.path.join("..", y_train_path)
+
+    run_search(X_train_path, y_train_path, output_dir=args.output_dir, families=args.families,
+               n_candidates=args.n_candidates, eta=args.eta, cv=args.cv, n_jobs=args.n_jobs, seed=args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,133 @@
 import pandas as pd
+import numpy as np
+import hashlib
+import json
 import os
 
-def load_data(filepath: str) -> pd.DataFrame:
+# Declared dtypes of the exam dataset: text columns load as categoricals and
+# numbers at the narrowest width their domain needs. Columns not listed keep
+# the type the reader infers; listed columns may be absent (e.g. no target).
+DATASET_SCHEMA = {
+    'student_id': 'int32',
+    'age': 'int8',
+    'gender': 'category',
+    'course': 'category',
+    'study_hours': 'float32',
+    'class_attendance': 'float32',
+    'internet_access': 'category',
+    'sleep_hours': 'float32',
+    'sleep_quality': 'category',
+    'study_method': 'category',
+    'facility_rating': 'category',
+    'exam_difficulty': 'category',
+    'exam_score': 'float32',
+}
+
+# Directory for binary copies of loaded datasets; unset disables the cache
+DATA_CACHE_DIR = os.environ.get("DATA_CACHE_DIR") or None
+
+def _arrow_type(dtype):
+    import pyarrow as pa
+
+    if dtype == 'category':
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.from_numpy_dtype(np.dtype(dtype))
+
+def _read_typed(filepath, schema):
+    """
+    Parses straight into the declared Arrow types, so numbers never exist at
+    full width and strings are dictionary-encoded as they are read. Arrow
+    rejects values that don't fit (e.g. 300 in an int8 column); an integer
+    column with missing values comes back as float.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    try:
+        if filepath.endswith(".parquet"):
+            table = pq.read_table(filepath)
+            types = {f.name: _arrow_type(schema[f.name]) if f.name in schema else f.type for f in table.schema}
+            table = table.cast(pa.schema([pa.field(name, t) for name, t in types.items()]))
+        else:
+            options = pa_csv.ConvertOptions(column_types={col: _arrow_type(dtype) for col, dtype in schema.items()})
+            table = pa_csv.read_csv(filepath, convert_options=options)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(f"{filepath} doesn't match the declared schema: {e}") from e
+    # Release each Arrow column as soon as it is converted rather than holding both copies
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def _cache_path(filepath, schema, cache_dir):
+    st = os.stat(filepath)
+    stamp = json.dumps([os.path.abspath(filepath), st.st_size, st.st_mtime_ns, schema], sort_keys=True)
+    key = hashlib.sha256(stamp.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(filepath)}.{key}.arrow")
+
+def load_data(filepath: str, schema: dict = DATASET_SCHEMA, cache_dir: str = DATA_CACHE_DIR,
+              verbose: bool = True) -> pd.DataFrame:
     """
-    Loads a CSV file into a Pandas DataFrame.
+    Loads a CSV or Parquet file into a Pandas DataFrame typed by `schema`.
+
+    With `cache_dir`, the typed frame is also written there as an uncompressed
+    Arrow file, keyed by the source's path, size and mtime and the schema.
+    Repeat loads memory-map it instead of parsing the source again.
 
     Args:
-        filepath (str): The path to the CSV file to load.
+        filepath (str): The path to the CSV or .parquet file to load.
+        schema (dict): Column -> dtype ('category', 'int8', 'float32', ...);
+            None loads with pandas' inferred types.
+        cache_dir (str): Where to keep binary copies; None disables caching.
+        verbose (bool): Print what was loaded.
 
     Returns:
         pd.DataFrame: A pandas DataFrame containing the loaded data.
 
     Raises:
         FileNotFoundError: If the file does not exist at the specified path.
-        Exception: If there is an error reading the CSV file.
+        ValueError: If a value doesn't fit its declared dtype.
+        Exception: If there is an error reading the file.
     """
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"File not found: {filepath}")
     
     try:
-        df = pd.read_csv(filepath)
-        print(f"Successfully loaded data from {filepath}")
-        print(f"Shape: {df.shape}")
+        cache_path = _cache_path(filepath, schema, cache_dir) if cache_dir and schema else None
+        if cache_path and os.path.exists(cache_path):
+            import pyarrow.feather as feather
+            df = feather.read_table(cache_path, memory_map=True).to_pandas(split_blocks=True, self_destruct=True)
+            source = f"{filepath} (cached)"
+        else:
+            if schema is None:
+                df = pd.read_parquet(filepath) if filepath.endswith(".parquet") else pd.read_csv(filepath)
+            else:
+                df = _read_typed(filepath, schema)
+            if cache_path:
+                _write_cache(df, cache_path)
+            source = filepath
+        if verbose:
+            print(f"Successfully loaded data from {source}")
+            print(f"Shape: {df.shape}")
         return df
     except Exception as e:
         print(f"Error loading data: {e}")
         raise
 
+def _write_cache(df, cache_path):
+    """
+    Writes the Arrow copy atomically and drops stale copies of the same file.
+    """
+    import pyarrow.feather as feather
+
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    prefix = os.path.basename(cache_path).rsplit(".", 2)[0] + "."
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix) and name.endswith(".arrow") and name != os.path.basename(cache_path):
+            os.remove(os.path.join(cache_dir, name))
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    feather.write_feather(df, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, cache_path)
+
 def get_column_info(df: pd.DataFrame) -> pd.DataFrame:
     """
     Returns a summary DataFrame with column names, types, missing values, and unique counts.
@@ -38,11 +139,85 @@ def get_column_info(df: pd.DataFrame) -> pd.DataFrame:
         pd.DataFrame: A summary DataFrame where each row corresponds to a column in the input DataFrame,
                       containing information about data types, missing values, and unique counts.
     """
+    missing = df.isnull().sum()
     info = pd.DataFrame({
         'Type': df.dtypes,
-        'Missing': df.isnull().sum(),
-        'Missing %': (df.isnull().sum() / len(df)) * 100,
+        'Missing': missing,
+        'Missing %': (missing / len(df)) * 100,
         'Unique': df.nunique(),
         'Example': df.iloc[0] if not df.empty else None
     })
     return info
+
+def file_sha256(filepath: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Returns the hex SHA-256 of a file's contents, read in chunks.
+
+    Args:
+        filepath (str): The path to the file to hash.
+        chunk_size (int): Bytes read per iteration.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _schema_path(matrix_path: str) -> str:
+    return os.path.splitext(matrix_path)[0] + ".schema.json"
+
+def save_matrix(matrix_path: str, matrix, feature_names) -> None:
+    """
+    Saves a processed feature matrix as a float32 .npy file plus a JSON schema
+    sidecar (<name>.schema.json) holding the feature names, dtype and shape.
+
+    Args:
+        matrix_path (str): Destination .npy path.
+        matrix: Dense array or scipy sparse matrix of shape (n_rows, n_features).
+        feature_names (list): One name per column.
+    """
+    if hasattr(matrix, "toarray"):
+        matrix = matrix.toarray()
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    feature_names = [str(name) for name in feature_names]
+    if matrix.ndim != 2 or matrix.shape[1] != len(feature_names):
+        raise ValueError(f"Matrix shape {matrix.shape} doesn't match {len(feature_names)} feature names")
+
+    np.save(matrix_path, matrix)
+    with open(_schema_path(matrix_path), "w") as f:
+        json.dump({
+            "feature_names": feature_names,
+            "dtype": str(matrix.dtype),
+            "shape": list(matrix.shape),
+        }, f, indent=4)
+
+def load_matrix_schema(matrix_path: str) -> dict:
+    """
+    Reads the schema sidecar written by save_matrix.
+    """
+    with open(_schema_path(matrix_path)) as f:
+        return json.load(f)
+
+def load_matrix(matrix_path: str, mmap: bool = True):
+    """
+    Loads a processed feature matrix saved by save_matrix, memory-mapped read-only
+    by default so nothing is parsed or copied up front. Legacy .csv matrices are
+    still read with pandas.
+
+    Returns:
+        tuple: (np.ndarray of shape (n_rows, n_features), list of feature names)
+    """
+    if matrix_path.endswith(".csv"):
+        df = pd.read_csv(matrix_path)
+        return df.to_numpy(), df.columns.tolist()
+
+    if not os.path.exists(matrix_path):
+        raise FileNotFoundError(f"File not found: {matrix_path}")
+    matrix = np.load(matrix_path, mmap_mode="r" if mmap else None)
+    schema = load_matrix_schema(matrix_path)
+    if list(matrix.shape) != schema["shape"]:
+        raise ValueError(f"{matrix_path} has shape {matrix.shape}, schema says {schema['shape']}")
+    return matrix, schema["feature_names"]
@@ -1,26 +1,112 @@
-import requests
-import json
-
-url = "http://127.0.0.1:8000/predict"
-
-payload = {
-    "age": 20,
-    "gender": "male",
-    "course": "undergraduate",
-    "study_hours": 6.0,
-    "class_attendance": 85.0,
-    "internet_access": "yes",
-    "sleep_hours": 7.5,
-    "sleep_quality": "good",
-    "study_method": "self-study",
-    "facility_rating": "moderate",
-    "exam_difficulty": "moderate"
-}
-
-try:
-    response = requests.post(url, json=payload)
-    print(f"Status Code: {response.status_code}")
-    print("Response JSON:")
-    print(json.dumps(response.json(), indent=2))
-except Exception as e:
-    print(f"Request failed: {e}")
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LinearRegression
+
+from app.backend import main
+from src.explainability import write_feature_manifest
+from src.registry import publish_version
+
+PROFILE = main.WARMUP_PROFILE
+
+def _client(monkeypatch):
+    monkeypatch.setattr(main, "MODEL_POLL_SECONDS", 0)
+    return TestClient(main.app)
+
+def test_batch_mixes_row_errors_with_scores(monkeypatch):
+    rows = [PROFILE, {**PROFILE, "age": "abc"}, {**PROFILE, "study_hours": 6.5}, {"age": 20}]
+    with _client(monkeypatch) as client:
+        body = client.post("/predict/batch", json={"profiles": rows}).json()
+        single = client.post("/predict", json=PROFILE).json()
+
+    assert (body["n_valid"], body["n_invalid"]) == (2, 2)
+    assert [r["index"] for r in body["results"]] == [0, 1, 2, 3]
+    assert body["results"][0]["exam_score"] == single["exam_score"] and body["results"][0]["errors"] is None
+    assert body["results"][1]["exam_score"] is None and body["results"][1]["errors"][0].startswith("age:")
+    assert body["results"][2]["exam_score"] is not None
+    assert len(body["results"][3]["errors"]) == len(PROFILE) - 1  # every missing field is listed
+
+def test_batch_accepts_columns_or_profiles_but_not_both(monkeypatch):
+    rows = [PROFILE, {**PROFILE, "sleep_hours": 5.0}]
+    columns = {field: [row[field] for row in rows] for field in PROFILE}
+    with _client(monkeypatch) as client:
+        by_rows = client.post("/predict/batch", json={"profiles": rows})
+        by_columns = client.post("/predict/batch", json={"columns": columns})
+        assert by_rows.status_code == by_columns.status_code == 200
+        assert by_rows.json() == by_columns.json()
+
+        for payload in ({}, {"profiles": rows, "columns": columns}):
+            response = client.post("/predict/batch", json=payload)
+            assert response.status_code == 422 and "exactly one" in response.json()["detail"]
+        ragged = client.post("/predict/batch", json={"columns": {**columns, "age": [20]}})
+        assert ragged.status_code == 422
+
+def test_empty_batches(monkeypatch):
+    with _client(monkeypatch) as client:
+        for payload in ({"profiles": []}, {"columns": {}}, {"columns": {"age": []}}):
+            response = client.post("/predict/batch", json=payload)
+            assert response.status_code == 200
+            assert response.json() == {"results": [], "n_valid": 0, "n_invalid": 0}
+
+def test_feature_importance_etag_revalidation(tmp_path, monkeypatch):
+    for name in ("best_model.pkl", "preprocessing_pipeline.pkl", "feature_importance.json"):
+        shutil.copy(os.path.join("models", name), tmp_path)
+    monkeypatch.setattr(main, "model_dir", str(tmp_path))
+    with _client(monkeypatch) as client:
+        first = client.get("/feature_importance")
+        etag = first.headers["etag"]
+        assert first.status_code == 200 and first.json()
+        assert client.get("/feature_importance").headers["etag"] == etag
+
+        for if_none_match in (etag, f'"other", W/{etag}'):
+            revalidated = client.get("/feature_importance", headers={"If-None-Match": if_none_match})
+            assert revalidated.status_code == 304 and revalidated.content == b""
+        assert client.get("/feature_importance", headers={"If-None-Match": '"other"'}).status_code == 200
+
+        # A retrained model on disk gets a new ETag, and the old one no longer matches
+        X = np.load(os.path.join("data", "X_train_processed.npy"))[:500]
+        y = pd.read_csv(os.path.join("data", "y_train.csv")).iloc[:500, 0].to_numpy()
+        joblib.dump(LinearRegression().fit(X, y), tmp_path / "best_model.pkl")
+        write_feature_manifest(str(tmp_path))
+        changed = client.get("/feature_importance", headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+def test_ready_only_after_the_model_is_loaded_and_warm(monkeypatch):
+    monkeypatch.setattr(main, "ready", False)
+    monkeypatch.setattr(main, "pipeline", None)
+    client = _client(monkeypatch)
+    # Without the context manager, startup hooks haven't run yet
+    response = client.get("/ready")
+    assert response.status_code == 503 and response.json()["status"] == "starting"
+    assert client.get("/").status_code == 200  # liveness is unaffected
+
+    with client:
+        response = client.get("/ready")
+        assert response.status_code == 200 and response.json()["warmup_seconds"] > 0
+
+def test_not_ready_when_the_model_fails_to_load(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "ready", False)
+    monkeypatch.setattr(main, "pipeline", None)
+    monkeypatch.setattr(main, "model_dir", str(tmp_path))  # no artifacts
+    with _client(monkeypatch) as client:
+        assert client.get("/ready").status_code == 503
+        assert client.post("/predict", json=PROFILE).status_code == 503
+
+def test_ready_once_a_model_is_published_after_startup(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "ready", False)
+    monkeypatch.setattr(main, "pipeline", None)
+    monkeypatch.setattr(main, "model_dir", str(tmp_path / "models"))
+    (tmp_path / "models").mkdir()
+    with _client(monkeypatch) as client:
+        assert client.get("/ready").status_code == 503
+
+        publish_version(str(tmp_path / "models"), "models")
+        assert main.reloader.check()
+        response = client.get("/ready")
+        assert response.status_code == 200 and response.json()["warmup_seconds"] > 0
+        assert "model_ready 1" in client.get("/metrics").text
+        assert client.post("/predict", json=PROFILE).status_code == 200
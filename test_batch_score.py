@@ -0,0 +1,83 @@
+import os
+import shutil
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from src.batch_score import score_file
+from src.predict_pipeline import PredictPipeline
+from src.registry import publish_version, version_dir
+
+def _registry(tmp_path):
+    """
+    A registry whose flat files hold the repo's model and whose CURRENT version
+    holds a different one, so the two give different scores.
+    """
+    registry, source = tmp_path / "models", tmp_path / "source"
+    registry.mkdir()
+    source.mkdir()
+    for name in ("best_model.pkl", "preprocessing_pipeline.pkl"):
+        shutil.copy(os.path.join("models", name), registry)
+    shutil.copy(os.path.join("models", "preprocessing_pipeline.pkl"), source)
+    X = np.load(os.path.join("data", "X_train_processed.npy"))[:500]
+    y = pd.read_csv(os.path.join("data", "y_train.csv")).iloc[:500, 0].to_numpy()
+    joblib.dump(LinearRegression().fit(X, y), source / "best_model.pkl")
+    return str(registry), publish_version(str(registry), str(source))
+
+def _expected(path, rows):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return PredictPipeline(model_dir=path).predict_batch(rows)
+
+def test_chunks_score_the_current_version_in_input_order(tmp_path):
+    registry, version = _registry(tmp_path)
+    rows = pd.read_csv(os.path.join("data", "Exam_Score_Prediction.csv"), nrows=250)
+    rows.to_csv(tmp_path / "in.csv", index=False)
+
+    output = str(tmp_path / "out.parquet")
+    score_file(str(tmp_path / "in.csv"), output, model_dir=registry, chunksize=100, workers=2)
+    scores = pd.read_parquet(output)
+    assert scores["row"].tolist() == list(range(250))
+    assert scores["student_id"].tolist() == rows["student_id"].tolist()
+    np.testing.assert_allclose(scores["exam_score"], _expected(version_dir(registry, version), rows))
+    assert not os.path.exists(output + ".parts")
+
+def test_rerun_resumes_from_finished_parts(tmp_path):
+    registry, _ = _registry(tmp_path)
+    rows = pd.read_csv(os.path.join("data", "Exam_Score_Prediction.csv"), nrows=250)
+    rows.to_csv(tmp_path / "in.csv", index=False)
+    output = str(tmp_path / "out.parquet")
+    run = lambda **kwargs: score_file(str(tmp_path / "in.csv"), output, model_dir=registry, workers=1, **kwargs)
+
+    run(chunksize=100, keep_parts=True)
+    parts = output + ".parts"
+    # Simulate a crash after chunk 0: chunk 1 never finished, chunk 2 was in flight
+    os.remove(os.path.join(parts, "part-000001.parquet"))
+    os.remove(os.path.join(parts, "part-000002.parquet"))
+    marked = pd.read_parquet(os.path.join(parts, "part-000000.parquet")).assign(exam_score=-1.0)
+    marked.to_parquet(os.path.join(parts, "part-000000.parquet"), index=False)
+
+    run(chunksize=100, keep_parts=True)
+    scores = pd.read_parquet(output)
+    assert scores["row"].tolist() == list(range(250))
+    assert (scores["exam_score"][:100] == -1.0).all() and (scores["exam_score"][100:] > 0).all()
+
+    # A different chunk size is a different job, so its parts start over
+    run(chunksize=50)
+    assert (pd.read_parquet(output)["exam_score"] > 0).all()
+
+def test_flat_artifacts_and_pinned_versions(tmp_path):
+    registry, version = _registry(tmp_path)
+    rows = pd.read_csv(os.path.join("data", "Exam_Score_Prediction.csv"), nrows=20)
+    rows.to_csv(tmp_path / "in.csv", index=False)
+    output = str(tmp_path / "out.parquet")
+
+    os.remove(os.path.join(registry, "CURRENT"))
+    score_file(str(tmp_path / "in.csv"), output, model_dir=registry, workers=1)
+    np.testing.assert_allclose(pd.read_parquet(output)["exam_score"], _expected(registry, rows))
+
+    score_file(str(tmp_path / "in.csv"), output, model_dir=registry, workers=1, version=version)
+    np.testing.assert_allclose(pd.read_parquet(output)["exam_score"], _expected(version_dir(registry, version), rows))
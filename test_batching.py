@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+from app.backend.batching import MicroBatcher
+
+class FakeModel:
+    """
+    Doubles each row's "x" and records batch sizes; negative x fails the call.
+    """
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, records):
+        self.batches.append(len(records))
+        if any(r["x"] < 0 for r in records):
+            raise ValueError("negative x")
+        return [2 * r["x"] for r in records]
+
+def test_concurrent_submits_get_their_own_results():
+    model = FakeModel()
+    batcher = MicroBatcher(model, window_ms=5, max_batch_size=16).start()
+    results = {}
+
+    def client(offset):
+        futures = [(x, batcher.submit({"x": x})) for x in range(offset, 200, 8)]
+        results.update((x, future.result(timeout=10)) for x, future in futures)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.stop()
+
+    assert results == {x: 2.0 * x for x in range(200)}
+    assert sum(model.batches) == 200 and max(model.batches) <= 16
+    assert batcher.stats()["requests"] == 200
+
+def test_queued_rows_split_at_max_batch_size():
+    model = FakeModel()
+    batcher = MicroBatcher(model, window_ms=50, max_batch_size=4)
+    futures = [batcher.submit({"x": x}) for x in range(10)]  # queued before the thread starts
+    batcher.start()
+    assert [f.result(timeout=10) for f in futures] == [2.0 * x for x in range(10)]
+    assert model.batches == [4, 4, 2]
+    assert batcher.stats()["batch_size_counts"] == {2: 1, 4: 2}
+    batcher.stop()
+
+def test_errors_reach_only_the_failing_rows():
+    model = FakeModel()
+    batcher = MicroBatcher(model, window_ms=50, max_batch_size=8)
+    futures = [batcher.submit({"x": x}) for x in (1, -1, 2)]
+    batcher.start()
+    assert futures[0].result(timeout=10) == 2.0 and futures[2].result(timeout=10) == 4.0
+    with pytest.raises(ValueError, match="negative x"):
+        futures[1].result(timeout=10)
+    # The failed batch of 3 is retried row by row
+    assert model.batches == [3, 1, 1, 1]
+    batcher.stop()
+
+    # A short result for a batch is scored again row by row instead of leaving rows pending
+    batcher = MicroBatcher(lambda records: [0.0], window_ms=50)
+    futures = [batcher.submit({"x": x}) for x in range(2)]
+    batcher.start()
+    assert [f.result(timeout=10) for f in futures] == [0.0, 0.0]
+    batcher.stop()
+
+def test_stop_finishes_queued_rows_and_rejects_new_ones():
+    model = FakeModel()
+    batcher = MicroBatcher(model, window_ms=1000, max_batch_size=64).start()
+    futures = [batcher.submit({"x": x}) for x in range(5)]
+    batcher.stop()  # returns well before the 1 s window would have closed the batch
+    assert all(f.done() for f in futures)
+    assert [f.result() for f in futures] == [0.0, 2.0, 4.0, 6.0, 8.0]
+    with pytest.raises(RuntimeError):
+        batcher.submit({"x": 5})
+    batcher.stop()
+
+def test_cancelled_waiter_does_not_stop_the_batcher():
+    model = FakeModel()
+    batcher = MicroBatcher(model, window_ms=50, max_batch_size=8)
+    futures = [batcher.submit({"x": x}) for x in range(3)]
+    assert futures[1].cancel()  # e.g. the client of a /predict disconnected
+    batcher.start()
+    assert futures[0].result(timeout=10) == 0.0 and futures[2].result(timeout=10) == 4.0
+    assert model.batches == [2]
+
+    # The thread is still alive and serves the next request
+    assert batcher.submit({"x": 5}).result(timeout=10) == 10.0
+    batcher.stop()
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import gaussian_kde
+
+from src.eda import _binned_kde, _box_stats, _histogram, _score_bins, generate_eda
+
+def _frame(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "student_id": np.arange(n),
+        "age": rng.integers(17, 25, n),
+        "study_hours": rng.uniform(0, 8, n).round(2),
+        "course": rng.choice(["ba", "bca", "b.sc"], n),
+        "exam_score": rng.normal(60, 15, n).clip(0, 100).round(1),
+    })
+
+def _generated(capsys):
+    return sorted(line.split(": ")[1] for line in capsys.readouterr().out.splitlines()
+                  if line.startswith("Generated: "))
+
+def test_unchanged_plots_are_skipped(tmp_path, capsys):
+    path, out = tmp_path / "data.csv", str(tmp_path / "plots")
+    df = _frame()
+    df.to_csv(path, index=False)
+
+    generate_eda(str(path), out, jobs=1)
+    assert _generated(capsys) == ["boxplot_course.png", "correlation_heatmap.png", "dist_age.png",
+                                  "dist_exam_score.png", "dist_study_hours.png"]
+    generate_eda(str(path), out, jobs=1)
+    assert _generated(capsys) == []
+
+    # Switching mode re-renders everything
+    generate_eda(str(path), out, jobs=1, binned=True)
+    assert len(_generated(capsys)) == 5
+
+    # Only the plots that read study_hours are stale
+    df["study_hours"] = 8 - df["study_hours"]
+    df.to_csv(path, index=False)
+    generate_eda(str(path), out, jobs=1, binned=True)
+    assert _generated(capsys) == ["correlation_heatmap.png", "dist_study_hours.png"]
+
+def test_binned_aggregates_match_raw_statistics():
+    df = _frame(50_000)
+
+    hist = _histogram(df["study_hours"], bins=40)
+    assert hist["counts"].sum() == len(df)
+    grid, curve = _binned_kde(hist)
+    bar_width = np.diff(hist["edges"]).mean()
+    exact = gaussian_kde(df["study_hours"])(grid) * len(df) * bar_width
+    np.testing.assert_allclose(curve, exact, rtol=0.02)
+
+    # Integer columns get one bar per value
+    assert len(_histogram(df["age"], bins=40)["counts"]) == 8
+
+    stats = _box_stats(df["course"], _score_bins(df["exam_score"]))
+    assert [s["label"] for s in stats] == ["b.sc", "ba", "bca"]
+    for s in stats:
+        scores = df.loc[df["course"] == s["label"], "exam_score"]
+        q1, med, q3 = np.percentile(scores, [25, 50, 75])
+        np.testing.assert_allclose([s["q1"], s["med"], s["q3"]], [q1, med, q3], atol=0.1)
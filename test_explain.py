@@ -0,0 +1,47 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.contributions import build_explainer
+from src.predict_pipeline import PredictPipeline
+
+DATA_PATH = "data/Exam_Score_Prediction.csv"
+
+def load_pipelines():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return PredictPipeline(model_dir="models"), PredictPipeline(model_dir="models", fast_path=False)
+
+def test_linear_contributions_add_up_and_match_between_paths():
+    fast, reference = load_pipelines()
+    df = pd.read_csv(DATA_PATH, nrows=2000).drop(columns=["exam_score"])
+
+    explained = fast.explain_batch(df.to_dict(orient="records"))
+    expected = reference.explain_batch(df)
+    assert explained["fields"] == expected["fields"]
+    assert "gender" in explained["fields"] and "study_efficiency" in explained["fields"]
+    np.testing.assert_allclose(explained["contributions"], expected["contributions"], rtol=0, atol=1e-9)
+
+    # Scores are the ones predict_batch returns; contributions sum to them
+    np.testing.assert_array_equal(explained["predictions"], fast.predict_batch(df))
+    totals = explained["base_value"] + explained["contributions"].sum(axis=1)
+    np.testing.assert_allclose(totals, fast._predict_raw(df), rtol=0, atol=1e-9)
+
+def test_tree_contributions_add_up_to_model_predictions():
+    from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+
+    _, reference = load_pipelines()
+    df = pd.read_csv(DATA_PATH, nrows=3000)
+    X = reference.preprocessor.transform(df.drop(columns=["exam_score"]))
+    y = df["exam_score"]
+
+    for model in (RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0),
+                  GradientBoostingRegressor(n_estimators=20, random_state=0)):
+        model.fit(X[:2000], y[:2000])
+        explainer = build_explainer(reference.preprocessor, model)
+        prediction, contributions = explainer.explain(X[2000:])
+
+        assert contributions.shape == (1000, len(explainer.fields))
+        np.testing.assert_allclose(prediction, model.predict(X[2000:]), rtol=0, atol=1e-9)
+        np.testing.assert_allclose(explainer.base_value + contributions.sum(axis=1), prediction, rtol=0, atol=1e-9)
@@ -0,0 +1,42 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.predict_pipeline import PredictPipeline
+
+DATA_PATH = os.path.join("data", "Exam_Score_Prediction.csv")
+
+def load_pipelines():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return PredictPipeline(model_dir="models"), PredictPipeline(model_dir="models", fast_path=False)
+
+def test_compiled_plan_matches_sklearn_on_full_dataset():
+    fast, reference = load_pipelines()
+    assert fast.plan is not None, "LinearRegression pipeline should compile to a NumPy plan"
+
+    df = pd.read_csv(DATA_PATH).drop(columns=["exam_score"])
+    expected = reference.model.predict(reference.preprocessor.transform(df))
+
+    # DataFrame, row-oriented and columnar inputs all go through the same plan
+    records = df.to_dict(orient="records")
+    columnar = {c: df[c].tolist() for c in df.columns}
+    for payload in (df, records, columnar):
+        np.testing.assert_allclose(fast._predict_raw(payload), expected, rtol=0, atol=1e-9)
+
+def test_unknown_categories_contribute_nothing_like_onehot_ignore():
+    fast, reference = load_pipelines()
+    row = pd.read_csv(DATA_PATH, nrows=1).drop(columns=["exam_score"]).to_dict(orient="records")[0]
+    row["course"] = "astrophysics"
+
+    assert abs(fast._predict_raw([row])[0] - reference._predict_raw([row])[0]) < 1e-9
+    assert fast.predict(row) == reference.predict(row)
+
+def test_unsupported_model_falls_back_to_sklearn():
+    from sklearn.ensemble import RandomForestRegressor
+    from src.fast_inference import compile_plan
+
+    fast, _ = load_pipelines()
+    assert compile_plan(fast.preprocessor, RandomForestRegressor()) is None
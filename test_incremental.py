@@ -0,0 +1,39 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.fast_inference import compile_plan
+from src.incremental import (
+    _feature_names, extend_vocabulary, full_retrain, make_online_model, remap_coefficients, update_scaler,
+)
+
+DATA_PATH = "data/Exam_Score_Prediction.csv"
+
+def test_new_categories_and_scaler_stats_leave_predictions_unchanged():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        df = pd.read_csv(DATA_PATH, nrows=3000)
+        preprocessor, model, _ = full_retrain(df.iloc[:2000])
+
+    new = df.iloc[2000:].copy()
+    new.loc[new.index[:50], "course"] = "b.arch"
+    X_new = new.drop(columns=["exam_score"])
+    before = model.predict(preprocessor.transform(X_new))
+
+    online = make_online_model(model)
+    engineered = preprocessor.named_steps["feature_engineering"].transform(X_new)
+    old_names = _feature_names(preprocessor)
+    assert extend_vocabulary(preprocessor, engineered) == {"course": ["b.arch"]}
+    remap_coefficients(online, old_names, _feature_names(preprocessor))
+    update_scaler(preprocessor, online, engineered)
+
+    # Unseen categories used to encode as zeros and now get a zero coefficient;
+    # the coefficients absorb the scaler's new mean and scale
+    after = online.predict(preprocessor.transform(X_new))
+    np.testing.assert_allclose(after, before, rtol=0, atol=1e-9)
+    assert "cat__course_b.arch" in _feature_names(preprocessor)
+    assert compile_plan(preprocessor, online) is not None
+
+    online.partial_fit(preprocessor.transform(X_new), new["exam_score"].to_numpy())
+    assert online.coef_[_feature_names(preprocessor).index("cat__course_b.arch")] != 0
@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import DATASET_SCHEMA, load_data
+
+DATA_PATH = "data/Exam_Score_Prediction.csv"
+
+def test_typed_load_matches_read_csv_and_caches(tmp_path):
+    raw = pd.read_csv(DATA_PATH)
+    cache_dir = str(tmp_path / "cache")
+    typed = load_data(DATA_PATH, cache_dir=cache_dir, verbose=False)
+
+    assert {col: str(dtype) for col, dtype in typed.dtypes.items()} == DATASET_SCHEMA
+    assert typed.memory_usage(deep=True).sum() < raw.memory_usage(deep=True).sum() / 4
+    for col in raw.columns:
+        if DATASET_SCHEMA[col] == 'category':
+            assert (typed[col].astype(str) == raw[col]).all()
+        else:
+            np.testing.assert_array_equal(typed[col], raw[col].astype(DATASET_SCHEMA[col]))
+
+    # Second load comes from the Arrow copy, identically typed
+    assert len(os.listdir(cache_dir)) == 1
+    pd.testing.assert_frame_equal(load_data(DATA_PATH, cache_dir=cache_dir, verbose=False), typed)
+
+def test_values_outside_declared_width_are_rejected(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("age,course\n20,ba\n300,bca\n")
+    with pytest.raises(ValueError, match="declared schema"):
+        load_data(str(path), verbose=False)
+    # Columns the file lacks are fine, and undeclared ones keep pandas' inference
+    path.write_text("age,extra\n20,1.5\n")
+    df = load_data(str(path), verbose=False)
+    assert str(df["age"].dtype) == "int8" and str(df["extra"].dtype) == "float64"
@@ -0,0 +1,26 @@
+from app.backend.metrics import Histogram, MetricsRegistry
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    hist = Histogram(buckets=(0.001, 0.01, 0.1))
+    for _ in range(90):
+        hist.observe(0.0005)
+    for _ in range(10):
+        hist.observe(0.05)
+
+    assert hist.count == 100
+    assert 0 < hist.quantile(0.5) <= 0.001
+    assert 0.01 < hist.quantile(0.99) <= 0.1
+
+def test_render_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.describe("requests_total", "counter", "Requests.")
+    registry.describe("latency_seconds", "histogram", "Latency.")
+    registry.inc("requests_total", path="/predict", status="200")
+    registry.inc("requests_total", path="/predict", status="200")
+    registry.observe("latency_seconds", 0.002, stage='say "hi"')
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{path="/predict",status="200"} 2' in text
+    assert 'latency_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 1' in text
+    assert 'latency_seconds_count{stage="say \\"hi\\""} 1' in text
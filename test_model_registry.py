@@ -0,0 +1,109 @@
+import os
+import shutil
+
+import pytest
+
+from app.backend.reloader import ModelReloader
+from src.registry import get_current, list_versions, publish_if_changed, publish_version, set_current, verify_version
+
+def make_source(tmp_path, name="source", content=b"model"):
+    source = tmp_path / name
+    source.mkdir()
+    (source / "best_model.pkl").write_bytes(content)
+    (source / "preprocessing_pipeline.pkl").write_bytes(b"pipeline")
+    return str(source)
+
+def test_publish_creates_versions_and_moves_current(tmp_path):
+    registry = str(tmp_path / "registry")
+    v1 = publish_version(registry, make_source(tmp_path, "a", b"one"))
+    v2 = publish_version(registry, make_source(tmp_path, "b", b"two"), activate=False)
+
+    assert (v1, v2) == ("v0001", "v0002")
+    assert list_versions(registry) == ["v0001", "v0002"]
+    assert get_current(registry) == "v0001"
+    verify_version(registry, v2)
+
+    set_current(registry, v2)
+    assert get_current(registry) == "v0002"
+    with pytest.raises(ValueError):
+        set_current(registry, "v9999")
+
+def test_verify_rejects_modified_artifact(tmp_path):
+    registry = str(tmp_path / "registry")
+    version = publish_version(registry, make_source(tmp_path))
+    with open(os.path.join(registry, "versions", version, "best_model.pkl"), "wb") as f:
+        f.write(b"tampered")
+    with pytest.raises(ValueError):
+        verify_version(registry, version)
+
+def test_publish_if_changed_reuses_identical_versions(tmp_path):
+    registry = str(tmp_path / "registry")
+    one, two = make_source(tmp_path, "a", b"one"), make_source(tmp_path, "b", b"two")
+    assert publish_if_changed(registry, one) == "v0001"
+    assert publish_if_changed(registry, one) == "v0001"
+    assert publish_if_changed(registry, two) == "v0002"
+
+    # Identical bytes point CURRENT back at their version instead of copying them again
+    assert publish_if_changed(registry, one) == "v0001"
+    assert get_current(registry) == "v0001" and list_versions(registry) == ["v0001", "v0002"]
+
+def test_reloader_swaps_on_pointer_change_and_rolls_back(tmp_path):
+    registry = str(tmp_path / "registry")
+    publish_version(registry, make_source(tmp_path, "a", b"one"))
+
+    installed = []
+    load = lambda path: open(os.path.join(path, "best_model.pkl"), "rb").read()
+    reloader = ModelReloader(registry, load, installed.append, poll_seconds=0)
+
+    assert reloader.check()
+    assert not reloader.check() # Already serving CURRENT
+    publish_version(registry, make_source(tmp_path, "b", b"two"))
+    assert reloader.check()
+    assert [m.pipeline for m in installed] == [b"one", b"two"]
+
+    reloader.rollback()
+    assert installed[-1].pipeline == b"one"
+    assert get_current(registry) == "v0001"
+    assert not reloader.check()
+
+def test_reloader_keeps_active_model_when_new_version_fails(tmp_path):
+    registry = str(tmp_path / "registry")
+    publish_version(registry, make_source(tmp_path, "a", b"one"))
+    reloader = ModelReloader(registry, lambda path: path, lambda model: None, poll_seconds=0)
+    assert reloader.check()
+
+    version = publish_version(registry, make_source(tmp_path, "b", b"two"))
+    shutil.rmtree(os.path.join(registry, "versions", version))
+    os.makedirs(os.path.join(registry, "versions", version))
+    assert not reloader.check()
+    assert reloader.active.version == "v0001"
+    assert reloader.last_error
+
+def test_reloader_retries_failed_loads_with_backoff_but_not_corrupt_versions(tmp_path):
+    registry = str(tmp_path / "registry")
+    publish_version(registry, make_source(tmp_path, "a", b"one"))
+    now, failures = [0.0], [MemoryError("out of memory")] * 2
+
+    def load(path):
+        if failures:
+            raise failures.pop()
+        return path
+
+    reloader = ModelReloader(registry, load, lambda model: None, poll_seconds=0, clock=lambda: now[0])
+    assert not reloader.check() and "out of memory" in reloader.last_error
+    now[0] = 4.9
+    assert not reloader.check() and len(failures) == 1  # Still backing off: no attempt
+    now[0] = 5.0
+    assert not reloader.check() and not failures  # Second failure doubles the wait
+    now[0] = 14.9
+    assert not reloader.check()
+    now[0] = 15.0
+    assert reloader.check() and reloader.active.version == "v0001"
+
+    version = publish_version(registry, make_source(tmp_path, "b", b"two"))
+    with open(os.path.join(registry, "versions", version, "best_model.pkl"), "wb") as f:
+        f.write(b"tampered")
+    assert not reloader.check() and "missing or modified" in reloader.last_error
+    now[0] = 1e6
+    assert not reloader.check() and reloader.active.version == "v0001"
+    assert reloader.n_reloads == 1
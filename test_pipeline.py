@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from src.pipeline import run_pipeline
+
+def _record(name):
+    with open("runs.txt", "a") as f:
+        f.write(name + "\n")
+
+def _upper(params):
+    _record("upper")
+    with open("in.txt") as src, open("upper.txt", "w") as dst:
+        dst.write(src.read().upper() * params["repeat"])
+
+def _length(params):
+    _record("length")
+    with open("upper.txt") as src, open("length.txt", "w") as dst:
+        dst.write(str(len(src.read())))
+
+def _words(params):
+    _record("words")
+    with open("in.txt") as src, open("words.txt", "w") as dst:
+        dst.write(str(len(src.read().split())))
+
+STAGES = {
+    "upper": {"run": _upper, "inputs": ["in.txt"], "outputs": ["upper.txt"], "params": {"repeat": 1}},
+    "length": {"run": _length, "inputs": ["upper.txt"], "outputs": ["length.txt"], "params": {}},
+    "words": {"run": _words, "inputs": ["in.txt"], "outputs": ["words.txt"], "params": {}},
+}
+
+def _run(**kwargs):
+    if os.path.exists("runs.txt"):
+        os.remove("runs.txt")
+    results = run_pipeline(stages=STAGES, jobs=2, cache_dir="cache", **kwargs)
+    ran = sorted(open("runs.txt").read().split()) if os.path.exists("runs.txt") else []
+    return {name: r["status"] for name, r in results.items()}, ran
+
+def test_only_stale_stages_rerun_and_outputs_restore_from_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "in.txt").write_text("the quick brown fox")
+
+    status, ran = _run()
+    assert ran == ["length", "upper", "words"] and set(status.values()) == {"ran"}
+    assert (tmp_path / "length.txt").read_text() == "19"
+
+    status, ran = _run()
+    assert ran == [] and set(status.values()) == {"cached"}
+
+    # A param change re-runs its stage; downstream re-runs because upper.txt changed
+    status, ran = _run(params={"upper": {"repeat": 2}})
+    assert ran == ["length", "upper"] and status["words"] == "cached"
+    assert (tmp_path / "length.txt").read_text() == "38"
+
+    # Back to the old param: both stages come back from the store without running
+    status, ran = _run()
+    assert ran == [] and status == {"upper": "restored", "length": "restored", "words": "cached"}
+    assert (tmp_path / "length.txt").read_text() == "19"
+
+    # Same content written again (new mtime) isn't a change
+    (tmp_path / "in.txt").write_text("the quick brown fox")
+    assert _run()[1] == []
+
+    # Targets pull in upstream stages only
+    (tmp_path / "in.txt").write_text("jumps over")
+    status, ran = _run(targets=["length"])
+    assert ran == ["length", "upper"] and "words" not in status
+
+def test_failed_stage_skips_dependents(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    status, ran = _run()  # in.txt is missing
+    assert status == {"upper": "failed", "length": "skipped", "words": "failed"}
+    assert "FileNotFoundError" in (tmp_path / "cache" / "logs" / "upper.log").read_text()
+
+def test_dependency_cycle_raises_instead_of_hanging(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "in.txt").write_text("a")
+    stages = {**STAGES, "upper": {**STAGES["upper"], "inputs": ["in.txt", "length.txt"]}}
+    with pytest.raises(RuntimeError, match=r"'length': \['upper'\].*'upper': \['length'\]"):
+        run_pipeline(stages=stages, jobs=1, cache_dir="cache")
@@ -0,0 +1,55 @@
+from fastapi.testclient import TestClient
+
+from app.backend import main
+from app.backend.cache import PredictionCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_lru_eviction_and_ttl_expiry():
+    clock = FakeClock()
+    cache = PredictionCache(max_size=2, ttl_seconds=10, clock=clock)
+    cache.put("a", 1.0)
+    cache.put("b", 2.0)
+    assert cache.get("a") == 1.0  # "a" is now the most recently used
+    cache.put("c", 3.0)
+    assert cache.get("b") is None and cache.get("a") == 1.0 and cache.get("c") == 3.0
+
+    clock.now = 9.9
+    assert cache.get("a") == 1.0
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert cache.stats() == {
+        "size": 1, "max_size": 2, "ttl_seconds": 10, "hits": 4, "misses": 2, "hit_ratio": 4 / 6,
+        "evictions": 1, "expirations": 1, "invalidations": 0,
+    }
+
+def test_clear_drops_entries_and_scores_from_the_old_generation():
+    cache = PredictionCache(clock=FakeClock())
+    cache.put("a", 1.0)
+    generation = cache.generation  # read before a request computes its score
+    cache.clear()
+    cache.put("b", 2.0, generation)
+    assert cache.get("a") is None and cache.get("b") is None
+    cache.put("b", 2.0, cache.generation)
+    assert cache.get("b") == 2.0
+    assert cache.stats()["invalidations"] == 1
+
+def test_stats_report_hits_and_a_reload_invalidates(monkeypatch):
+    monkeypatch.setattr(main, "MODEL_POLL_SECONDS", 0)
+    monkeypatch.setattr(main, "prediction_cache", PredictionCache(clock=FakeClock()))
+    with TestClient(main.app) as client:
+        for _ in range(2):
+            assert client.post("/predict", json=main.WARMUP_PROFILE).status_code == 200
+        cache = client.get("/stats").json()["cache"]
+        assert (cache["hits"], cache["misses"], cache["size"], cache["hit_ratio"]) == (1, 1, 1, 0.5)
+
+        # Loading a model again clears the cache, so the next request is a miss
+        assert main.reloader.load(main.reloader.active.version)
+        client.post("/predict", json=main.WARMUP_PROFILE)
+        cache = client.get("/stats").json()["cache"]
+        assert (cache["hits"], cache["misses"], cache["invalidations"]) == (1, 2, 2)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from src.profiling import DistinctCounter, QuantileSketch, profile_csv
+from src.utils import get_column_info
+
+def test_streaming_profile_matches_exact_summary(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 30_000
+    df = pd.DataFrame({
+        "score": rng.integers(0, 100, n).astype(float),
+        "hours": rng.normal(4, 2, n).round(2),
+        "course": rng.choice(["ba", "bca", None], n),
+        "student_id": np.arange(n),
+    })
+    # NaNs only in the tail, so early chunks parse "score" as int64 and later ones as float64
+    df.loc[25_000:, "score"] = np.nan
+    df.loc[:100, "hours"] = np.nan
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    exact = pd.read_csv(path)
+
+    for jobs in (1, 2):
+        profile = profile_csv(str(path), jobs=jobs, chunk_bytes=40_000, rows_per_chunk=1000)
+        assert profile.chunks > 10 and profile.exact
+        pd.testing.assert_frame_equal(profile.column_info(), get_column_info(exact))
+        summary = profile.numeric_summary()
+        expected = exact.describe().T[summary.columns]
+        pd.testing.assert_frame_equal(summary, expected, check_dtype=False)
+
+def test_sketches_stay_accurate_past_their_exact_range():
+    counters = [DistinctCounter() for _ in range(4)]
+    for k, counter in enumerate(counters):
+        counter.add(pd.util.hash_array(np.arange(k, 400_000, 4)))
+    merged = counters[0]
+    for counter in counters[1:]:
+        merged.merge(counter)
+    assert not merged.exact
+    assert abs(merged.count() / 400_000 - 1) < 0.02
+
+    values = np.random.default_rng(0).lognormal(size=1_000_000)
+    sketch = QuantileSketch(capacity=4096)
+    for chunk in np.array_split(values, 10):
+        sketch.add(chunk)
+    ranks = np.searchsorted(np.sort(values), sketch.quantiles([0.1, 0.5, 0.9])) / len(values)
+    np.testing.assert_allclose(ranks, [0.1, 0.5, 0.9], atol=0.01)
+    assert sum(len(level) for level in sketch.levels) < 4096 * len(sketch.levels)
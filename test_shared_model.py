@@ -0,0 +1,62 @@
+import os
+import shutil
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from src.predict_pipeline import PredictPipeline
+from src.registry import publish_version, verify_version, version_dir
+from src.tree_engine import TREES_ARTIFACT, write_tree_artifact
+
+def _model_dir(tmp_path, seed=0):
+    X = np.load(os.path.join("data", "X_train_processed.npy"))[:2000]
+    y = pd.read_csv(os.path.join("data", "y_train.csv")).iloc[:2000, 0].to_numpy()
+    shutil.copy(os.path.join("models", "preprocessing_pipeline.pkl"), tmp_path)
+    model = RandomForestRegressor(n_estimators=10, random_state=seed).fit(X, y)
+    joblib.dump(model, tmp_path / "best_model.pkl")
+    return model
+
+def _pipeline(path, **kwargs):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return PredictPipeline(model_dir=str(path), **kwargs)
+
+def test_mapped_trees_replace_the_pickle(tmp_path):
+    _model_dir(tmp_path)
+    write_tree_artifact(str(tmp_path))
+    rows = pd.read_csv(os.path.join("data", "Exam_Score_Prediction.csv"), nrows=600)
+    rows = rows.drop(columns=["exam_score"]).to_dict(orient="records")
+
+    mapped = _pipeline(tmp_path, mmap=True)
+    assert mapped._model is None
+    assert isinstance(mapped.trees.left.base, np.memmap) and not mapped.trees.left.flags.writeable
+    # Above TREE_ENGINE_MAX_ROWS too, so the pickle stays unloaded
+    expected = _pipeline(tmp_path)._predict_raw(rows)
+    np.testing.assert_array_equal(mapped._predict_raw(rows), expected)
+    assert mapped._model is None
+
+    # A retrained pickle makes the export stale; the pipeline unpickles instead
+    _model_dir(tmp_path, seed=1)
+    stale = _pipeline(tmp_path, mmap=True)
+    assert stale._model is not None and not isinstance(stale.trees.left.base, np.memmap)
+
+def test_registry_versions_carry_the_export(tmp_path):
+    source, registry = tmp_path / "source", tmp_path / "registry"
+    source.mkdir()
+    _model_dir(source)
+    write_tree_artifact(str(source))
+
+    version = publish_version(str(registry), str(source))
+    manifest = verify_version(str(registry), version)
+    assert f"{TREES_ARTIFACT}/meta.json" in manifest["files"]
+    assert _pipeline(version_dir(str(registry), version), mmap=True)._model is None
+
+    with open(os.path.join(version_dir(str(registry), version), TREES_ARTIFACT, "value.npy"), "r+b") as f:
+        f.seek(-8, os.SEEK_END)
+        f.write(b"\0" * 8)
+    with pytest.raises(ValueError, match="missing or modified"):
+        verify_version(str(registry), version)
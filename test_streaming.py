@@ -0,0 +1,74 @@
+import asyncio
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from app.backend import main
+from app.backend.streaming import CSVRowParser, LineSplitter, NDJSONRowParser, stream_scores
+
+def _split(data, chunk_size):
+    splitter = LineSplitter()
+    lines = []
+    for i in range(0, len(data), chunk_size):
+        lines.extend(splitter.feed(data[i:i + chunk_size]))
+    return lines + splitter.close()
+
+def _parse(parser, text, chunk_size=3):
+    return parser.parse(_split(text.encode(), chunk_size)) + parser.close()
+
+def test_line_splitter_handles_chunk_boundaries_crlf_and_blank_lines():
+    data = "\ufeffname,score\r\n\r\nzo\u00eb,1\n\nlast".encode()
+    expected = ["name,score", "", "zo\u00eb,1", "", "last"]
+    # Every chunk size, including ones splitting "\r\n" and the two bytes of "\u00eb"
+    for chunk_size in range(1, len(data) + 1):
+        assert _split(data, chunk_size) == expected
+    assert _split(b"a\nb\n", 1) == ["a", "b"]
+
+def test_csv_rows_keep_their_line_numbers():
+    text = 'id,note\r\n1,plain\r\n\r\n2,"two\r\nlines"\n3\n\n4,"say ""hi"""\n5,"never closed\n'
+    assert _parse(CSVRowParser(), text) == [
+        (2, {"id": "1", "note": "plain"}, None),
+        (4, {"id": "2", "note": "two\nlines"}, None),
+        (6, None, "expected 2 fields, got 1"),
+        (8, {"id": "4", "note": 'say "hi"'}, None),
+        (9, None, "unterminated quoted field"),
+    ]
+
+def test_ndjson_rows_keep_their_line_numbers():
+    text = '{"id": 1}\n\n[1, 2]\r\n{"id": \n{"id": 4}'
+    assert _parse(NDJSONRowParser(), text) == [
+        (1, {"id": 1}, None),
+        (3, None, "each line must be a JSON object"),
+        (4, None, "invalid JSON: Expecting value"),
+        (5, {"id": 4}, None),
+    ]
+
+def test_stream_scores_batches_rows_in_order():
+    async def chunks():
+        for chunk in (b"a\n1\n2", b"\n\n3\n4\n"):
+            yield chunk
+
+    def score_batch(parsed):
+        batches.append(len(parsed))
+        return [{"row": line, "exam_score": float(row["a"])} for line, row, _ in parsed]
+
+    async def collect():
+        return [part async for part in stream_scores(chunks(), score_batch, "csv", "ndjson", batch_size=3)]
+
+    batches = []
+    results = [json.loads(line) for part in asyncio.run(collect()) for line in part.splitlines()]
+    assert batches == [3, 1]
+    assert [(r["row"], r["exam_score"]) for r in results] == [(2, 1.0), (3, 2.0), (5, 3.0), (6, 4.0)]
+
+def test_stream_endpoint_reports_file_line_numbers(monkeypatch):
+    monkeypatch.setattr(main, "MODEL_POLL_SECONDS", 0)
+    valid = ",".join(str(v) for v in main.WARMUP_PROFILE.values())
+    upload = ",".join(main.WARMUP_PROFILE) + "\n" + valid + "\n\n" + valid.replace("20", "abc", 1) + "\n1,2\n" + valid
+    with TestClient(main.app) as client:
+        response = client.post("/predict/stream", content=upload, headers={"Content-Type": "text/csv"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [r["row"] for r in rows] == ["2", "4", "5", "6"]
+    assert [bool(r["exam_score"]) for r in rows] == [True, False, False, True]
+    assert "age" in rows[1]["error"] and rows[2]["error"] == "expected 11 fields, got 2"
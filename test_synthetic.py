@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from src.synthetic import generate
+
+DATA_PATH = "data/Exam_Score_Prediction.csv"
+
+def _r2(df):
+    X = pd.get_dummies(df.drop(columns=["student_id", "exam_score"]), dtype=float)
+    return LinearRegression().fit(X, df["exam_score"]).score(X, df["exam_score"])
+
+def test_generated_rows_match_real_distributions_and_are_reproducible(tmp_path):
+    real = pd.read_csv(DATA_PATH)
+    csv_path, parquet_path = str(tmp_path / "a.csv"), str(tmp_path / "b.parquet")
+    generate(csv_path, 60_000, source_path=DATA_PATH, seed=7, chunk_rows=25_000, jobs=1)
+    generate(parquet_path, 60_000, source_path=DATA_PATH, seed=7, chunk_rows=25_000, jobs=2)
+    synth = pd.read_csv(csv_path)
+
+    # Same seed and chunking: same rows, whatever the format or worker count
+    other = pd.read_parquet(parquet_path)
+    pd.testing.assert_frame_equal(synth, other.astype({c: str for c in other.select_dtypes("category")}),
+                                  check_dtype=False)
+    assert list(synth.columns) == list(real.columns)
+    assert synth["student_id"].tolist() == list(range(1, 60_001))
+
+    for col in ["age", "study_hours", "class_attendance", "sleep_hours", "exam_score"]:
+        assert abs(synth[col].mean() - real[col].mean()) < 0.05 * real[col].std()
+        assert synth[col].min() >= real[col].min() and synth[col].max() <= real[col].max()
+    for col in ["course", "study_method", "exam_difficulty"]:
+        freq = pd.concat([real[col].value_counts(normalize=True), synth[col].value_counts(normalize=True)], axis=1)
+        np.testing.assert_allclose(freq.iloc[:, 0], freq.iloc[:, 1], atol=0.01)
+
+    # The score keeps its relationship to the features
+    corr = [df.corr(numeric_only=True)["exam_score"] for df in (synth, real)]
+    np.testing.assert_allclose(corr[0], corr[1], atol=0.03)
+    assert abs(_r2(synth) - _r2(real)) < 0.03
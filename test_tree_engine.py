@@ -0,0 +1,76 @@
+import os
+import shutil
+import subprocess
+import sys
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+
+from src.predict_pipeline import PredictPipeline
+from src.tree_engine import TreeEnsemble, flatten_ensemble
+
+def _data(n=3000):
+    X = np.load(os.path.join("data", "X_train_processed.npy"))[:n]
+    y = pd.read_csv(os.path.join("data", "y_train.csv")).iloc[:n, 0].to_numpy()
+    X_test = np.load(os.path.join("data", "X_test_processed.npy"))
+    return X, y, X_test
+
+def test_flattened_predictions_are_identical_to_sklearn():
+    X, y, X_test = _data()
+    models = [DecisionTreeRegressor(random_state=0),
+              RandomForestRegressor(n_estimators=20, random_state=0),
+              GradientBoostingRegressor(n_estimators=50, random_state=0),
+              HistGradientBoostingRegressor(max_iter=30, random_state=0)]
+    for model in models:
+        model.fit(X, y)
+        engine = flatten_ensemble(model)
+        # Single rows, a batch spanning several blocks, and the whole test set
+        for batch in (X_test[:1], X_test[:7], X_test):
+            np.testing.assert_array_equal(engine.predict(batch), model.predict(batch))
+
+    # Missing values follow the split's learned NaN direction
+    X_nan = X.copy()
+    X_nan[::7, 0] = np.nan
+    model = HistGradientBoostingRegressor(max_iter=30, random_state=0).fit(X_nan, y)
+    X_test = X_test.copy()
+    X_test[::3, 0] = np.nan
+    np.testing.assert_array_equal(flatten_ensemble(model).predict(X_test), model.predict(X_test))
+
+    assert flatten_ensemble(LinearRegression().fit(X, y)) is None
+
+def test_saved_ensemble_loads_without_sklearn(tmp_path):
+    X, y, X_test = _data()
+    model = GradientBoostingRegressor(n_estimators=20, random_state=0).fit(X, y)
+    flatten_ensemble(model).save(str(tmp_path / "trees"))
+    np.save(tmp_path / "X.npy", X_test)
+
+    code = (
+        "import sys; sys.modules['sklearn'] = None\n"
+        "import numpy as np\n"
+        "from src.tree_engine import TreeEnsemble\n"
+        f"engine = TreeEnsemble.load({str(tmp_path / 'trees')!r})\n"
+        f"np.save({str(tmp_path / 'pred.npy')!r}, engine.predict(np.load({str(tmp_path / 'X.npy')!r})))\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.getcwd())
+    np.testing.assert_array_equal(np.load(tmp_path / "pred.npy"), model.predict(X_test))
+
+def test_pipeline_scores_tree_models_through_the_engine(tmp_path):
+    X, y, _ = _data()
+    shutil.copy(os.path.join("models", "preprocessing_pipeline.pkl"), tmp_path)
+    joblib.dump(RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y), tmp_path / "best_model.pkl")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        fast = PredictPipeline(model_dir=str(tmp_path))
+        reference = PredictPipeline(model_dir=str(tmp_path), fast_path=False)
+    assert fast.plan is None and isinstance(fast.trees, TreeEnsemble)
+    assert reference.trees is None
+
+    rows = pd.read_csv(os.path.join("data", "Exam_Score_Prediction.csv"), nrows=50)
+    rows = rows.drop(columns=["exam_score"]).to_dict(orient="records")
+    np.testing.assert_array_equal(fast._predict_raw(rows), reference._predict_raw(rows))
@@ -0,0 +1,54 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src import tune
+from src.tune import SEARCH_SPACES, _budget_schedule, run_search
+from src.utils import save_matrix
+
+def test_budget_schedule_rungs():
+    assert _budget_schedule(SEARCH_SPACES["random_forest"], 8000, eta=3, n_candidates=9) == [30, 90, 270]
+    assert _budget_schedule(SEARCH_SPACES["hist_gradient_boosting"], 8000, eta=3, n_candidates=27) == [25, 75, 225, 675]
+    # Fewer candidates than the budget range allows: fewer rungs, still ending at max_resource
+    assert _budget_schedule(SEARCH_SPACES["gradient_boosting"], 8000, eta=3, n_candidates=3) == [180, 540]
+    # n_samples budgets end at the fold size, and a fold smaller than min_resource gets one rung
+    assert _budget_schedule(SEARCH_SPACES["ridge"], 9000, eta=3, n_candidates=9) == [1000, 3000, 9000]
+    assert _budget_schedule(SEARCH_SPACES["ridge"], 500, eta=3, n_candidates=9) == [500]
+
+def test_resume_skips_logged_folds_after_a_torn_line(tmp_path, monkeypatch):
+    X = np.load(os.path.join("data", "X_train_processed.npy"))[:2000]
+    y = pd.read_csv(os.path.join("data", "y_train.csv")).iloc[:2000]
+    save_matrix(str(tmp_path / "X.npy"), X, [f"f{i}" for i in range(X.shape[1])])
+    y.to_csv(tmp_path / "y.csv", index=False)
+    monkeypatch.setitem(SEARCH_SPACES, "ridge", {**SEARCH_SPACES["ridge"], "min_resource": 100})
+
+    fits, run_fold = [], tune._run_fold
+    def counting_run_fold(trial, fold_index, fold):
+        fits.append((trial["trial"], fold_index))
+        return run_fold(trial, fold_index, fold)
+    monkeypatch.setattr(tune, "_run_fold", counting_run_fold)
+
+    search = lambda: run_search(str(tmp_path / "X.npy"), str(tmp_path / "y.csv"), output_dir=str(tmp_path / "out"),
+                                families=["ridge"], n_candidates=3, eta=3, cv=2, n_jobs=1)
+    first = search()
+    # 3 candidates on 2 folds at 333 rows, then the best one at the full 1000
+    assert len(fits) == 8
+
+    # Simulate a crash while the last fold was being written
+    log_path = tmp_path / "out" / "trials.jsonl"
+    lines = log_path.read_text().splitlines()
+    log_path.write_text("\n".join(lines[:-1]) + "\n" + lines[-1][:len(lines[-1]) // 2])
+    torn = json.loads(lines[-1])
+
+    fits.clear()
+    resumed = search()
+    assert fits == [(torn["trial"], torn["fold"])]
+    assert len(log_path.read_text().splitlines()) == len(lines)
+    pd.testing.assert_frame_equal(first.drop(columns=["finished_at", "fit_seconds"]),
+                                  resumed.drop(columns=["finished_at", "fit_seconds"]))
+
+    fits.clear()
+    search()
+    assert fits == []
@@ -0,0 +1,38 @@
+import warnings
+
+import numpy as np
+
+from app.backend.whatif import axis_values, expand_grid, marginal_curves
+from src.predict_pipeline import PredictPipeline
+
+BASE = {
+    "age": 20, "gender": "female", "course": "b.tech", "study_hours": 4.0,
+    "class_attendance": 80.0, "internet_access": "yes", "sleep_hours": 7.0,
+    "sleep_quality": "good", "study_method": "self-study", "facility_rating": "high",
+    "exam_difficulty": "moderate",
+}
+
+def test_axis_values_ranges_and_integer_fields():
+    assert axis_values(start=0, stop=1, steps=5) == [0.0, 0.25, 0.5, 0.75, 1.0]
+    assert axis_values(start=18, stop=20, steps=9, integer=True) == [18, 19, 20]
+    assert axis_values(values=["poor", "good"]) == ["poor", "good"]
+
+def test_grid_scores_match_single_predictions():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        pipeline = PredictPipeline(model_dir="models")
+
+    axes = [("study_hours", [1.0, 5.0, 9.0]), ("sleep_quality", ["poor", "good"])]
+    scores = pipeline.predict_batch(expand_grid(BASE, axes))
+    grid = scores[:-1].reshape(3, 2)
+
+    assert scores[-1] == pipeline.predict(BASE)
+    for i, hours in enumerate(axes[0][1]):
+        for j, quality in enumerate(axes[1][1]):
+            assert grid[i, j] == pipeline.predict({**BASE, "study_hours": hours, "sleep_quality": quality})
+
+    study, quality = marginal_curves(grid, axes)
+    np.testing.assert_allclose(study["mean_score"], np.round(grid.mean(axis=1), 4))
+    # Linear model: the slope along study_hours is constant and positive
+    assert len(set(study["effect"])) == 1 and study["effect"][0] > 0
+    assert quality["effect"] is None